@@ -0,0 +1,51 @@
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from benchmarks.data import synthetic_closes
+from scripts.indicators import ema, ema_loop, rsi, rsi_loop
+
+# Bar counts to benchmark; the loop versions are skipped above LOOP_LIMIT
+# unless --with-slow-loops is passed, since they take minutes at 10M bars.
+SIZES = [10_000, 1_000_000, 10_000_000]
+LOOP_LIMIT = 1_000_000
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    """
+    Return the best wall-clock time of `repeat` calls, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func(*args, **kwargs)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(sizes=SIZES, with_slow_loops=False):
+    """
+    Time vectorized and loop indicators on each size and print a table.
+    """
+    print(f"{'indicator':<10}{'bars':>12}{'loop (s)':>12}{'vector (s)':>12}{'speedup':>10}{'max diff':>12}")
+    for n in sizes:
+        closes = synthetic_closes(n)
+        for name, fast, slow, length in (("ema", ema, ema_loop, 150), ("rsi", rsi, rsi_loop, 12)):
+            vector_time = best_time(fast, closes, length)
+            if n <= LOOP_LIMIT or with_slow_loops:
+                loop_time = best_time(slow, closes, length, repeat=1)
+                diff = np.nanmax(np.abs(fast(closes, length) - slow(closes, length)))
+                print(f"{name:<10}{n:>12}{loop_time:>12.4f}{vector_time:>12.4f}"
+                      f"{loop_time / vector_time:>9.1f}x{diff:>12.2e}")
+            else:
+                print(f"{name:<10}{n:>12}{'skipped':>12}{vector_time:>12.4f}{'-':>10}{'-':>12}")
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_indicators
+    parser = argparse.ArgumentParser(description="Benchmark EMA/RSI implementations.")
+    parser.add_argument("--with-slow-loops", action="store_true",
+                        help="Also time the Python loops on the largest sizes.")
+    args = parser.parse_args()
+    run_benchmark(with_slow_loops=args.with_slow_loops)
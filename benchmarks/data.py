@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_MS = 15 * 60 * 1000  # 15 minute candles
+
+
+def synthetic_closes(n, seed=42):
+    """
+    Generate a random-walk close series resembling BTCUSDT prices.
+    """
+    rng = np.random.default_rng(seed)
+    return 30000 + np.cumsum(rng.normal(0, 25, n))
+
+
+def synthetic_ohlcv(n, seed=42, start="2024-01-01", interval_ms=INTERVAL_MS):
+    """
+    Random-walk candles in the `backtesting` layout (Open, High, Low, Close,
+    Volume), starting near 30000. Each candle opens at the previous close;
+    bodies are large relative to the wicks so impulses and Fibonacci
+    retracements occur regularly and the strategy actually trades.
+    """
+    rng = np.random.default_rng(seed)
+    closes = 30000 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    volumes = rng.gamma(2.0, 50.0, n)
+    index = pd.date_range(start, periods=n, freq=pd.Timedelta(milliseconds=interval_ms))
+    return pd.DataFrame({"Open": opens, "High": highs, "Low": lows, "Close": closes, "Volume": volumes},
+                        index=index)
+
+
+def synthetic_kline_rows(n, seed=42, start="2024-01-01"):
+    """
+    Candles as returned in `result` by the legacy `query_kline` endpoint
+    read by `fetch_bybit_data`: open_time in seconds, prices as strings.
+    """
+    df = synthetic_ohlcv(n, seed, start)
+    open_times = df.index.asi8 // 10**9
+    return [
+        {"symbol": "BTCUSDT", "interval": "15", "open_time": int(open_time),
+         "open": str(row[0]), "high": str(row[1]), "low": str(row[2]), "close": str(row[3]), "volume": str(row[4])}
+        for open_time, row in zip(open_times, df.to_numpy())
+    ]
+
+
+def synthetic_kline_messages(n, symbol="BTCUSDT", interval="15", updates_per_candle=4, seed=42,
+                             start="2024-01-01"):
+    """
+    Raw v5 kline stream messages for `n` candles: `updates_per_candle - 1`
+    in-progress pushes followed by the confirmed candle, as JSON strings.
+    """
+    df = synthetic_ohlcv(n, seed, start)
+    starts = df.index.asi8 // 10**6
+    messages = []
+    for start_ms, (open_, high, low, close, volume) in zip(starts, df.to_numpy()):
+        for update in range(1, updates_per_candle + 1):
+            confirm = update == updates_per_candle
+            # In-progress pushes walk from the open towards the close
+            price = close if confirm else open_ + (close - open_) * update / updates_per_candle
+            kline = {
+                "start": int(start_ms), "end": int(start_ms) + INTERVAL_MS - 1, "interval": interval,
+                "open": str(open_), "high": str(max(high, price)), "low": str(min(low, price)),
+                "close": str(price), "volume": str(volume * update / updates_per_candle),
+                "confirm": confirm, "timestamp": int(start_ms),
+            }
+            messages.append(json.dumps({"topic": f"kline.{interval}.{symbol}", "type": "snapshot", "data": [kline]}))
+    return messages
@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import warnings
+from time import perf_counter
+
+from benchmarks.data import synthetic_closes, synthetic_kline_messages, synthetic_kline_rows, synthetic_ohlcv
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+TOLERANCE = 0.25  # Flag a benchmark when its rate drops more than 25% below the baseline
+MIN_TIME = 0.2  # Seconds each timing repeat should last at least
+SEED_BARS = 300  # Candles used to seed the live strategy
+CASH = 1_000_000  # Enough to buy whole units at the synthetic ~30000 prices
+RISK = 0.002  # Keeps most position sizes within the available margin
+BASELINE_FIELDS = ("size", "unit", "seconds", "rate")
+
+
+# Each benchmark factory takes a size and returns (func, items): `func()` is
+# the timed call and `items` the number of bars, rows or ticks it processes.
+
+def bench_ema(size):
+    from scripts.indicators import ema
+    closes = synthetic_closes(size)
+    return lambda: ema(closes, 150), size
+
+
+def bench_rsi(size):
+    from scripts.indicators import rsi
+    closes = synthetic_closes(size)
+    return lambda: rsi(closes, 12), size
+
+
+def bench_backtest(size):
+    from backtesting import Backtest
+    from scripts.fibo_algo import FibonacciStrategy
+    bt = Backtest(synthetic_ohlcv(size), FibonacciStrategy, cash=CASH, commission=.002)
+
+    def run():
+        # Silence the progress output and the broker's margin warnings
+        with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            warnings.simplefilter("ignore")
+            bt.run(risk=RISK)
+    return run, size
+
+
+def bench_vector_backtest(size):
+    from scripts.fibo_vector import VectorBacktest
+    backtest = VectorBacktest(synthetic_ohlcv(size), cash=CASH, commission=.002)
+    return lambda: backtest.run(risk=RISK), size
+
+
+def bench_fetch_bybit_data(size):
+    from scripts.bybit_trading import fetch_bybit_data
+    response = {"ret_code": 0, "ret_msg": "OK", "result": synthetic_kline_rows(size)}
+
+    class Client:
+        def query_kline(self, **kwargs):
+            return response
+
+    client = Client()
+    return lambda: fetch_bybit_data(client, "BTCUSDT", "15", limit=size), size
+
+
+def bench_kline_ingest(size):
+    """
+    Parsing a `query_kline` payload into a reused `KlineBuffer` and taking
+    the DataFrame view, as `fetch_bybit_data` does in the live loop.
+    """
+    from scripts.kline_buffer import KlineBuffer
+    rows = synthetic_kline_rows(size)
+    buffer = KlineBuffer(size)
+
+    def run():
+        buffer.clear()
+        buffer.ingest(rows)
+        buffer.frame()
+    return run, size
+
+
+def bench_live_update(size):
+    """
+    Cost of one `LiveFibonacciStrategy.update`: three in-progress previews
+    for every closed candle, like a busy kline stream.
+    """
+    from scripts.fibo_live import LiveFibonacciStrategy
+    seed = synthetic_ohlcv(SEED_BARS).rename(columns=str.lower)
+    candles = synthetic_ohlcv(size, seed=7)[["High", "Low", "Close"]].to_numpy().tolist()
+    strategy = LiveFibonacciStrategy().seed(seed)
+    updates = [(high, low, close, i % 4 == 3) for i, (high, low, close) in enumerate(candles)]
+
+    def run():
+        update = strategy.update
+        for high, low, close, closed in updates:
+            update(high, low, close, closed)
+    return run, size
+
+
+def bench_stream_message(size):
+    """
+    Cost of one raw WebSocket message through `KlineStreamEngine`, from JSON
+    decoding to the strategy result.
+    """
+    from scripts.fibo_live import LiveFibonacciStrategy
+    from scripts.kline_stream import KlineStreamEngine
+    # The seed ends on the candle before the first message, so the stream has no gap to backfill
+    seed = synthetic_ohlcv(SEED_BARS, start="2023-12-28 21:00").rename(columns=str.lower)
+    messages = synthetic_kline_messages(max(size // 4, 1))
+    engine = KlineStreamEngine("BTCUSDT", "15", LiveFibonacciStrategy().seed(seed))
+    seed_time = engine.strategy.last_closed_time
+
+    async def feed():
+        handle = engine.handle_message
+        for message in messages:
+            await handle(message)
+
+    def run():
+        engine.strategy.last_closed_time = seed_time  # Replay the same candles on every repeat
+        asyncio.run(feed())
+    return run, len(messages)
+
+
+# name -> (factory, default size, unit of the processed items)
+BENCHMARKS = {
+    "ema": (bench_ema, 1_000_000, "bars"),
+    "rsi": (bench_rsi, 1_000_000, "bars"),
+    "backtest": (bench_backtest, 5_000, "bars"),
+    "vector_backtest": (bench_vector_backtest, 100_000, "bars"),
+    "fetch_bybit_data": (bench_fetch_bybit_data, 200, "rows"),
+    "kline_ingest": (bench_kline_ingest, 200, "rows"),
+    "live_update": (bench_live_update, 100_000, "updates"),
+    "stream_message": (bench_stream_message, 20_000, "messages"),
+}
+
+
+def time_call(func, repeat=5, min_time=MIN_TIME):
+    """
+    Best time of one call in seconds. Fast calls are looped so each repeat
+    lasts at least `min_time`, as asv does.
+    """
+    start = perf_counter()
+    func()  # Warm-up, also sizes the inner loop
+    first = perf_counter() - start
+    number = max(1, int(min_time / first)) if first > 0 else 1
+    best = first
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter() - start) / number)
+    return best
+
+
+def run_suite(names=None, sizes=None, repeat=5, min_time=MIN_TIME):
+    """
+    Run the selected benchmarks and return name -> result dict with
+    `size`, `unit`, `seconds` (best time per call) and `rate` (items per second).
+    A benchmark that cannot be set up (e.g. a failing import) fails the suite.
+    """
+    sizes = sizes or {}
+    results = {}
+    for name in names or BENCHMARKS:
+        factory, size, unit = BENCHMARKS[name]
+        size = sizes.get(name, size)
+        func, items = factory(size)
+        seconds = time_call(func, repeat, min_time)
+        results[name] = {"size": size, "unit": unit, "seconds": seconds, "rate": items / seconds}
+    return results
+
+
+def load_baselines(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baselines(results, path=BASELINE_PATH):
+    """
+    Store results as the new baselines, with the machine they were measured on.
+    """
+    document = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()},
+        "results": {name: {field: result[field] for field in BASELINE_FIELDS}
+                    for name, result in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baselines, tolerance=TOLERANCE):
+    """
+    Annotate each result with `baseline` (rate), `change` (relative) and
+    `status`: ok, faster, regression or new (no baseline, or measured at a
+    different size). Returns the names of the regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None or baseline.get("size") != result["size"]:
+            result["status"] = "new"
+        else:
+            result["baseline"] = baseline["rate"]
+            result["change"] = result["rate"] / baseline["rate"] - 1
+            if result["change"] < -tolerance:
+                result["status"] = "regression"
+                regressions.append(name)
+            else:
+                result["status"] = "faster" if result["change"] > tolerance else "ok"
+    return regressions
+
+
+def format_results(results):
+    lines = [f"{'benchmark':<18}{'size':>10}{'time/call':>14}{'rate':>24}{'baseline':>16}{'change':>9}  status"]
+    for name, result in results.items():
+        rate = f"{result['rate']:,.0f} {result['unit']}/s"
+        baseline = f"{result['baseline']:,.0f}" if "baseline" in result else "-"
+        change = f"{result['change']:+.1%}" if "change" in result else "-"
+        lines.append(f"{name:<18}{result['size']:>10}{result['seconds'] * 1000:>12.2f}ms{rate:>24}"
+                     f"{baseline:>16}{change:>9}  {result.get('status', '')}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.suite [--save]
+    parser = argparse.ArgumentParser(description="Benchmark indicators, backtests, data handling and the live loop.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baselines", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Relative slowdown flagged as a regression (default: 0.25)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    results = run_suite(args.names or None, repeat=args.repeat)
+    regressions = compare(results, load_baselines(args.baselines), args.tolerance)
+    print(format_results(results))
+    if args.save:
+        save_baselines(results, args.baselines)
+        print(f"Baselines written to {args.baselines}")
+    elif regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from scripts.candle_store import COLUMNS, DTYPES, candle_open_time, interval_ms, parse_kline_rows
+from scripts.metrics import timed
+from scripts.rest_client import RestClient
+
+MAINNET_REST_URL = "https://api.bybit.com"
+TESTNET_REST_URL = "https://api-testnet.bybit.com"
+KLINE_PATH = "/v5/market/kline"
+PAGE_SIZE = 1000  # Maximum candles per kline request
+
+
+def page_windows(start, end, interval, page_size=PAGE_SIZE):
+    """
+    Split the open-time range [start, end] (ms) into windows of at most
+    `page_size` candles.
+    """
+    step = interval_ms(interval)
+    start = candle_open_time(start + step - 1, interval)  # First open time on the interval grid
+    windows = []
+    cursor = start
+    while cursor <= end:
+        window_end = min(cursor + (page_size - 1) * step, end)
+        windows.append((cursor, window_end))
+        cursor = window_end + step
+    return windows
+
+
+class BackfillClient:
+    """
+    Concurrent historical kline downloader for the Bybit v5 REST API.
+
+    A range is split into page-sized windows that are fetched by a bounded
+    thread pool through one `RestClient`, which pools connections, keeps the
+    request rate under the exchange limit and retries failures. Pages are
+    written straight into one preallocated array per column at their slot on
+    the interval grid, which also removes overlaps.
+    """
+    def __init__(self, base_url=MAINNET_REST_URL, category="linear", max_workers=4,
+                 max_retries=5, backoff=0.5, timeout=10, rest=None):
+        self.category = category
+        self.max_workers = max_workers
+        # Share one RestClient between clients to share its pool and rate limit
+        self.rest = rest or RestClient(base_url, pool_size=max_workers, max_retries=max_retries,
+                                       backoff=backoff, timeout=timeout)
+
+    @timed("fetch_kline_page")
+    def fetch_page(self, symbol, interval, start, end):
+        """
+        Fetch one window of candles, retrying on rate limits and transient errors.
+        Returns a dict of column arrays, oldest first.
+        """
+        params = {
+            "category": self.category, "symbol": symbol, "interval": str(interval),
+            "start": start, "end": end, "limit": PAGE_SIZE,
+        }
+        return parse_kline_rows(self.rest.get(KLINE_PATH, params)["list"])
+
+    def fetch(self, symbol, interval, start, end):
+        """
+        Download all candles with open times in [start, end] ms into contiguous
+        column arrays. Compatible with `CandleStore.sync`.
+        """
+        step = interval_ms(interval)
+        windows = page_windows(start, end, interval)
+        if not windows:
+            return {name: np.empty(0, dtype=DTYPES[name]) for name in COLUMNS}
+        first = windows[0][0]
+        n = (windows[-1][1] - first) // step + 1
+        columns = {name: np.empty(n, dtype=DTYPES[name]) for name in COLUMNS}
+        filled = np.zeros(n, dtype=bool)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.fetch_page, symbol, interval, s, e) for s, e in windows]
+            for future in as_completed(futures):
+                page = future.result()
+                slots = (page["open_time"] - first) // step
+                inside = (slots >= 0) & (slots < n) & ((page["open_time"] - first) % step == 0)
+                slots = slots[inside]
+                for name in COLUMNS:
+                    columns[name][slots] = page[name][inside]
+                filled[slots] = True
+
+        if filled.all():
+            return columns
+        # Missing candles (e.g. exchange downtime) are dropped, keeping the arrays contiguous
+        return {name: values[filled] for name, values in columns.items()}
+
+    def close(self):
+        self.rest.close()
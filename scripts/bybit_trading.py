@@ -1,29 +1,59 @@
+import logging
+import time
 import pandas as pd
-from datetime import datetime
-from pybit import HTTP
-from scripts.fibo_algo import run_fibonacci_strategy
+from scripts.backfill import MAINNET_REST_URL, BackfillClient
+from scripts.candle_store import candle_open_time, interval_ms
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.kline_buffer import KlineBuffer
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_SELL
+from scripts.metrics import timed
 
-def fetch_bybit_data(client, symbol, interval, limit=200):
+logger = logging.getLogger(__name__)
+
+_kline_buffers = {}  # (symbol, interval) -> KlineBuffer reused by run_bybit_trading
+
+@timed("fetch_bybit_data")
+def fetch_bybit_data(client, symbol, interval, limit=200, buffer=None):
     """
     Fetch historical candlestick data from Bybit using pybit.
+
+    The rows are parsed straight into `buffer` (a `KlineBuffer`, reused
+    across calls by the live loop) and returned as a DataFrame view of it.
+    Both the legacy response (`result` is a list of candles) and the v5
+    response (`result["list"]`, newest first) are accepted.
     """
     response = client.query_kline(symbol=symbol, interval=interval, limit=limit)
-    if "ret_code" in response and response["ret_code"] != 0:
-        raise Exception(f"Error fetching data: {response.get('ret_msg', 'Unknown error')}")
+    ret_code = response.get("ret_code", response.get("retCode", 0))
+    if ret_code != 0:
+        message = response.get("ret_msg", response.get("retMsg", "Unknown error"))
+        raise Exception(f"Error fetching data: {message}")
+
+    rows = response["result"]
+    if isinstance(rows, dict):
+        rows = rows["list"]
+    if buffer is None:
+        buffer = KlineBuffer(max(limit, len(rows)))
+    buffer.ingest(rows)
+    return buffer.frame(tail=len(rows))
 
-    data = response["result"]
-    df = pd.DataFrame(data)
-    df['datetime'] = pd.to_datetime(df['open_time'], unit='s')
-    df.rename(columns={
-        'open': 'open',
-        'high': 'high',
-        'low': 'low',
-        'close': 'close',
-        'volume': 'volume'
-    }, inplace=True)
-    df.set_index('datetime', inplace=True)
-    return df[['open', 'high', 'low', 'close', 'volume']]
+@timed("backfill_bybit_data")
+def backfill_bybit_data(symbol, interval, start, end, base_url=MAINNET_REST_URL, max_workers=4):
+    """
+    Fetch a long candle history between two datetimes by downloading
+    page-sized windows concurrently. Returns the same columns as `fetch_bybit_data`.
+    """
+    client = BackfillClient(base_url, max_workers=max_workers)
+    try:
+        columns = client.fetch(symbol, interval, int(pd.Timestamp(start).timestamp() * 1000),
+                               int(pd.Timestamp(end).timestamp() * 1000))
+    finally:
+        client.close()
+    df = pd.DataFrame({name: columns[name] for name in ['open', 'high', 'low', 'close', 'volume']},
+                      index=pd.to_datetime(columns['open_time'], unit='ms'))
+    df.index.name = 'datetime'
+    return df
 
+@timed("place_bybit_order")
 def place_bybit_order(client, symbol, side, qty, stop_loss=None, take_profit=None):
     """
     Place an order on Bybit using pybit.
@@ -47,18 +77,44 @@ def place_bybit_order(client, symbol, side, qty, stop_loss=None, take_profit=Non
         raise Exception(f"Error placing order: {response.get('ret_msg', 'Unknown error')}")
     return response["result"]
 
-def run_bybit_trading(client, symbol, interval, qty):
+def run_bybit_trading(client, symbol, interval, qty, strategy=None, limit=200, now_ms=None):
     """
     Fetch data, run the strategy, and place trades on Bybit using pybit.
+
+    On the first call the strategy is seeded from `limit` candles; pass the
+    returned strategy back in on later calls so only the candles closed
+    since the previous call (normally one) are fetched and each update costs
+    O(1). Candles are kept in one `KlineBuffer` per symbol and interval, so
+    polling allocates no new arrays.
     """
-    # Fetch historical data
-    df = fetch_bybit_data(client, symbol, interval)
+    if strategy is None:
+        # Seed indicators from history; the last candle is still in progress
+        buffer = _kline_buffers[symbol, str(interval)] = KlineBuffer(limit)
+        df = fetch_bybit_data(client, symbol, interval, limit, buffer=buffer)
+        strategy = LiveFibonacciStrategy().seed(df.iloc[:-1])
+        return strategy
+
+    buffer = _kline_buffers.get((symbol, str(interval)))
+    if buffer is None:
+        buffer = _kline_buffers[symbol, str(interval)] = KlineBuffer(limit)
 
-    # Run the Fibonacci strategy
-    result = run_fibonacci_strategy(df)
+    # Fetch every candle closed since the last call (normally one) and the in-progress one
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    step = interval_ms(interval)
+    missed = 1
+    if strategy.last_closed_time is not None:
+        last_closed = strategy.last_closed_time.value // 1_000_000
+        missed = max(1, (candle_open_time(now_ms, interval) - last_closed) // step - 1)
+    if missed + 1 > buffer.capacity:
+        logger.warning(f"{missed} candles missed on {symbol}, only the last {buffer.capacity - 1} are replayed.")
+    df = fetch_bybit_data(client, symbol, interval, limit=min(missed + 1, buffer.capacity), buffer=buffer)
+
+    # Run the Fibonacci strategy on the new candles
+    result = strategy.sync(df)
 
     # Check for signals and place orders
-    if result["signal"] == 1:  # Sell signal
-        place_bybit_order(client, symbol, "Sell", qty, stop_loss=result["stop_loss"], take_profit=result["take_profit"])
-    elif result["signal"] == 2:  # Buy signal
+    if result["signal"] == SIGNAL_BUY:
         place_bybit_order(client, symbol, "Buy", qty, stop_loss=result["stop_loss"], take_profit=result["take_profit"])
+    elif result["signal"] == SIGNAL_SELL:
+        place_bybit_order(client, symbol, "Sell", qty, stop_loss=result["stop_loss"], take_profit=result["take_profit"])
+    return strategy
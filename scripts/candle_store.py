@@ -0,0 +1,275 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open_time", "open", "high", "low", "close", "volume")
+DTYPES = {"open_time": np.int64, "open": np.float64, "high": np.float64,
+          "low": np.float64, "close": np.float64, "volume": np.float64}
+DEFAULT_ROOT = os.path.join("data", "candles")
+
+# Bybit kline intervals in milliseconds
+INTERVAL_MS = {
+    "1": 60_000, "3": 180_000, "5": 300_000, "15": 900_000, "30": 1_800_000,
+    "60": 3_600_000, "120": 7_200_000, "240": 14_400_000, "360": 21_600_000,
+    "720": 43_200_000, "D": 86_400_000, "W": 604_800_000,
+}
+# Weekly candles open on Monday 00:00 UTC, but the Unix epoch was a Thursday
+INTERVAL_OFFSET_MS = {"W": 4 * 86_400_000}
+
+
+def interval_ms(interval):
+    """
+    Convert a Bybit interval ("1", "15", "D", ...) to milliseconds.
+    """
+    try:
+        return INTERVAL_MS[str(interval)]
+    except KeyError:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+
+def candle_open_time(timestamp_ms, interval):
+    """
+    Open time (ms) of the candle of `interval` that contains `timestamp_ms`.
+    """
+    step = interval_ms(interval)
+    offset = INTERVAL_OFFSET_MS.get(str(interval), 0)
+    return (timestamp_ms - offset) // step * step + offset
+
+
+def column_path(directory, name, generation):
+    """
+    File of one column; merges bump the generation so they never overwrite committed files.
+    """
+    return os.path.join(directory, f"{name}.bin" if generation == 0 else f"{name}.{generation}.bin")
+
+
+def parse_kline_rows(rows):
+    """
+    Convert Bybit v5 kline rows ([startTime, open, high, low, close, volume,
+    turnover], newest first) to column arrays, oldest first.
+    """
+    array = np.array(rows, dtype=object).reshape(-1, 7)[::-1]
+    return {
+        "open_time": array[:, 0].astype(np.int64),
+        "open": array[:, 1].astype(np.float64),
+        "high": array[:, 2].astype(np.float64),
+        "low": array[:, 3].astype(np.float64),
+        "close": array[:, 4].astype(np.float64),
+        "volume": array[:, 5].astype(np.float64),
+    }
+
+
+class CandleStore:
+    """
+    On-disk columnar candle cache, one directory per symbol/interval.
+
+    Each column is a raw little-endian array file that is memory-mapped on
+    load, so reading a year of 1m candles does not parse or copy anything.
+    `meta.json` holds the committed row count and the generation of the
+    column files, and is written last. An interrupted append stays invisible
+    to readers, and a merge writes a new generation of files that only
+    becomes visible, all columns at once, when meta.json is replaced.
+    """
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, symbol, str(interval))
+
+    def meta(self, symbol, interval):
+        """
+        Committed row count and file generation for symbol/interval.
+        """
+        meta_path = os.path.join(self.path(symbol, interval), "meta.json")
+        if not os.path.exists(meta_path):
+            return {"count": 0, "generation": 0}
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta.setdefault("generation", 0)  # Stores written before merges used generations
+        return meta
+
+    def count(self, symbol, interval):
+        """
+        Number of committed candles for symbol/interval.
+        """
+        return self.meta(symbol, interval)["count"]
+
+    def load(self, symbol, interval):
+        """
+        Return a dict of read-only memory-mapped column arrays.
+        """
+        meta = self.meta(symbol, interval)
+        n = meta["count"]
+        directory = self.path(symbol, interval)
+        columns = {}
+        for name in COLUMNS:
+            if n == 0:
+                columns[name] = np.empty(0, dtype=DTYPES[name])
+            else:
+                columns[name] = np.memmap(column_path(directory, name, meta["generation"]),
+                                          dtype=DTYPES[name], mode="r", shape=(n,))
+        return columns
+
+    def time_range(self, symbol, interval):
+        """
+        Return (first_open_time, last_open_time) in ms, or None when empty.
+        """
+        open_time = self.load(symbol, interval)["open_time"]
+        if len(open_time) == 0:
+            return None
+        return int(open_time[0]), int(open_time[-1])
+
+    def write(self, symbol, interval, candles):
+        """
+        Merge candles into the store. `candles` maps column names to arrays.
+        Candles after the stored range are appended in place; anything else
+        rewrites the files in sorted, de-duplicated order.
+        Returns the number of new candles.
+        """
+        new = {name: np.asarray(candles[name], dtype=DTYPES[name]) for name in COLUMNS}
+        if len(new["open_time"]) == 0:
+            return 0
+        order = np.argsort(new["open_time"], kind="stable")
+        new = {name: values[order] for name, values in new.items()}
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = np.diff(new["open_time"]) != 0  # De-duplicate within the batch
+        new = {name: values[keep] for name, values in new.items()}
+
+        directory = self.path(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        generation = self.meta(symbol, interval)["generation"]
+        stored = self.load(symbol, interval)
+        n = len(stored["open_time"])
+
+        if n == 0 or new["open_time"][0] > stored["open_time"][-1]:
+            for name in COLUMNS:
+                self._append(column_path(directory, name, generation), name, n, new[name])
+            self._commit(directory, n + len(new["open_time"]), generation)
+            return len(new["open_time"])
+
+        # Overlapping or earlier data: merge, keeping stored rows on conflict
+        fresh = ~np.isin(new["open_time"], stored["open_time"])
+        if not fresh.any():
+            return 0
+        merged_time = np.concatenate([stored["open_time"], new["open_time"][fresh]])
+        order = np.argsort(merged_time, kind="stable")
+        merged = {
+            name: np.concatenate([stored[name], new[name][fresh]])[order]
+            for name in COLUMNS
+        }
+        del stored  # Release the memory maps before removing the old files
+        # Write a complete new generation; the commit switches all columns at once
+        for name in COLUMNS:
+            merged[name].tofile(column_path(directory, name, generation + 1))
+        self._commit(directory, len(merged_time), generation + 1)
+        for name in COLUMNS:
+            os.remove(column_path(directory, name, generation))
+        return int(fresh.sum())
+
+    def missing_ranges(self, symbol, interval, start, end):
+        """
+        Return the [start, end] ms ranges not covered by the store, including
+        holes between stored candles (e.g. left by syncing a later window).
+        Candles the exchange never produced are reported again on every call.
+        """
+        step = interval_ms(interval)
+        if start > end:
+            return []
+        open_time = self.load(symbol, interval)["open_time"]
+        if len(open_time) == 0:
+            return [(start, end)]
+        first, last = int(open_time[0]), int(open_time[-1])
+        ranges = []
+        if start < first:
+            ranges.append((start, min(end, first - step)))
+        # Holes inside the requested part of the stored range
+        lo = max(int(np.searchsorted(open_time, start, side="left")) - 1, 0)
+        hi = int(np.searchsorted(open_time, end, side="right")) + 1
+        stored = open_time[lo:hi]
+        if len(stored) < (int(stored[-1]) - int(stored[0])) // step + 1:
+            for i in np.flatnonzero(np.diff(stored) > step):
+                ranges.append((max(start, int(stored[i]) + step), min(end, int(stored[i + 1]) - step)))
+        if end > last:
+            ranges.append((max(start, last + step), end))
+        return [(a, b) for a, b in ranges if a <= b]
+
+    def sync(self, fetch, symbol, interval, start, end=None):
+        """
+        Fetch only the ranges missing between `start` and `end` (ms open times)
+        and store them. `fetch(symbol, interval, start, end)` must return a
+        mapping of column arrays. `end` defaults to the last closed candle.
+        Returns the number of new candles.
+        """
+        step = interval_ms(interval)
+        if end is None:
+            end = candle_open_time(int(time.time() * 1000), interval) - step
+        added = 0
+        for range_start, range_end in self.missing_ranges(symbol, interval, start, end):
+            candles = fetch(symbol, interval, range_start, range_end)
+            open_time = np.asarray(candles["open_time"], dtype=np.int64)
+            mask = (open_time >= range_start) & (open_time <= range_end)  # Never store the in-progress candle
+            added += self.write(symbol, interval, {name: np.asarray(candles[name])[mask] for name in COLUMNS})
+        return added
+
+    def to_frame(self, symbol, interval, start=None, end=None, tail=None):
+        """
+        Return a `backtesting`-compatible DataFrame (Open/High/Low/Close/Volume)
+        for open times in [start, end] ms, or the last `tail` candles.
+        """
+        columns = self.load(symbol, interval)
+        open_time = columns["open_time"]
+        lo = 0 if start is None else int(np.searchsorted(open_time, start, side="left"))
+        hi = len(open_time) if end is None else int(np.searchsorted(open_time, end, side="right"))
+        if tail is not None:
+            lo = max(lo, hi - tail)
+        index = pd.DatetimeIndex(pd.to_datetime(open_time[lo:hi], unit="ms"), name="datetime")
+        return pd.DataFrame({
+            "Open": columns["open"][lo:hi],
+            "High": columns["high"][lo:hi],
+            "Low": columns["low"][lo:hi],
+            "Close": columns["close"][lo:hi],
+            "Volume": columns["volume"][lo:hi],
+        }, index=index, copy=False)
+
+    def iter_chunks(self, symbol, interval, chunk_bars, start=None, end=None):
+        """
+        Yield the candles with open times in [start, end] ms as dicts of
+        column arrays, at most `chunk_bars` rows each, oldest first. Every
+        chunk maps only its own window of the files, so memory use does not
+        grow with the length of the history.
+        """
+        meta = self.meta(symbol, interval)
+        n = meta["count"]
+        if n == 0:
+            return
+        directory = self.path(symbol, interval)
+        open_time = self.load(symbol, interval)["open_time"]
+        lo = 0 if start is None else int(np.searchsorted(open_time, start, side="left"))
+        hi = n if end is None else int(np.searchsorted(open_time, end, side="right"))
+        del open_time
+        for chunk_start in range(lo, hi, chunk_bars):
+            m = min(chunk_bars, hi - chunk_start)
+            yield {
+                name: np.memmap(column_path(directory, name, meta["generation"]), dtype=DTYPES[name], mode="r",
+                                offset=chunk_start * np.dtype(DTYPES[name]).itemsize, shape=(m,))
+                for name in COLUMNS
+            }
+
+    @staticmethod
+    def _append(path, name, n, values):
+        with open(path, "ab") as f:
+            # Drop bytes from an earlier append that was never committed
+            f.truncate(n * np.dtype(DTYPES[name]).itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+
+    @staticmethod
+    def _commit(directory, count, generation):
+        meta_path = os.path.join(directory, "meta.json")
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"count": int(count), "generation": int(generation)}, f)
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,71 @@
+import json
+
+# Verbosity levels, compatible with the `logging` module numbers
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+
+class EventRecorder:
+    """
+    Buffered, structured recorder for strategy events (impulses, signals,
+    rejected orders, stop moves).
+
+    Events below `level` are dropped with a single comparison, so a silent
+    recorder adds no I/O to a backtest. Kept events are buffered and written
+    to `path` as JSON lines every `batch_size` events; without a path they
+    stay in memory in `events`.
+    """
+    def __init__(self, path=None, level=OFF, batch_size=10000):
+        self.path = path
+        self.level = LEVELS.get(level, level) if isinstance(level, str) else level
+        self.batch_size = batch_size
+        self.events = []
+        if path is not None:
+            open(path, "w").close()  # Start a fresh trace
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def record(self, level, kind, bar=None, **fields):
+        """
+        Record one event of type `kind` at bar index `bar`.
+        """
+        if level < self.level:
+            return
+        fields["kind"] = kind
+        fields["level"] = level
+        fields["bar"] = bar
+        self.events.append(fields)
+        if self.path is not None and len(self.events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Append buffered events to the trace file.
+        """
+        if self.path is None or not self.events:
+            return
+        with open(self.path, "a") as f:
+            f.write("\n".join(json.dumps(event, default=float) for event in self.events))
+            f.write("\n")
+        self.events = []
+
+    def close(self):
+        self.flush()
+
+
+def read_events(path, kind=None):
+    """
+    Load a trace written by `EventRecorder`, optionally only one event kind.
+    """
+    events = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                event = json.loads(line)
+                if kind is None or event["kind"] == kind:
+                    events.append(event)
+    return events
@@ -0,0 +1,196 @@
+import numpy as np
+
+from scripts.fibo_signals import ENTRY_BAND, ENTRY_RATIOS, MIDPOINT_BAND, is_valid_order
+
+# Named levels of the dict returned by `detect_impulse`
+LEVEL_RATIOS = {"low": 0.0, "high": 1.0, "50%": 0.5, "61.8%": 0.618, "78.6%": 0.786}
+
+# Relative slack when turning the proportional band into a search window;
+# hits are then confirmed with the exact band test
+_SEARCH_SLACK = 1e-9
+
+
+class FibGrid:
+    """
+    One Fibonacci grid with its entry levels precomputed once.
+
+    Behaves like the `fib_levels` dict of `detect_impulse` (`grid["50%"]`,
+    `**grid`), but the per-bar entry search only compares the close against
+    stored levels instead of rebuilding them.
+    """
+    __slots__ = ("low", "high", "ratios", "levels", "midpoint")
+
+    def __init__(self, low, high, ratios=ENTRY_RATIOS):
+        self.low = low
+        self.high = high
+        self.ratios = tuple(ratios)
+        # Same arithmetic as `entry_candidates`, so levels compare bit for bit
+        self.levels = tuple(low + ratio * (high - low) for ratio in self.ratios)
+        self.midpoint = low + 0.5 * (high - low)
+
+    @classmethod
+    def from_levels(cls, fib_levels, ratios=ENTRY_RATIOS):
+        return cls(fib_levels["low"], fib_levels["high"], ratios)
+
+    def __getitem__(self, name):
+        if name == "low":
+            return self.low
+        if name == "high":
+            return self.high
+        if name == "50%":
+            return self.midpoint
+        return self.low + LEVEL_RATIOS[name] * (self.high - self.low)
+
+    def keys(self):
+        return LEVEL_RATIOS.keys()
+
+    def __repr__(self):
+        return f"FibGrid(low={self.low!r}, high={self.high!r}, ratios={self.ratios!r})"
+
+    def entry_candidates(self, close, ema_value, band=ENTRY_BAND):
+        """
+        Entry levels the close is near while the trend is up, in ratio order.
+        """
+        if not close > ema_value:  # Confirm uptrend
+            return []
+        return [entry for entry in self.levels if abs(close - entry) < band * entry]
+
+    def midpoint_entry(self, close, band=MIDPOINT_BAND):
+        """
+        The 50% level when the close is near it, else None.
+        """
+        if abs(close - self.midpoint) < band * self.midpoint:
+            return self.midpoint
+        return None
+
+    def find_entry(self, close, ema_value, band=ENTRY_BAND):
+        """
+        Same result as `fibo_signals.find_entry` for this grid:
+        (entry, stop_loss, take_profit, is_midpoint) or None.
+        """
+        if not is_valid_order(self.low, close, self.high):
+            return None  # Stop-loss and take-profit are shared by every level
+        candidates = self.entry_candidates(close, ema_value, band)
+        if candidates:
+            return candidates[0], self.low, self.high, False
+        midpoint = self.midpoint_entry(close)
+        if midpoint is not None:
+            return midpoint, self.low, self.high, True
+        return None
+
+
+class FibGridIndex:
+    """
+    Thousands of simultaneous grids for one symbol.
+
+    Grid lows and highs live in slot arrays; every entry level of every grid
+    is kept in one array sorted by price. Because the band is proportional to
+    the level, a close can only be near levels inside
+    [close / (1 + band), close / (1 - band)], so the grids hit by a price (or
+    by a candle's range) are found with two binary searches and the exact band
+    test on the few levels in between, instead of scanning every grid.
+    """
+    def __init__(self, ratios=ENTRY_RATIOS, band=ENTRY_BAND, capacity=64):
+        self.ratios = np.asarray(ratios, dtype=np.float64)
+        self.band = band
+        capacity = max(1, capacity)
+        self.lows = np.zeros(capacity, dtype=np.float64)
+        self.highs = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))  # Free slots, lowest last
+        # Sorted level index: price, owning slot and ratio position
+        self.level_prices = np.empty(0, dtype=np.float64)
+        self.level_slots = np.empty(0, dtype=np.int64)
+        self.level_ranks = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def add(self, low, high):
+        """
+        Add one grid and return its slot id.
+        """
+        return int(self.add_many([low], [high])[0])
+
+    def add_many(self, lows, highs):
+        """
+        Add grids in bulk with one merge of the level index. Returns their slot ids.
+        """
+        lows = np.asarray(lows, dtype=np.float64)
+        highs = np.asarray(highs, dtype=np.float64)
+        count = len(lows)
+        while len(self._free) < count:
+            self._grow()
+        slots = np.array([self._free.pop() for _ in range(count)], dtype=np.int64)
+        self.lows[slots] = lows
+        self.highs[slots] = highs
+        self.alive[slots] = True
+
+        prices = (lows[:, None] + self.ratios[None, :] * (highs - lows)[:, None]).ravel()
+        owners = np.repeat(slots, len(self.ratios))
+        ranks = np.tile(np.arange(len(self.ratios)), count)
+        prices = np.concatenate([self.level_prices, prices])
+        order = np.argsort(prices, kind="stable")
+        self.level_prices = prices[order]
+        self.level_slots = np.concatenate([self.level_slots, owners])[order]
+        self.level_ranks = np.concatenate([self.level_ranks, ranks])[order]
+        return slots
+
+    def remove(self, slot):
+        self.remove_many([slot])
+
+    def remove_many(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        slots = slots[self.alive[slots]]
+        self.alive[slots] = False
+        self._free.extend(int(slot) for slot in slots[::-1])
+        keep = ~np.isin(self.level_slots, slots)
+        self.level_prices = self.level_prices[keep]
+        self.level_slots = self.level_slots[keep]
+        self.level_ranks = self.level_ranks[keep]
+
+    def grid(self, slot):
+        """
+        The grid in `slot` as a `FibGrid`.
+        """
+        return FibGrid(float(self.lows[slot]), float(self.highs[slot]), tuple(self.ratios.tolist()))
+
+    def lookup(self, close):
+        """
+        Grids with an entry level within the band of `close`.
+        Returns (slots, entries) with the first matching level of each grid
+        in ratio order, like `FibGrid.entry_candidates`.
+        """
+        start, stop = self._window(close, close)
+        prices = self.level_prices[start:stop]
+        hit = np.abs(close - prices) < self.band * prices
+        slots = self.level_slots[start:stop][hit]
+        ranks = self.level_ranks[start:stop][hit]
+        prices = prices[hit]
+        order = np.lexsort((ranks, slots))
+        slots, prices = slots[order], prices[order]
+        first = np.ones(len(slots), dtype=bool)
+        first[1:] = slots[1:] != slots[:-1]
+        return slots[first], prices[first]
+
+    def lookup_range(self, low, high):
+        """
+        Slots of grids with an entry zone overlapping the price range [low, high].
+        """
+        start, stop = self._window(low, high)
+        prices = self.level_prices[start:stop]
+        hit = (prices + self.band * prices > low) & (prices - self.band * prices < high)
+        return np.unique(self.level_slots[start:stop][hit])
+
+    def _window(self, low, high):
+        lower = low / (1 + self.band) * (1 - _SEARCH_SLACK)
+        upper = high / (1 - self.band) * (1 + _SEARCH_SLACK)
+        return (np.searchsorted(self.level_prices, lower, side="left"),
+                np.searchsorted(self.level_prices, upper, side="right"))
+
+    def _grow(self):
+        capacity = len(self.lows)
+        self.lows = np.concatenate([self.lows, np.zeros(capacity)])
+        self.highs = np.concatenate([self.highs, np.zeros(capacity)])
+        self.alive = np.concatenate([self.alive, np.zeros(capacity, dtype=bool)])
+        self._free[:0] = range(2 * capacity - 1, capacity - 1, -1)
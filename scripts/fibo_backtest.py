@@ -27,13 +27,57 @@
 # stats = backtest_fibonacci_strategy(initial_balance=10000)
 # print(stats)
 
+import argparse
+import pandas as pd
 from backtesting import Backtest
-from fibo_algo import FibonacciStrategy
-from backtesting.test import GOOG  # Example dataset
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.backfill import BackfillClient
+from scripts.candle_store import DEFAULT_ROOT, CandleStore
+from scripts.event_log import LEVELS, EventRecorder
 
-# Run the backtest
-bt = Backtest(GOOG, FibonacciStrategy, cash=10000, commission=.002)
-stats = bt.run()
-bt.plot()
 
-print(stats)
+def load_candles(symbol, interval, start, end, store_root=DEFAULT_ROOT, offline=False):
+    """
+    Load candles for the backtest from the local candle store, fetching
+    only the missing ranges from Bybit unless `offline` is set.
+    """
+    store = CandleStore(store_root)
+    start_ms = int(pd.Timestamp(start).timestamp() * 1000)
+    end_ms = int(pd.Timestamp(end).timestamp() * 1000) if end else None
+    if not offline:
+        client = BackfillClient()
+        try:
+            store.sync(client.fetch, symbol, interval, start_ms, end_ms)
+        finally:
+            client.close()
+    return store.to_frame(symbol, interval, start_ms, end_ms)
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.fibo_backtest
+    parser = argparse.ArgumentParser(description="Backtest the Fibonacci strategy.")
+    parser.add_argument("--symbol", help="Bybit symbol, e.g. BTCUSDT. Uses GOOG sample data when omitted.")
+    parser.add_argument("--interval", default="15", help="Kline interval (default: 15)")
+    parser.add_argument("--start", default="2024-01-01", help="First candle date")
+    parser.add_argument("--end", help="Last candle date (default: last closed candle)")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="Candle store directory")
+    parser.add_argument("--offline", action="store_true", help="Only read the candle store")
+    parser.add_argument("--trace", help="Write strategy events to this JSONL file")
+    parser.add_argument("--trace-level", default="info", choices=sorted(LEVELS), help="Event verbosity")
+    args = parser.parse_args()
+
+    if args.symbol:
+        data = load_candles(args.symbol, args.interval, args.start, args.end, args.store, args.offline)
+    else:
+        from backtesting.test import GOOG  # Example dataset
+        data = GOOG
+
+    # Run the backtest
+    recorder = EventRecorder(args.trace, level=args.trace_level) if args.trace else None
+    bt = Backtest(data, FibonacciStrategy, cash=10000, commission=.002)
+    stats = bt.run(event_recorder=recorder)
+    if recorder is not None:
+        recorder.close()
+    bt.plot()
+
+    print(stats)
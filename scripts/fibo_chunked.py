@@ -0,0 +1,108 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scripts.fibo_signals import ENTRY_BAND, ENTRY_RATIOS, RISK_PER_TRADE
+from scripts.fibo_vector import Simulation, bar_signals, summarize
+from scripts.indicators import ChunkedEMA, ChunkedRSI
+
+DEFAULT_CHUNK_BARS = 100_000  # Roughly 20 MB of working arrays per chunk
+CONTEXT_BARS = 2  # Bars of the previous chunk that the signals of a chunk look back on
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def replay_chunks(chunks, cash=10000, commission=.002, ema_length=150, rsi_length=12, entry_band=ENTRY_BAND,
+                  risk=RISK_PER_TRADE, fib_ratios=ENTRY_RATIOS):
+    """
+    Run the vectorized strategy over consecutive chunks of one series.
+
+    `chunks` yields dicts of column arrays (`open_time` in ms, `open`, `high`,
+    `low`, `close`), oldest first, such as `CandleStore.iter_chunks`. The EMA,
+    RSI, broker and strategy state carry over from one chunk to the next, so
+    the result is the same dict `VectorBacktest.run` returns for the whole
+    series, while only one chunk is held in memory at a time.
+    """
+    ema_state = ChunkedEMA(ema_length)
+    rsi_state = ChunkedRSI(rsi_length)
+    simulation = Simulation(cash, commission, entry_band, risk, fib_ratios)
+    warmup = [None, None]  # First bar where the EMA and the RSI are defined
+    context = None  # Last bars of the previous chunk, with their EMA
+    bars = 0  # Bars in the chunks before the current one
+    last_close = None
+    for chunk in chunks:
+        close = np.asarray(chunk["close"], dtype=np.float64)
+        if len(close) == 0:
+            continue
+        ema_values = ema_state.update(close)
+        for k, values in enumerate((ema_values, rsi_state.update(close))):
+            if warmup[k] is None:
+                defined = ~np.isnan(values)
+                if defined.any():
+                    warmup[k] = bars + int(defined.argmax())
+        if simulation.next_bar is None and None not in warmup:
+            simulation.next_bar = 1 + max(warmup)  # Same first bar as `VectorBacktest`
+
+        columns = {name: np.asarray(chunk[name], dtype=np.float64) for name in PRICE_COLUMNS}
+        columns["open_time"] = np.asarray(chunk["open_time"], dtype=np.int64)
+        columns["ema"] = ema_values
+        offset = bars
+        if context is not None:
+            columns = {name: np.concatenate([context[name], values]) for name, values in columns.items()}
+            offset -= len(context["close"])
+        s = bar_signals(columns["high"], columns["low"], columns["close"], columns["ema"], entry_band, fib_ratios)
+        times = pd.to_datetime(columns["open_time"], unit="ms")
+        simulation.advance(columns["open"], columns["high"], columns["low"], columns["close"], times, s, offset)
+
+        bars += len(close)
+        last_close = close[-1]
+        # Copies, so no window of the previous chunk stays mapped
+        context = {name: np.array(values[-CONTEXT_BARS:]) for name, values in columns.items()}
+    if last_close is None:
+        raise ValueError("No candles to replay")
+    return simulation.result(last_close, "datetime64[ns]")
+
+
+class ChunkedBacktest:
+    """
+    Memory-bounded `VectorBacktest` for histories larger than RAM.
+
+    Candles are streamed from the `CandleStore` in windows of `chunk_bars`
+    rows, so peak memory depends on the chunk size, not on the length of the
+    history. Trades are identical to an in-memory run over the same candles.
+    """
+    def __init__(self, store, symbol, interval, cash=10000, commission=.002, chunk_bars=DEFAULT_CHUNK_BARS,
+                 start=None, end=None):
+        self.store = store
+        self.symbol = symbol
+        self.interval = interval
+        self.cash = cash
+        self.commission = commission
+        self.chunk_bars = chunk_bars
+        self.start = start  # Open times in ms, inclusive
+        self.end = end
+
+    def run(self, ema_length=150, rsi_length=12, entry_band=ENTRY_BAND, risk=RISK_PER_TRADE, fib_ratios=ENTRY_RATIOS):
+        """
+        Simulate the strategy. Returns the same dict as `VectorBacktest.run`.
+        """
+        chunks = self.store.iter_chunks(self.symbol, self.interval, self.chunk_bars, self.start, self.end)
+        return replay_chunks(chunks, self.cash, self.commission, ema_length, rsi_length, entry_band, risk, fib_ratios)
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.fibo_chunked --symbols BTCUSDT --interval 1
+    from scripts.candle_store import DEFAULT_ROOT, CandleStore
+
+    parser = argparse.ArgumentParser(description="Backtest long candle store histories in bounded memory.")
+    parser.add_argument("--symbols", nargs="+", required=True, help="Symbols in the candle store")
+    parser.add_argument("--interval", default="15", help="Kline interval (default: 15)")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="Candle store directory")
+    parser.add_argument("--chunk-bars", type=int, default=DEFAULT_CHUNK_BARS, help="Candles per chunk")
+    parser.add_argument("--cash", type=float, default=10000, help="Starting cash")
+    args = parser.parse_args()
+
+    store = CandleStore(args.store)
+    results = {symbol: ChunkedBacktest(store, symbol, args.interval, cash=args.cash, chunk_bars=args.chunk_bars).run()
+               for symbol in args.symbols}
+    print(summarize(results, args.cash).to_string())
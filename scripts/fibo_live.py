@@ -0,0 +1,127 @@
+import numpy as np
+from scripts.indicators import StreamingEMA, StreamingRSI, ema
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_NONE, detect_impulse
+from scripts.fib_grid import FibGrid
+from scripts.metrics import span
+
+
+class LiveFibonacciStrategy:
+    """
+    Incremental version of `FibonacciStrategy` for live trading.
+
+    Seed it once with a candle history, then feed it one candle at a time;
+    each update costs O(1) regardless of the EMA/RSI window.
+    """
+    def __init__(self, ema_length=150, rsi_length=12):
+        self.ema = StreamingEMA(ema_length)
+        self.rsi = StreamingRSI(rsi_length)
+        self.last_candle = None  # (high, low) of the last closed candle
+        self.last_closed_time = None  # Index of the last closed candle
+        self.active_fib = None  # Track active Fibonacci grid (FibGrid)
+        self.position = None  # (stop_loss, take_profit) of the open position
+
+    def seed(self, df):
+        """
+        Initialize indicators and grid state from a candle DataFrame with
+        `high`, `low` and `close` columns. All rows are treated as closed.
+        """
+        closes = df["close"].to_numpy(dtype=np.float64)
+        highs = df["high"].to_numpy(dtype=np.float64)
+        lows = df["low"].to_numpy(dtype=np.float64)
+        ema_values = ema(closes, self.ema.length) if len(closes) else closes
+        self.ema.seed(closes)
+        self.rsi.seed(closes)
+
+        # Replay the grid state machine so an impulse in the history is kept
+        self.last_candle = None
+        self.active_fib = None
+        self.position = None
+        for i in range(len(closes)):
+            self._step(highs[i], lows[i], closes[i], ema_values[i])
+        if len(df):
+            self.last_closed_time = df.index[-1]
+        return self
+
+    def update(self, high, low, close, closed=True):
+        """
+        Evaluate one candle and return a result dict with `signal`,
+        `stop_loss`, `take_profit`, `ema` and `rsi`.
+        In-progress candles (closed=False) are evaluated without changing state.
+        """
+        with span("indicators"):
+            ema_value = self.ema.update(close, closed)
+            rsi_value = self.rsi.update(close, closed)
+        if closed:
+            result = self._step(high, low, close, ema_value)
+        else:
+            result = self._preview(close, ema_value)
+        result["ema"] = ema_value
+        result["rsi"] = rsi_value
+        return result
+
+    def sync(self, df, includes_current=True):
+        """
+        Feed the candles of `df` that are newer than the last closed candle.
+        Unless `includes_current` is False, the last row is the in-progress
+        candle and is skipped. Returns the result of the most recent closed
+        candle, or a no-signal result if none was new.
+        """
+        result = self._no_signal()
+        new = df if self.last_closed_time is None else df[df.index > self.last_closed_time]
+        closed = new.iloc[:-1] if includes_current else new
+        for row in closed.itertuples():
+            result = self.update(row.high, row.low, row.close)
+        if len(closed):
+            self.last_closed_time = closed.index[-1]
+            result["ema"] = self.ema.value
+            result["rsi"] = self.rsi.value
+        return result
+
+    def _step(self, high, low, close, ema_value):
+        """
+        Mirror of `FibonacciStrategy.next` for one closed candle.
+        """
+        result = self._no_signal()
+        position_closed = False
+        if self.position is not None:
+            # The exchange closes the position when SL or TP is touched
+            stop_loss, take_profit = self.position
+            if low <= stop_loss or high >= take_profit:
+                self.position = None
+                position_closed = True
+
+        if self.active_fib is None:
+            if self.last_candle is not None:
+                impulse_detected, fib_levels = detect_impulse(
+                    self.last_candle[0], self.last_candle[1], high, low
+                )
+                if impulse_detected:
+                    self.active_fib = FibGrid.from_levels(fib_levels)
+        else:
+            result = self._preview(close, ema_value)
+            position_opened = result["signal"] == SIGNAL_BUY and not result["midpoint"]
+            if not position_opened and self.position is None:
+                # Reset Fibonacci levels if no position is open
+                self.active_fib = None
+            if result["signal"] == SIGNAL_BUY:
+                self.position = (result["stop_loss"], result["take_profit"])
+        self.last_candle = (high, low)
+        result["position_closed"] = position_closed
+        return result
+
+    def _preview(self, close, ema_value):
+        result = self._no_signal()
+        if self.active_fib is None:
+            return result
+        entry = self.active_fib.find_entry(close, ema_value)
+        if entry is not None:
+            result.update(
+                signal=SIGNAL_BUY, entry=entry[0], stop_loss=entry[1],
+                take_profit=entry[2], midpoint=entry[3],
+            )
+        return result
+
+    @staticmethod
+    def _no_signal():
+        return {"signal": SIGNAL_NONE, "entry": 0.0, "stop_loss": 0.0, "take_profit": 0.0,
+                "midpoint": False, "position_closed": False}
@@ -0,0 +1,139 @@
+# Fibonacci signal rules shared by the backtest strategy and the live bot.
+# Nothing here imports `backtesting`, so the live path stays lightweight.
+import numpy as np
+
+from scripts.metrics import timed
+
+ENTRY_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)  # Retracement levels used for entries
+ENTRY_BAND = 0.02  # Close must be within 2% of an entry level
+MIDPOINT_BAND = 0.01  # Close must be within 1% of the 50% level for the fallback entry
+RISK_PER_TRADE = 0.02  # Fraction of equity risked per trade
+
+# Signal codes returned by the live evaluators
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = 2
+
+
+@timed("detect_impulse")
+def detect_impulse(first_high, first_low, second_high, second_low):
+    """
+    Detects an impulse movement based on two consecutive candles.
+    Returns (impulse_detected, fib_levels).
+    """
+    # Tightened impulse criteria
+    impulse_detected = (
+        second_high > first_high and
+        second_low >= first_low + 0.5 * (first_high - first_low)
+    )
+
+    if impulse_detected:
+        fib_levels = {
+            "low": first_low,
+            "high": first_high,
+            "50%": first_low + 0.5 * (first_high - first_low),
+            "61.8%": first_low + 0.618 * (first_high - first_low),
+            "78.6%": first_low + 0.786 * (first_high - first_low),
+        }
+        return True, fib_levels
+    return False, None
+
+
+def impulse_flags(high, low):
+    """
+    Array version of `detect_impulse`: flags[i] is True when bars i - 1 and i
+    form an impulse. The grid of an impulse at bar i is spanned by bar i - 1.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    flags = np.zeros(len(high), dtype=bool)
+    first_high, first_low = high[:-1], low[:-1]
+    flags[1:] = (high[1:] > first_high) & (low[1:] >= first_low + 0.5 * (first_high - first_low))
+    return flags
+
+
+def entry_candidates(fib_levels, close, ema_value, ratios=ENTRY_RATIOS, band=ENTRY_BAND):
+    """
+    Yield (entry, stop_loss, take_profit) for every entry level the close is
+    near while the trend is up, in ratio order.
+    """
+    if not close > ema_value:  # Confirm uptrend
+        return
+    low, high = fib_levels["low"], fib_levels["high"]
+    for ratio in ratios:
+        entry = low + ratio * (high - low)
+        if abs(close - entry) < band * entry:
+            yield entry, low, high  # Same TP and SL for all entries
+
+
+def is_valid_order(stop_loss, close, take_profit):
+    """
+    Checks that SL < LIMIT < TP.
+    """
+    return stop_loss < close < take_profit
+
+
+def midpoint_entry(fib_levels, close, band=MIDPOINT_BAND):
+    """
+    Returns (entry, stop_loss, take_profit) when the close is near the 50% level.
+    """
+    if abs(close - fib_levels["50%"]) < band * fib_levels["50%"]:
+        return fib_levels["50%"], fib_levels["low"], fib_levels["high"]
+    return None
+
+
+def position_size(equity, close, stop_loss, risk=RISK_PER_TRADE):
+    """
+    Size a position so that hitting the stop-loss loses `risk` of equity.
+    Returns a non-positive value when no valid size exists.
+    """
+    risk_per_trade = risk * equity
+    stop_loss_distance = abs(close - stop_loss)
+    size = risk_per_trade / stop_loss_distance
+    if size <= 0:
+        return size
+    if size < 1:
+        return max(size, 0.01)  # Minimum fraction of equity
+    return round(size)  # Whole number of units
+
+
+@timed("find_entry")
+def find_entry(fib_levels, close, ema_value, ratios=ENTRY_RATIOS, band=ENTRY_BAND):
+    """
+    Returns the first valid (entry, stop_loss, take_profit) among the entry
+    levels, falling back to the 50% level, or None. The fallback entry is
+    flagged by a fourth element set to True.
+    """
+    for entry, sl, tp in entry_candidates(fib_levels, close, ema_value, ratios, band):
+        if is_valid_order(sl, close, tp):
+            return entry, sl, tp, False
+    midpoint = midpoint_entry(fib_levels, close)
+    if midpoint is not None and is_valid_order(midpoint[1], close, midpoint[2]):
+        return midpoint + (True,)
+    return None
+
+
+def entry_signals(grid_low, grid_high, close, ema_values, ratios=ENTRY_RATIOS, band=ENTRY_BAND):
+    """
+    Array version of `find_entry` for one grid per element.
+    Returns (entry, regular, midpoint): the entry level (nan without a signal)
+    and masks for regular and 50% fallback entries. Stop-loss and take-profit
+    are the grid low and high.
+    """
+    grid_low = np.asarray(grid_low, dtype=np.float64)
+    grid_high = np.asarray(grid_high, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    span = grid_high - grid_low
+    valid = (grid_low < close) & (close < grid_high)
+    uptrend = close > np.asarray(ema_values, dtype=np.float64)
+
+    entry = np.full(len(close), np.nan)
+    for ratio in reversed(ratios):  # Assigned last wins, so the first ratio takes precedence
+        level = grid_low + ratio * span
+        entry = np.where(uptrend & (np.abs(close - level) < band * level), level, entry)
+    regular = valid & ~np.isnan(entry)
+
+    middle = grid_low + 0.5 * span
+    midpoint = valid & ~regular & (np.abs(close - middle) < MIDPOINT_BAND * middle)
+    entry = np.where(regular, entry, np.where(midpoint, middle, np.nan))
+    return entry, regular, midpoint
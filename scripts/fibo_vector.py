@@ -0,0 +1,304 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scripts.fib_grid import FibGrid
+from scripts.fibo_signals import ENTRY_BAND, ENTRY_RATIOS, RISK_PER_TRADE, entry_signals, impulse_flags, position_size
+from scripts.indicators import ema, rsi
+
+TRADE_COLUMNS = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "SL", "TP", "PnL"]
+
+
+def _warmup_bars(*indicators):
+    """
+    Number of leading bars `backtesting` skips while indicators are still nan.
+    """
+    return max(int(np.isnan(indicator).argmin()) for indicator in indicators)
+
+
+def order_units(size, price, margin_available, commission):
+    """
+    Units the `backtesting` broker fills for a market order of `size` at
+    `price`, or 0 when it cancels the order. Sizes below 1 are a fraction
+    of the available margin.
+    """
+    price_with_fee = price + abs(size) * price * commission / abs(size)
+    if -1 < size < 1:
+        size = int((margin_available * abs(size)) // price_with_fee)
+    size = int(size)
+    if not size or size * price_with_fee > margin_available:
+        return 0
+    return size
+
+
+def bar_signals(high, low, close, ema_values, entry_band=ENTRY_BAND, fib_ratios=ENTRY_RATIOS):
+    """
+    Impulse flags and entry signals for a stretch of bars.
+
+    `entry`, `regular` and `midpoint` at bar i evaluate the grid of an
+    impulse at bar i - 1 (spanned by bar i - 2) against the close of bar i,
+    which is how every grid is first evaluated by the strategy. The first two
+    bars of the stretch only provide context.
+    """
+    n = len(close)
+    grid_low = np.full(n, np.nan)
+    grid_high = np.full(n, np.nan)
+    grid_low[2:] = low[:-2]
+    grid_high[2:] = high[:-2]
+    entry, regular, midpoint = entry_signals(grid_low, grid_high, close, ema_values, fib_ratios, entry_band)
+    return {
+        "ema": ema_values,
+        "impulse": impulse_flags(high, low),
+        "entry": entry,
+        "regular": regular,
+        "midpoint": midpoint,
+    }
+
+
+class Simulation:
+    """
+    Broker and strategy state of a vectorized run.
+
+    Market orders fill at the next open, relative sizes are converted with the
+    available margin and cancelled when it is insufficient, stop-losses are
+    checked before take-profits, and commission is charged on entry and exit.
+    `advance` replays one stretch of bars and can be called again with the
+    bars that follow, so a long history can be replayed piece by piece.
+    """
+    def __init__(self, cash=10000, commission=.002, entry_band=ENTRY_BAND, risk=RISK_PER_TRADE,
+                 fib_ratios=ENTRY_RATIOS):
+        self.cash = cash
+        self.commission = commission
+        self.entry_band = entry_band
+        self.risk = risk
+        self.fib_ratios = fib_ratios
+        self.next_bar = None  # Next bar to replay; None until the indicators are warmed up
+        self.trades = []  # Open trades as [size, entry_price, sl, tp, entry_bar, entry_time], oldest first
+        self.closed = []
+        self.pending = None  # (size, sl, tp) of the market order placed on the previous bar
+        self.grid = None  # Active FibGrid
+        self.grid_bar = None  # Bar the active grid was detected on
+        self.cancelled = 0
+        self.out_of_money = False
+
+    def advance(self, open_, high, low, close, times, signals, offset=0):
+        """
+        Replay from `next_bar` to the end of the given arrays. Element i of
+        every array is bar `offset + i`; the arrays must start at least two
+        bars before `next_bar`. `signals` comes from `bar_signals` on the same
+        bars and `times` labels them for the trade list.
+        """
+        if self.out_of_money or self.next_bar is None:
+            return
+        ema_values, impulse = signals["ema"], signals["impulse"]
+        entry_signal, regular, midpoint = signals["entry"], signals["regular"], signals["midpoint"]
+        impulse_bars = np.flatnonzero(impulse)
+        n = len(close)
+        fee = self.commission
+        entry_band, risk, fib_ratios = self.entry_band, self.risk, self.fib_ratios
+
+        cash = self.cash
+        trades = self.trades
+        closed = self.closed
+        pending = self.pending
+        grid = self.grid
+        grid_bar = self.grid_bar
+
+        def close_trade(trade, price, bar):
+            nonlocal cash
+            size, entry_price, sl, tp, entry_bar, entry_time = trade
+            trades.remove(trade)
+            commission = size * price * fee
+            cash += size * (price - entry_price) - commission
+            pnl = size * (price - entry_price) - (commission + size * entry_price * fee)
+            closed.append((size, entry_bar, offset + bar, entry_price, price, sl, tp, pnl, entry_time, times[bar]))
+
+        def check_exits(bar, candidates):
+            # Stop-loss orders of newer trades are queued first, take-profits by age
+            for trade in reversed(candidates):
+                if low[bar] <= trade[2]:
+                    close_trade(trade, min(open_[bar], trade[2]), bar)
+            for trade in candidates:
+                if trade in trades and high[bar] >= trade[3]:
+                    close_trade(trade, max(open_[bar], trade[3]), bar)
+
+        i = self.next_bar - offset
+        while i < n:
+            if grid is None and pending is None and not trades:
+                # Nothing can happen before the next impulse
+                k = np.searchsorted(impulse_bars, i)
+                if k == len(impulse_bars):
+                    i = n
+                    break
+                i = int(impulse_bars[k])
+                grid = FibGrid(low[i - 1], high[i - 1], fib_ratios)
+                grid_bar = offset + i
+                i += 1
+                continue
+
+            # Broker: exits of open trades, then the pending entry at this open
+            if trades:
+                check_exits(i, list(trades))
+            if pending is not None:
+                size, sl, tp = pending
+                pending = None
+                price = open_[i]
+                # Same operation order as the broker, so sizes round identically
+                equity = cash + (close[i] * sum(t[0] for t in trades) - sum(t[0] * t[1] for t in trades))
+                margin_available = max(0, equity - sum(t[0] * close[i] for t in trades))
+                size = order_units(size, price, margin_available, fee)
+                if not size:
+                    self.cancelled += 1
+                else:
+                    trade = [size, price, sl, tp, offset + i, times[i]]
+                    trades.append(trade)
+                    cash -= size * price * fee
+                    check_exits(i, [trade])  # SL/TP may hit on the entry bar
+
+            equity = cash + (close[i] * sum(t[0] for t in trades) - sum(t[0] * t[1] for t in trades))
+            if equity <= 0:
+                for trade in list(trades):
+                    close_trade(trade, close[i], i)
+                cash = 0
+                self.out_of_money = True
+                break
+
+            # Strategy
+            if grid is None:
+                if impulse[i]:
+                    grid = FibGrid(low[i - 1], high[i - 1], fib_ratios)
+                    grid_bar = offset + i
+            else:
+                if grid_bar == offset + i - 1:
+                    found = (entry_signal[i], grid.low, grid.high, midpoint[i]) \
+                        if regular[i] or midpoint[i] else None
+                else:
+                    found = grid.find_entry(close[i], ema_values[i], entry_band)
+                keep = False
+                if found is not None:
+                    entry, sl, tp, is_midpoint = found
+                    size = position_size(equity, close[i], sl, risk)
+                    if size > 0:
+                        pending = (size, sl, tp)
+                        keep = not is_midpoint  # A regular entry keeps the grid for pyramiding
+                if not keep and not trades:
+                    grid = None
+            i += 1
+
+        self.cash = cash
+        self.pending = pending
+        self.grid = grid
+        self.grid_bar = grid_bar
+        self.next_bar = offset + i
+
+    def result(self, last_close, time_dtype):
+        """
+        Results once every bar is replayed: the closed `trades` (DataFrame),
+        `equity_final` at `last_close`, `open_trades` and the number of
+        orders `cancelled` for insufficient margin.
+        """
+        trades = self.trades
+        if self.out_of_money:
+            equity_final = 0.0
+        else:
+            equity_final = self.cash + (last_close * sum(t[0] for t in trades) - sum(t[0] * t[1] for t in trades))
+        result = pd.DataFrame([trade[:8] for trade in self.closed], columns=TRADE_COLUMNS)
+        result["EntryTime"] = pd.Index([trade[8] for trade in self.closed], dtype=time_dtype)
+        result["ExitTime"] = pd.Index([trade[9] for trade in self.closed], dtype=time_dtype)
+        return {
+            "trades": result,
+            "equity_final": equity_final,
+            "open_trades": len(trades),
+            "cancelled": self.cancelled,
+        }
+
+
+class VectorBacktest:
+    """
+    Array-based replica of `Backtest(data, FibonacciStrategy)` for fast screening.
+
+    Impulse flags and the signals of every freshly detected grid are computed
+    for the whole series up front. A single `Simulation` pass then replays the
+    broker. Bars without a grid, order or open trade are skipped by jumping
+    straight to the next impulse. Results match `backtesting` trade for trade.
+    """
+    def __init__(self, data, cash=10000, commission=.002):
+        self.index = data.index
+        self.open = data["Open"].to_numpy(dtype=np.float64)
+        self.high = data["High"].to_numpy(dtype=np.float64)
+        self.low = data["Low"].to_numpy(dtype=np.float64)
+        self.close = data["Close"].to_numpy(dtype=np.float64)
+        self.cash = cash
+        self.commission = commission
+
+    def signals(self, ema_length=150, rsi_length=12, entry_band=ENTRY_BAND, fib_ratios=ENTRY_RATIOS):
+        """
+        Precompute indicator and signal arrays for the whole series
+        (see `bar_signals`), and the first bar the strategy runs on.
+        """
+        ema_values = ema(self.close, ema_length)
+        rsi_values = rsi(self.close, rsi_length)
+        s = bar_signals(self.high, self.low, self.close, ema_values, entry_band, fib_ratios)
+        s["start"] = 1 + _warmup_bars(ema_values, rsi_values)
+        return s
+
+    def run(self, ema_length=150, rsi_length=12, entry_band=ENTRY_BAND, risk=RISK_PER_TRADE, fib_ratios=ENTRY_RATIOS):
+        """
+        Simulate the strategy. Returns a dict with the closed `trades`
+        (DataFrame), `equity_final`, `open_trades` and the number of orders
+        `cancelled` for insufficient margin.
+        """
+        s = self.signals(ema_length, rsi_length, entry_band, fib_ratios)
+        simulation = Simulation(self.cash, self.commission, entry_band, risk, fib_ratios)
+        simulation.next_bar = s["start"]
+        simulation.advance(self.open, self.high, self.low, self.close, self.index, s)
+        return simulation.result(self.close[-1], self.index.dtype)
+
+
+def summarize(results, cash):
+    """
+    One row of summary statistics per `VectorBacktest.run` result
+    (name -> result), best return first.
+    """
+    rows = []
+    for name, result in results.items():
+        trades = result["trades"]
+        rows.append({
+            "dataset": name,
+            "Return [%]": (result["equity_final"] - cash) / cash * 100,
+            "Win Rate [%]": (trades["PnL"] > 0).mean() * 100 if len(trades) else np.nan,
+            "# Trades": len(trades),
+            "Equity Final [$]": result["equity_final"],
+        })
+    summary = pd.DataFrame(rows).sort_values("Return [%]", ascending=False, na_position="last")
+    return summary.reset_index(drop=True)
+
+
+def screen(datasets, cash=10000, commission=.002, **params):
+    """
+    Run the vectorized strategy on every dataset (name -> OHLCV DataFrame).
+    Returns one row of summary statistics per dataset, best return first.
+    """
+    results = {name: VectorBacktest(df, cash, commission).run(**params) for name, df in datasets.items()}
+    return summarize(results, cash)
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.fibo_vector --symbols BTCUSDT ETHUSDT
+    from scripts.candle_store import DEFAULT_ROOT, CandleStore
+
+    parser = argparse.ArgumentParser(description="Fast vectorized screen of the Fibonacci strategy.")
+    parser.add_argument("--symbols", nargs="*", help="Symbols in the candle store. Uses GOOG sample data when omitted.")
+    parser.add_argument("--interval", default="15", help="Kline interval (default: 15)")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="Candle store directory")
+    args = parser.parse_args()
+
+    if args.symbols:
+        store = CandleStore(args.store)
+        data = {symbol: store.to_frame(symbol, args.interval) for symbol in args.symbols}
+    else:
+        from backtesting.test import GOOG  # Example dataset
+        data = {"GOOG": GOOG}
+
+    print(screen(data).to_string())
@@ -0,0 +1,314 @@
+import numpy as np
+from scripts.metrics import timed
+
+# Largest growth factor allowed inside one block of the linear recurrence.
+# Keeps the rescaled partial sums far away from float64 overflow.
+_MAX_BLOCK_SCALE = 1e150
+
+
+class _LinearRecurrence:
+    """
+    Solve y[i] = decay * y[i - 1] + gain * x[i] with y[-1] = initial.
+
+    The recurrence is unrolled block by block: inside a block every value is
+    a cumulative sum of inputs rescaled by powers of `decay`, so the only
+    Python-level loop is over blocks, not over elements. `feed` can be called
+    with consecutive chunks of the input: the block position, its carry and
+    the partial sum are kept, so the output is bit-identical to one call over
+    the whole input.
+    """
+    def __init__(self, decay, gain, initial):
+        self.decay = decay
+        self.gain = gain
+        # Inputs per block; a decay of 1 or more is never rescaled
+        self.block = max(1, int(np.log(_MAX_BLOCK_SCALE) / -np.log(decay))) if 0 < decay < 1 else None
+        self.carry = initial  # Output before the current block
+        self.partial = 0.0  # Cumulative rescaled input of the current block
+        self.phase = 0  # Inputs of the current block already consumed
+        self._powers = np.empty(0)  # decay^j
+        self._inverse_powers = np.empty(0)  # decay^-j
+
+    def feed(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        n = len(x)
+        out = np.empty(n, dtype=np.float64)
+        if n == 0:
+            return out
+        if self.decay == 0:
+            out[:] = self.gain * x
+            return out
+
+        start = 0
+        while start < n:
+            p = self.phase
+            m = n - start if self.block is None else min(self.block - p, n - start)
+            powers, inverse_powers = self._block_powers(p + m)
+            scaled = x[start:start + m] * inverse_powers[p:p + m]
+            if p:
+                scaled[0] += self.partial
+            np.cumsum(scaled, out=scaled)
+            out[start:start + m] = self.decay * powers[p:p + m] * self.carry + self.gain * powers[p:p + m] * scaled
+            self.partial = scaled[-1]
+            self.phase = p + m
+            if self.phase == self.block:
+                self.carry = out[start + m - 1]
+                self.partial = 0.0
+                self.phase = 0
+            start += m
+        return out
+
+    def _block_powers(self, size):
+        if len(self._powers) < size:
+            if self.block is not None:
+                size = min(self.block, max(size, 2 * len(self._powers)))  # Grow geometrically
+            steps = np.arange(size, dtype=np.float64)
+            self._powers = self.decay ** steps
+            self._inverse_powers = self.decay ** -steps
+        return self._powers, self._inverse_powers
+
+
+def _linear_recurrence(x, decay, gain, initial):
+    """
+    Solve y[i] = decay * y[i - 1] + gain * x[i] with y[-1] = initial.
+    """
+    return _LinearRecurrence(decay, gain, initial).feed(x)
+
+
+@timed("ema")
+def ema(data, length):
+    """
+    Calculate Exponential Moving Average (EMA).
+    """
+    data = np.asarray(data, dtype=np.float64)
+    alpha = 2 / (length + 1)
+    ema = np.empty_like(data)
+    if len(data) == 0:
+        return ema
+    ema[0] = data[0]  # Initialize with the first value
+    ema[1:] = _linear_recurrence(data[1:], 1 - alpha, alpha, data[0])
+    return ema
+
+
+def _wilder_averages(data, length):
+    """
+    Return the Wilder-smoothed average gain and loss arrays used by `rsi`.
+    """
+    deltas = np.diff(data)
+    gains = np.maximum(deltas, 0)
+    losses = -np.minimum(deltas, 0)
+    avg_gain = np.empty_like(data)
+    avg_loss = np.empty_like(data)
+    avg_gain[:length] = np.mean(gains[:length])
+    avg_loss[:length] = np.mean(losses[:length])
+    if len(data) > length:
+        # avg[i] = (avg[i - 1] * (length - 1) + x[i - 1]) / length
+        decay = (length - 1) / length
+        avg_gain[length:] = _linear_recurrence(gains[length - 1:], decay, 1 / length, avg_gain[length - 1])
+        avg_loss[length:] = _linear_recurrence(losses[length - 1:], decay, 1 / length, avg_loss[length - 1])
+    return avg_gain, avg_loss
+
+
+@timed("rsi")
+def rsi(data, length):
+    """
+    Calculate Relative Strength Index (RSI) with Wilder's smoothing.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    avg_gain, avg_loss = _wilder_averages(data, length)
+    rs = avg_gain[length:] / avg_loss[length:]
+    rsi = np.zeros_like(data)
+    rsi[length:] = 100 - (100 / (1 + rs))
+    return rsi
+
+
+class StreamingEMA:
+    """
+    EMA that is seeded from history once and then updated in O(1) per bar.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.value = None  # EMA of the last closed bar
+
+    def seed(self, history):
+        """
+        Initialize the running EMA from an array of closed prices.
+        """
+        history = np.asarray(history, dtype=np.float64)
+        self.value = float(ema(history, self.length)[-1]) if len(history) else None
+        return self.value
+
+    def update(self, price, closed=True):
+        """
+        Return the EMA including `price`. Only closed bars advance the state,
+        so an in-progress candle can be re-evaluated on every tick.
+        """
+        if self.value is None:
+            value = float(price)
+        else:
+            value = self.alpha * price + (1 - self.alpha) * self.value
+        if closed:
+            self.value = value
+        return value
+
+
+class StreamingRSI:
+    """
+    Wilder RSI that is seeded from history once and then updated in O(1) per bar.
+    Matches `rsi` bar for bar, including the zero warm-up period.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.avg_gain = None
+        self.avg_loss = None
+        self.last_price = None  # Close of the last closed bar
+        self.value = 0.0
+        self._warmup = []  # Closes collected until the averages can be seeded
+
+    def seed(self, history):
+        """
+        Initialize the running averages from an array of closed prices.
+        """
+        history = np.asarray(history, dtype=np.float64)
+        self.avg_gain = self.avg_loss = self.last_price = None
+        self.value = 0.0
+        self._warmup = []
+        if len(history) <= self.length:
+            self._warmup = [float(price) for price in history]
+            return self.value
+        avg_gain, avg_loss = _wilder_averages(history, self.length)
+        self.avg_gain = float(avg_gain[-1])
+        self.avg_loss = float(avg_loss[-1])
+        self.last_price = float(history[-1])
+        self.value = self._rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def update(self, price, closed=True):
+        """
+        Return the RSI including `price`. Only closed bars advance the state.
+        """
+        if self.avg_gain is None:
+            if not closed:
+                return self.value
+            self._warmup.append(float(price))
+            if len(self._warmup) > self.length:
+                return self.seed(self._warmup)
+            return self.value
+
+        delta = price - self.last_price
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        avg_gain = (self.avg_gain * (self.length - 1) + gain) / self.length
+        avg_loss = (self.avg_loss * (self.length - 1) + loss) / self.length
+        value = self._rsi(avg_gain, avg_loss)
+        if closed:
+            self.avg_gain, self.avg_loss = avg_gain, avg_loss
+            self.last_price = float(price)
+            self.value = value
+        return value
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if avg_loss == 0:
+            # Same results numpy gives for x / 0 in `rsi`
+            return 100.0 if avg_gain > 0 else float("nan")
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class ChunkedEMA:
+    """
+    `ema` of a series fed in consecutive chunks. The concatenated output is
+    bit-identical to `ema` over the whole series.
+    """
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self._recurrence = None
+
+    def update(self, chunk):
+        """
+        Return the EMA of the prices in `chunk`, continuing the series.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if self._recurrence is not None:
+            return self._recurrence.feed(chunk)
+        out = np.empty_like(chunk)
+        if len(chunk):
+            out[0] = chunk[0]  # Initialize with the first value
+            self._recurrence = _LinearRecurrence(1 - self.alpha, self.alpha, chunk[0])
+            out[1:] = self._recurrence.feed(chunk[1:])
+        return out
+
+
+class ChunkedRSI:
+    """
+    `rsi` of a series fed in consecutive chunks. The concatenated output is
+    bit-identical to `rsi` over the whole series.
+    """
+    def __init__(self, length):
+        self.length = length
+        self._head = []  # First closes, until the averages can be seeded
+        self._last_price = None
+        self._gain = None
+        self._loss = None
+
+    def update(self, chunk):
+        """
+        Return the RSI of the prices in `chunk`, continuing the series.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        out = np.zeros_like(chunk)
+        start = 0
+        if self._gain is None:
+            start = min(len(chunk), self.length + 1 - len(self._head))
+            self._head.extend(chunk[:start].tolist())
+            if len(self._head) <= self.length:
+                return out
+            # Seed with the mean of the first `length` changes, as `rsi` does
+            deltas = np.diff(self._head)
+            decay = (self.length - 1) / self.length
+            self._gain = _LinearRecurrence(decay, 1 / self.length, np.mean(np.maximum(deltas, 0)[:self.length]))
+            self._loss = _LinearRecurrence(decay, 1 / self.length, np.mean(-np.minimum(deltas, 0)[:self.length]))
+            self._last_price = self._head[-2]
+            start -= 1  # The last seeding close is the first bar with an RSI
+
+        rest = chunk[start:]
+        if len(rest):
+            deltas = np.diff(rest, prepend=self._last_price)
+            avg_gain = self._gain.feed(np.maximum(deltas, 0))
+            avg_loss = self._loss.feed(-np.minimum(deltas, 0))
+            out[start:] = 100 - (100 / (1 + avg_gain / avg_loss))
+            self._last_price = rest[-1]
+        return out
+
+
+def ema_loop(data, length):
+    """
+    Reference EMA computed element by element. Used to validate `ema`.
+    """
+    alpha = 2 / (length + 1)
+    ema = np.empty_like(data)
+    ema[0] = data[0]  # Initialize with the first value
+    for i in range(1, len(data)):
+        ema[i] = alpha * data[i] + (1 - alpha) * ema[i - 1]
+    return ema
+
+
+def rsi_loop(data, length):
+    """
+    Reference RSI computed element by element. Used to validate `rsi`.
+    """
+    deltas = np.diff(data)
+    gains = np.maximum(deltas, 0)
+    losses = -np.minimum(deltas, 0)
+    avg_gain = np.empty_like(data)
+    avg_loss = np.empty_like(data)
+    avg_gain[:length] = np.mean(gains[:length])
+    avg_loss[:length] = np.mean(losses[:length])
+    for i in range(length, len(data)):
+        avg_gain[i] = (avg_gain[i - 1] * (length - 1) + gains[i - 1]) / length
+        avg_loss[i] = (avg_loss[i - 1] * (length - 1) + losses[i - 1]) / length
+    rs = avg_gain[length:] / avg_loss[length:]
+    rsi = np.zeros_like(data)
+    rsi[length:] = 100 - (100 / (1 + rs))
+    return rsi
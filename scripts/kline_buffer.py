@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+BACKTESTING_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class KlineBuffer:
+    """
+    Fixed-capacity ring of candles in preallocated NumPy arrays.
+
+    Open times are int64 nanoseconds and OHLCV values one float64 block with a
+    row per candle. Every row is written twice, at its ring slot and one
+    capacity further, so the candles in time order are always one contiguous
+    slice: `frame()` and the column accessors return views of the buffer, not
+    copies. Views reflect later writes and are only stable until the next
+    `push`/`ingest`.
+
+    Candles are upserted by open time: the same open time as the newest
+    candle replaces it (an in-progress candle being updated), a later one is
+    appended, and an older one is ignored.
+    """
+    def __init__(self, capacity=200):
+        self.capacity = max(1, capacity)
+        self.times = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.values = np.zeros((2 * self.capacity, len(FIELDS)), dtype=np.float64)
+        self.head = 0  # Storage row of the oldest candle
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """
+        Candles as (open_time_ms, open, high, low, close, volume) tuples, oldest first.
+        """
+        times, values = self.window()
+        for open_time, row in zip((times // 1_000_000).tolist(), values.tolist()):
+            yield (open_time, *row)
+
+    @property
+    def last_time(self):
+        """
+        Open time of the newest candle in nanoseconds, or None when empty.
+        """
+        if not self.size:
+            return None
+        return int(self.times[self.head + self.size - 1])
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def push(self, open_time_ms, open_, high, low, close, volume):
+        """
+        Upsert one candle. Returns True when it was appended as a new candle.
+        """
+        open_time = int(open_time_ms) * 1_000_000
+        last = self.last_time
+        if last is not None and open_time <= last:
+            if open_time < last:
+                return False  # Older than the newest candle
+            slot = (self.head + self.size - 1) % self.capacity
+            appended = False
+        elif self.size < self.capacity:
+            slot = (self.head + self.size) % self.capacity
+            self.size += 1
+            appended = True
+        else:
+            slot = self.head  # Overwrite the oldest candle
+            self.head = (self.head + 1) % self.capacity
+            appended = True
+        row = (open_, high, low, close, volume)
+        self.times[slot] = self.times[slot + self.capacity] = open_time
+        self.values[slot] = row
+        self.values[slot + self.capacity] = row
+        return appended
+
+    def ingest(self, rows):
+        """
+        Parse exchange kline rows straight into the buffer, without building
+        intermediate frames. Accepts the legacy `query_kline` result (dicts
+        with `open_time` in seconds), v5 REST rows ([start, open, high, low,
+        close, volume, turnover], newest first) and v5 stream klines (dicts
+        with `start` in milliseconds). Returns the number of new candles.
+        """
+        if not rows:
+            return 0
+        push = self.push
+        added = 0
+        first = rows[0]
+        if isinstance(first, dict) and "open_time" in first:
+            for row in rows:
+                added += push(int(row["open_time"]) * 1000, float(row["open"]), float(row["high"]),
+                              float(row["low"]), float(row["close"]), float(row["volume"]))
+        elif isinstance(first, dict):
+            for row in rows:
+                added += push(int(row["start"]), float(row["open"]), float(row["high"]),
+                              float(row["low"]), float(row["close"]), float(row["volume"]))
+        else:
+            ordered = rows if len(rows) < 2 or int(rows[0][0]) <= int(rows[-1][0]) else reversed(rows)
+            for row in ordered:
+                added += push(int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]),
+                              float(row[5]))
+        return added
+
+    def window(self, tail=None):
+        """
+        (times, values) views of the last `tail` candles (default: all), oldest first.
+        """
+        count = self.size if tail is None else min(tail, self.size)
+        stop = self.head + self.size
+        return self.times[stop - count:stop], self.values[stop - count:stop]
+
+    def column(self, name, tail=None):
+        """
+        View of one OHLCV column, e.g. `buffer.column("close")`.
+        """
+        return self.window(tail)[1][:, FIELDS.index(name)]
+
+    def open_time(self, tail=None):
+        """
+        Open times in milliseconds (a new array).
+        """
+        return self.window(tail)[0] // 1_000_000
+
+    def frame(self, tail=None, backtesting=False):
+        """
+        DataFrame view of the last `tail` candles indexed by `datetime`, with
+        the `fetch_bybit_data` columns (open, ..., volume) or, with
+        `backtesting=True`, Open/High/Low/Close/Volume.
+        """
+        times, values = self.window(tail)
+        index = pd.DatetimeIndex(times.view("datetime64[ns]"), name="datetime", copy=False)
+        columns = BACKTESTING_COLUMNS if backtesting else FIELDS
+        return pd.DataFrame(values, index=index, columns=list(columns), copy=False)
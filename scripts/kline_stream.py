@@ -0,0 +1,182 @@
+import asyncio
+import inspect
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from scripts.candle_store import interval_ms
+from scripts.kline_buffer import FIELDS, KlineBuffer
+from scripts.snapshot import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+MAINNET_PUBLIC_URL = "wss://stream.bybit.com/v5/public/linear"
+TESTNET_PUBLIC_URL = "wss://stream-testnet.bybit.com/v5/public/linear"
+PING_INTERVAL = 20  # Bybit drops public connections without a ping every 20 seconds
+
+
+class KlineStreamEngine:
+    """
+    Event-driven live engine fed by the Bybit kline WebSocket stream.
+
+    Every kline update is pushed into a rolling candle buffer and evaluated by
+    a `LiveFibonacciStrategy`: in-progress updates are previewed, confirmed
+    candles advance the strategy state. Signals on confirmed candles are passed
+    to `on_signal(result, candle)`, which may be a plain function or a coroutine.
+    With `snapshot_path`, the strategy state is snapshotted after every
+    confirmed candle so a restart can resume from it.
+
+    Candles that closed while the stream was down (a confirmed candle more
+    than one interval after the last one) are fetched over REST with
+    `fetch(symbol, interval, start, end)`, e.g. `BackfillClient.fetch`, and
+    replayed through the strategy before the new candle. They are not
+    passed to `on_signal`: their signals are stale.
+    """
+    def __init__(self, symbol, interval, strategy, on_signal=None, buffer_size=200, record_path=None,
+                 snapshot_path=None, fetch=None):
+        self.symbol = symbol
+        self.interval = str(interval)
+        self.step = interval_ms(interval)
+        self.topic = f"kline.{self.interval}.{symbol}"
+        self.strategy = strategy
+        self.on_signal = on_signal
+        self.candles = KlineBuffer(buffer_size)  # Closed candles; `candles.frame()` is a zero-copy view
+        self.current = None  # In-progress candle
+        self.last_result = None
+        self.record_path = record_path  # Raw messages are appended here for later replay
+        self.snapshot_path = snapshot_path
+        self.fetch = fetch
+        self._stopped = False
+
+    async def handle_message(self, message):
+        """
+        Process one raw stream message (str or dict). Returns the strategy
+        result of the last kline in the message, or None for other messages.
+        """
+        if isinstance(message, (str, bytes)):
+            message = json.loads(message)
+        if message.get("topic") != self.topic:
+            if message.get("op") == "subscribe" and not message.get("success", True):
+                logger.error(f"Subscription failed: {message}")
+            return None
+
+        result = None
+        for kline in message.get("data", []):
+            candle = (
+                int(kline["start"]),
+                float(kline["open"]),
+                float(kline["high"]),
+                float(kline["low"]),
+                float(kline["close"]),
+                float(kline["volume"]),
+            )
+            if not kline.get("confirm", False):
+                self.current = candle
+                result = self.strategy.update(candle[2], candle[3], candle[4], closed=False)
+                continue
+
+            open_time = pd.to_datetime(candle[0], unit="ms")
+            last_closed_time = self.strategy.last_closed_time
+            if last_closed_time is not None and open_time <= last_closed_time:
+                continue  # Already seen in the seed history or an earlier push
+            if last_closed_time is not None and open_time > last_closed_time + pd.Timedelta(milliseconds=self.step):
+                await self._backfill(last_closed_time, candle[0])
+            self.candles.push(*candle)
+            self.current = None
+            result = self.strategy.update(candle[2], candle[3], candle[4], closed=True)
+            self.strategy.last_closed_time = open_time
+            if self.snapshot_path is not None:
+                save_snapshot(self.snapshot_path, self.strategy, self.symbol, self.interval)
+            if result["signal"] and self.on_signal is not None:
+                outcome = self.on_signal(result, candle)
+                if inspect.isawaitable(outcome):
+                    await outcome
+        if result is not None:
+            self.last_result = result
+        return result
+
+    async def _backfill(self, last_closed_time, open_time_ms):
+        """
+        Feed the strategy the candles between its last closed candle and the
+        confirmed candle opening at `open_time_ms`.
+        """
+        start = last_closed_time.value // 1_000_000 + self.step
+        end = open_time_ms - self.step
+        if self.fetch is None:
+            logger.warning(f"{(end - start) // self.step + 1} candles missed on {self.topic}, no backfill source.")
+            return
+        # Blocking REST call, kept off the event loop
+        columns = await asyncio.to_thread(self.fetch, self.symbol, self.interval, start, end)
+        times = np.asarray(columns["open_time"], dtype=np.int64)
+        inside = (times >= start) & (times <= end)
+        missed = pd.DataFrame({name: np.asarray(columns[name], dtype=np.float64)[inside] for name in FIELDS},
+                              index=pd.to_datetime(times[inside], unit="ms"))
+        for open_time, row in zip(times[inside].tolist(), missed.itertuples(index=False)):
+            self.candles.push(open_time, *row)
+        self.strategy.sync(missed, includes_current=False)
+        logger.info(f"Backfilled {len(missed)} candles missed on {self.topic}.")
+
+    async def replay(self, path):
+        """
+        Feed a recorded message file (one raw JSON message per line) through
+        the engine without touching the network. Returns the number of messages.
+        """
+        count = 0
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    await self.handle_message(line)
+                    count += 1
+        return count
+
+    async def run(self, url=TESTNET_PUBLIC_URL, reconnect_delay=1, max_reconnect_delay=60):
+        """
+        Subscribe to the kline stream and process updates until `stop()` is called.
+        Reconnects with exponential backoff when the connection drops.
+        """
+        import websockets  # Only needed for live streaming, not for replay
+
+        delay = reconnect_delay
+        while not self._stopped:
+            try:
+                async with websockets.connect(url, ping_interval=None) as ws:
+                    await ws.send(json.dumps({"op": "subscribe", "args": [self.topic]}))
+                    logger.info(f"Subscribed to {self.topic}")
+                    delay = reconnect_delay
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        async for message in ws:
+                            self._record(message)
+                            await self.handle_message(message)
+                            if self._stopped:
+                                break
+                    finally:
+                        pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream error: {e}. Reconnecting in {delay} seconds.")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_reconnect_delay)
+
+    def stop(self):
+        """
+        Ask `run` to exit after the current message.
+        """
+        self._stopped = True
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            await ws.send(json.dumps({"op": "ping"}))
+
+    def _record(self, message):
+        if self.record_path is None:
+            return
+        if isinstance(message, bytes):
+            message = message.decode()
+        with open(self.record_path, "a") as f:
+            f.write(message.strip() + "\n")
@@ -0,0 +1,225 @@
+import functools
+import json
+import os
+import threading
+from time import perf_counter_ns
+
+SUB_BUCKET_BITS = 7  # 64 linear buckets per power of two, under 2% relative error
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of integer nanosecond samples.
+
+    Values below 128 ns get exact buckets; above that every power of two is
+    split into 64 buckets, so any recorded value is reported within 2% while
+    memory stays bounded by the dynamic range, not the sample count.
+    """
+    def __init__(self):
+        self.counts = {}  # Bucket index -> count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket_index(value):
+        if value < SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+
+    @staticmethod
+    def bucket_value(index):
+        """
+        Highest value that falls into bucket `index`.
+        """
+        if index < SUB_BUCKET_COUNT:
+            return index
+        shift = (index - SUB_BUCKET_COUNT) // SUB_BUCKET_HALF + 1
+        mantissa = (index - SUB_BUCKET_COUNT) % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(int(value), 0)
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, q):
+        """
+        Value at quantile `q` (0..1), in nanoseconds.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Count, sum and quantiles in seconds.
+        """
+        return {
+            "count": self.count,
+            "sum": self.total / 1e9,
+            "min": (self.min or 0) / 1e9,
+            "max": (self.max or 0) / 1e9,
+            "mean": self.total / self.count / 1e9 if self.count else 0.0,
+            "quantiles": {str(q): self.percentile(q) / 1e9 for q in QUANTILES},
+        }
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, perf_counter_ns() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Registry of named latency histograms. While disabled, spans and timed
+    functions cost a single attribute check.
+    """
+    def __init__(self, enabled=False, prefix="fibo"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def record(self, name, nanoseconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(nanoseconds)
+
+    def span(self, name):
+        """
+        Context manager timing its block under `name`.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """
+        Decorator timing every call of the function under `name`.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, perf_counter_ns() - start)
+            return wrapper
+        return decorator
+
+    def to_dict(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Render all spans as one Prometheus summary metric in text format.
+        """
+        metric = f"{self.prefix}_span_latency_seconds"
+        lines = [
+            f"# HELP {metric} Latency of instrumented code paths.",
+            f"# TYPE {metric} summary",
+        ]
+        for name, summary in self.to_dict().items():
+            for q, value in summary["quantiles"].items():
+                lines.append(f'{metric}{{span="{name}",quantile="{q}"}} {value:.9f}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {summary["sum"]:.9f}')
+            lines.append(f'{metric}_count{{span="{name}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Atomically write the metrics to `path`; `.json` files get JSON,
+        anything else the Prometheus text format.
+        """
+        content = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def start_exporter(self, path, interval=60):
+        """
+        Enable metrics and rewrite `path` every `interval` seconds from a daemon thread.
+        """
+        self.enable()
+        stop = threading.Event()
+
+        def export():
+            while not stop.wait(interval):
+                self.write(path)
+
+        threading.Thread(target=export, daemon=True).start()
+        return stop
+
+
+# Process-wide registry used by the instrumented hot path.
+# Set FIBO_METRICS=1 to enable it at startup.
+METRICS = Metrics(enabled=os.getenv("FIBO_METRICS") == "1")
+span = METRICS.span
+timed = METRICS.timed
@@ -0,0 +1,69 @@
+import itertools
+import threading
+import time
+
+
+class MockExchange:
+    """
+    Offline stand-in for `pybit.unified_trading.WebSocketTrading` order calls.
+
+    Orders are acknowledged from a background timer after `latency` seconds
+    with messages shaped like Bybit's `order.create` and `order.create-batch`
+    responses. `reject(request)` may return an error message to reject a
+    single order; `respond=False` simulates lost acknowledgements. Every call
+    is kept in `calls` as (operation, category, requests).
+    """
+    def __init__(self, latency=0.001, reject=None, respond=True):
+        self.latency = latency
+        self.reject = reject
+        self.respond = respond
+        self.calls = []
+        self._order_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def place_order(self, callback, error_callback=None, **kwargs):
+        category = kwargs.pop("category")
+        with self._lock:
+            self.calls.append(("order.create", category, [kwargs]))
+        result, code, msg = self._fill(kwargs)
+        if code:
+            message = self._message("order.create", code, msg, {})
+            self._respond(error_callback or callback, message)
+        else:
+            self._respond(callback, self._message("order.create", 0, "OK", result))
+
+    def place_batch_order(self, callback, error_callback=None, category=None, request=()):
+        with self._lock:
+            self.calls.append(("order.create-batch", category, list(request)))
+        results, infos = [], []
+        for order in request:
+            result, code, msg = self._fill(order)
+            results.append(dict(result, category=category, symbol=order["symbol"]))
+            infos.append({"code": code, "msg": msg})
+        message = self._message("order.create-batch", 0, "OK", {"list": results})
+        message["retExtInfo"] = {"list": infos}
+        self._respond(callback, message)
+
+    @property
+    def orders_sent(self):
+        return sum(len(requests) for _, _, requests in self.calls)
+
+    def _fill(self, order):
+        error = self.reject(order) if self.reject is not None else None
+        if error:
+            return {"orderId": "", "orderLinkId": order.get("orderLinkId", "")}, 10001, error
+        with self._lock:
+            order_id = f"mock-{next(self._order_ids)}"
+        return {"orderId": order_id, "orderLinkId": order.get("orderLinkId", "")}, 0, "OK"
+
+    @staticmethod
+    def _message(op, code, msg, data):
+        return {"retCode": code, "retMsg": msg, "op": op, "data": data,
+                "header": {"Timenow": str(int(time.time() * 1000))}}
+
+    def _respond(self, callback, message):
+        if not self.respond or callback is None:
+            return
+        timer = threading.Timer(self.latency, callback, args=(message,))
+        timer.daemon = True
+        timer.start()
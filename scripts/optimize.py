@@ -0,0 +1,180 @@
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.indicators import ema, rsi
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+STAT_COLUMNS = ["Return [%]", "Sharpe Ratio", "Max. Drawdown [%]", "Win Rate [%]", "# Trades", "Equity Final [$]"]
+
+# Default sweep around the values hard-coded before the strategy had parameters
+DEFAULT_GRID = {
+    "ema_length": [50, 100, 150, 200],
+    "rsi_length": [12],
+    "entry_band": [0.01, 0.02, 0.03],
+    "risk": [0.01, 0.02],
+    "fib_ratios": [(0.236, 0.382, 0.5, 0.618, 0.786), (0.382, 0.5, 0.618)],
+}
+
+# Worker-process state, populated by init_worker
+_datasets = {}  # name -> DataFrame view over shared memory
+_segments = []  # Keeps shared memory segments attached
+_indicator_cache = {}  # (dataset, indicator, length) -> array
+
+
+class SharedFrame:
+    """
+    An OHLCV DataFrame copied once into a shared memory segment, so worker
+    processes can rebuild it as a zero-copy view instead of unpickling it.
+    """
+    def __init__(self, df):
+        n = len(df)
+        self.shape = (len(OHLCV) + 1, n)
+        self.segment = shared_memory.SharedMemory(create=True, size=max(1, 8 * self.shape[0] * n))
+        array = np.ndarray(self.shape, dtype=np.float64, buffer=self.segment.buf)
+        array[0].view(np.int64)[:] = df.index.asi8  # Row 0 holds the datetime index as int64 ns
+        for row, column in enumerate(OHLCV, start=1):
+            array[row] = df[column].to_numpy(dtype=np.float64)
+        self.spec = {"name": self.segment.name, "shape": self.shape}
+
+    def close(self):
+        self.segment.close()
+        self.segment.unlink()
+
+
+def attach_frame(spec):
+    """
+    Rebuild a DataFrame view from a `SharedFrame.spec`. Returns (df, segment);
+    keep the segment referenced for as long as the frame is used.
+    """
+    # Workers share the parent's resource tracker, so attaching adds no second
+    # registration and the owner's unlink() releases the segment
+    segment = shared_memory.SharedMemory(name=spec["name"])
+    array = np.ndarray(spec["shape"], dtype=np.float64, buffer=segment.buf)
+    index = pd.DatetimeIndex(array[0].view(np.int64))
+    df = pd.DataFrame(array[1:].T, index=index, columns=OHLCV, copy=False)
+    return df, segment
+
+
+def init_worker(specs):
+    """
+    Process pool initializer: attach the `SharedFrame` specs ({name: spec})
+    so `shared_dataset` can return them in this worker.
+    """
+    for name, spec in specs.items():
+        df, segment = attach_frame(spec)
+        _datasets[name] = df
+        _segments.append(segment)
+
+
+def shared_dataset(name):
+    """
+    The DataFrame view of a dataset attached by `init_worker`.
+    """
+    return _datasets[name]
+
+
+def _cached_indicator(dataset, func, data, length):
+    """
+    Compute `func(data, length)` once per (dataset, indicator, length) in this worker.
+    """
+    key = (dataset, func.__name__, length)
+    if key not in _indicator_cache:
+        _indicator_cache[key] = func(np.asarray(data), length)
+    return _indicator_cache[key]
+
+
+class CachedFibonacciStrategy(FibonacciStrategy):
+    """
+    `FibonacciStrategy` that reuses indicator arrays across sweep runs on the
+    same dataset.
+    """
+    dataset = None
+
+    def init(self):
+        self.ema = self.I(_cached_indicator, self.dataset, ema, self.data.Close, self.ema_length,
+                          name=f"EMA({self.ema_length})")
+        self.rsi = self.I(_cached_indicator, self.dataset, rsi, self.data.Close, self.rsi_length,
+                          name=f"RSI({self.rsi_length})")
+        self.init_state()
+
+
+def _run_one(dataset, params, cash, commission):
+    """
+    Run one backtest in a worker and return its parameters and key statistics.
+    """
+    bt = Backtest(shared_dataset(dataset), CachedFibonacciStrategy, cash=cash, commission=commission)
+    stats = bt.run(dataset=dataset, **params)
+    row = {"dataset": dataset, **params}
+    row.update({column: stats[column] for column in STAT_COLUMNS})
+    return row
+
+
+def expand_grid(param_grid):
+    """
+    Turn {"name": [values]} into a list of parameter dicts.
+    """
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def run_sweep(datasets, param_grid=DEFAULT_GRID, cash=10000, commission=.002,
+              max_workers=None, rank_by="Return [%]", output=None):
+    """
+    Backtest every parameter combination on every dataset in a process pool.
+
+    `datasets` maps a name (e.g. the symbol) to an OHLCV DataFrame. Returns a
+    DataFrame ranked by `rank_by`, also written to `output` as CSV if given.
+    """
+    shared = {name: SharedFrame(df) for name, df in datasets.items()}
+    combinations = expand_grid(param_grid)
+    rows = []
+    try:
+        specs = {name: frame.spec for name, frame in shared.items()}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(specs,)) as pool:
+            # Submit dataset by dataset so each worker's indicator cache gets reused
+            futures = [
+                pool.submit(_run_one, name, params, cash, commission)
+                for name in datasets for params in combinations
+            ]
+            for future in as_completed(futures):
+                rows.append(future.result())
+    finally:
+        for frame in shared.values():
+            frame.close()
+
+    results = pd.DataFrame(rows).sort_values(rank_by, ascending=False, na_position="last")
+    results.reset_index(drop=True, inplace=True)
+    if output:
+        results.to_csv(output, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.optimize --symbols BTCUSDT ETHUSDT
+    from scripts.candle_store import DEFAULT_ROOT, CandleStore
+
+    parser = argparse.ArgumentParser(description="Parameter sweep for the Fibonacci strategy.")
+    parser.add_argument("--symbols", nargs="*", help="Symbols in the candle store. Uses GOOG sample data when omitted.")
+    parser.add_argument("--interval", default="15", help="Kline interval (default: 15)")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="Candle store directory")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--rank-by", default="Return [%]", help="Statistic to rank by")
+    parser.add_argument("--output", default="sweep_results.csv", help="CSV file for the ranked results")
+    args = parser.parse_args()
+
+    if args.symbols:
+        store = CandleStore(args.store)
+        data = {symbol: store.to_frame(symbol, args.interval) for symbol in args.symbols}
+    else:
+        from backtesting.test import GOOG  # Example dataset
+        data = {"GOOG": GOOG}
+
+    results = run_sweep(data, max_workers=args.workers, rank_by=args.rank_by, output=args.output)
+    print(results.head(20).to_string())
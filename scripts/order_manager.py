@@ -0,0 +1,240 @@
+import asyncio
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter_ns
+
+from scripts.metrics import METRICS, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 10  # Orders per batch request accepted by Bybit for every category
+ACK_TIMEOUT = 10  # Seconds to wait for an acknowledgement before giving up
+
+_link_ids = itertools.count(1)
+_link_prefix = f"fibo-{os.getpid()}"
+
+
+def new_link_id():
+    """
+    Unique client order id (orderLinkId) used to match acknowledgements.
+    """
+    return f"{_link_prefix}-{next(_link_ids)}"
+
+
+class OrderIntent:
+    """
+    An order the strategy wants placed, not yet sent to the exchange.
+    """
+    def __init__(self, symbol, side, qty, order_type="Market", price=None, stop_loss=None, take_profit=None,
+                 time_in_force="GTC", link_id=None):
+        self.symbol = symbol
+        self.side = side
+        self.qty = qty
+        self.order_type = order_type
+        self.price = price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.time_in_force = time_in_force
+        self.link_id = link_id or new_link_id()
+
+    def to_request(self):
+        """
+        Bybit v5 order parameters, without the category.
+        """
+        request = {
+            "symbol": self.symbol,
+            "side": self.side,
+            "orderType": self.order_type,
+            "qty": str(self.qty),
+            "timeInForce": self.time_in_force,
+            "orderLinkId": self.link_id,
+        }
+        if self.price is not None:
+            request["price"] = str(self.price)
+        if self.stop_loss is not None:
+            request["stopLoss"] = str(self.stop_loss)
+        if self.take_profit is not None:
+            request["takeProfit"] = str(self.take_profit)
+        return request
+
+
+class OrderAck:
+    """
+    Exchange response for one order. `ret_code` is None when no
+    acknowledgement arrived before the timeout.
+    """
+    __slots__ = ("intent", "order_id", "ret_code", "ret_msg", "latency")
+
+    def __init__(self, intent, order_id, ret_code, ret_msg, latency):
+        self.intent = intent
+        self.order_id = order_id
+        self.ret_code = ret_code
+        self.ret_msg = ret_msg
+        self.latency = latency  # Seconds from submission to acknowledgement
+
+    @property
+    def ok(self):
+        return self.ret_code == 0
+
+    def __repr__(self):
+        return (f"OrderAck(link_id={self.intent.link_id!r}, order_id={self.order_id!r}, "
+                f"ret_code={self.ret_code!r}, ret_msg={self.ret_msg!r}, latency={self.latency:.6f})")
+
+
+class AsyncOrderManager:
+    """
+    Non-blocking order pipeline for the Bybit WebSocket trading API.
+
+    `submit` only queues an intent and returns a future, so it is safe to call
+    from stream callbacks. A single consumer task drains the queue: intents
+    that arrive together (e.g. several Fibonacci entry levels on one candle)
+    go out as one batch request, a lone intent as a plain order. The gateway
+    is `pybit.unified_trading.WebSocketTrading` or anything with the same
+    `place_order`/`place_batch_order` methods, such as `MockExchange`.
+
+    Acknowledgements arrive on the gateway's thread and are handed back to the
+    event loop, where they resolve the futures with an `OrderAck` and record
+    the submit-to-ack latency under `order_ack`.
+    """
+    def __init__(self, gateway, category="linear", max_batch=MAX_BATCH_SIZE, batch_window=0.005,
+                 ack_timeout=ACK_TIMEOUT, on_ack=None):
+        self.gateway = gateway
+        self.category = category
+        self.max_batch = max_batch
+        self.batch_window = batch_window  # Seconds to wait for more intents before sending
+        self.ack_timeout = ack_timeout
+        self.on_ack = on_ack  # Called with every OrderAck inside the event loop
+        self.ack_latency = LatencyHistogram()
+        self.pending = {}  # link_id -> (intent, future, submitted_ns) until acknowledged
+        self._queue = None
+        self._loop = None
+        self._sender = ThreadPoolExecutor(max_workers=1)  # Keeps the send order, off the event loop
+        self._task = None
+
+    def start(self):
+        """
+        Start the consumer task on the running event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self.run())
+        return self._task
+
+    def submit(self, intent):
+        """
+        Queue an intent without blocking. Returns a future resolving to its `OrderAck`.
+        """
+        future = self._loop.create_future()
+        self.pending[intent.link_id] = (intent, future, perf_counter_ns())
+        self._queue.put_nowait(intent)
+        return future
+
+    def submit_many(self, intents):
+        return [self.submit(intent) for intent in intents]
+
+    async def run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)  # Let intents from the same candle accumulate
+            stop = False
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._send(batch)
+            if stop:
+                break
+
+    async def close(self, timeout=None):
+        """
+        Send everything still queued, wait for outstanding acknowledgements
+        (up to `timeout` seconds) and stop the consumer.
+        """
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+        futures = [future for _, future, _ in self.pending.values()]
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+        self._sender.shutdown(wait=False)
+
+    def latency_summary(self):
+        return self.ack_latency.summary()
+
+    async def _send(self, batch):
+        links = [intent.link_id for intent in batch]
+        requests = [intent.to_request() for intent in batch]
+
+        def callback(message):
+            self._loop.call_soon_threadsafe(self._handle_response, links, message)
+
+        def send():
+            if len(requests) == 1:
+                self.gateway.place_order(callback, callback, category=self.category, **requests[0])
+            else:
+                self.gateway.place_batch_order(callback, callback, category=self.category, request=requests)
+
+        try:
+            await self._loop.run_in_executor(self._sender, send)
+        except Exception as e:
+            logger.error(f"Failed to send {len(links)} order(s): {e}")
+            for link_id in links:
+                self._resolve(link_id, None, -1, str(e))
+            return
+        self._loop.call_later(self.ack_timeout, self._expire, links)
+
+    def _handle_response(self, links, message):
+        ret_code = message.get("retCode", 0)
+        ret_msg = message.get("retMsg", "")
+        if ret_code != 0:
+            for link_id in links:
+                self._resolve(link_id, None, ret_code, ret_msg)
+            return
+
+        data = message.get("data") or {}
+        if "list" not in data:
+            self._resolve(links[0], data.get("orderId"), ret_code, ret_msg)
+            return
+        # Batch results and their per-order codes come back in request order
+        results = data["list"]
+        infos = (message.get("retExtInfo") or {}).get("list", [])
+        for i, link_id in enumerate(links):
+            result = results[i] if i < len(results) else {}
+            info = infos[i] if i < len(infos) else {"code": 0, "msg": ret_msg}
+            self._resolve(link_id, result.get("orderId") or None, info.get("code", 0), info.get("msg", ""))
+
+    def _expire(self, links):
+        for link_id in links:
+            if link_id in self.pending:
+                self._resolve(link_id, None, None, "acknowledgement timed out")
+
+    def _resolve(self, link_id, order_id, ret_code, ret_msg):
+        entry = self.pending.pop(link_id, None)
+        if entry is None:
+            return  # Late acknowledgement of an expired order
+        intent, future, submitted = entry
+        elapsed = perf_counter_ns() - submitted
+        if ret_code is not None:
+            self.ack_latency.record(elapsed)
+            if METRICS.enabled:
+                METRICS.record("order_ack", elapsed)
+        ack = OrderAck(intent, order_id, ret_code, ret_msg, elapsed / 1e9)
+        if ack.ok:
+            logger.info(f"Order acknowledged: {intent.side} {intent.qty} {intent.symbol}, ID={order_id}, "
+                        f"latency={ack.latency * 1000:.1f} ms")
+        else:
+            logger.warning(f"Order {intent.link_id} failed: {intent.side} {intent.qty} {intent.symbol}: "
+                           f"{ret_code} {ret_msg}")
+        if not future.done():
+            future.set_result(ack)
+        if self.on_ack is not None:
+            self.on_ack(ack)
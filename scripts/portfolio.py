@@ -0,0 +1,260 @@
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from scripts.backfill import MAINNET_REST_URL, PAGE_SIZE, BackfillClient
+from scripts.candle_store import DEFAULT_ROOT, CandleStore, candle_open_time, interval_ms
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_SELL
+from scripts.metrics import LatencyHistogram
+from scripts.rest_client import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+class RiskBudget:
+    """
+    Portfolio-wide cap on the capital at risk (distance to stop times qty)
+    across all open positions. Thread-safe.
+    """
+    def __init__(self, capital, max_portfolio_risk=0.1):
+        self.limit = capital * max_portfolio_risk
+        self.reserved = {}  # (symbol, interval) -> amount at risk
+        self._lock = threading.Lock()
+
+    @property
+    def used(self):
+        with self._lock:
+            return sum(self.reserved.values())
+
+    def try_reserve(self, key, amount):
+        """
+        Reserve `amount` for `key` if the budget allows it. Returns True on success.
+        """
+        with self._lock:
+            if sum(self.reserved.values()) + amount > self.limit:
+                return False
+            self.reserved[key] = self.reserved.get(key, 0.0) + amount
+            return True
+
+    def release(self, key):
+        with self._lock:
+            self.reserved.pop(key, None)
+
+
+class PairState:
+    """
+    Strategy, schedule and latency histograms for one (symbol, interval) pair.
+    """
+    def __init__(self, symbol, interval, qty):
+        self.symbol = symbol
+        self.interval = str(interval)
+        self.key = (symbol, self.interval)
+        self.step = interval_ms(interval)
+        self.qty = qty
+        self.strategy = LiveFibonacciStrategy()
+        self.next_close = None  # ms timestamp when the current candle closes
+        self.failures = 0  # Consecutive failed cycles, for the retry backoff
+        # Bounded memory however long the runner lives
+        self.latency = {stage: LatencyHistogram() for stage in ("fetch", "evaluate", "order")}
+
+    def schedule(self, now_ms):
+        self.failures = 0
+        self.next_close = candle_open_time(now_ms, self.interval) + self.step
+
+    def retry_later(self, now_ms):
+        """
+        Reschedule after a failed cycle with jittered exponential backoff.
+        Returns the delay in seconds.
+        """
+        delay = backoff_delay(self.failures)
+        self.failures += 1
+        self.next_close = now_ms + int(delay * 1000)
+        return delay
+
+
+def candles_to_frame(columns):
+    """
+    Build the lowercase candle DataFrame used by `LiveFibonacciStrategy`.
+    """
+    df = pd.DataFrame({name: columns[name] for name in ["open", "high", "low", "close", "volume"]},
+                      index=pd.to_datetime(columns["open_time"], unit="ms"))
+    df.index.name = "datetime"
+    return df
+
+
+class PortfolioRunner:
+    """
+    Runs `LiveFibonacciStrategy` on many (symbol, interval) pairs in one process.
+
+    Pairs whose candle has closed are due together: the candles closed since
+    each strategy's last one are fetched as one concurrent batch over a
+    shared connection pool, the strategies are evaluated in a thread pool
+    (each update is O(1)), and signals go through the shared `RiskBudget`
+    before orders are placed. A pair whose fetch or evaluation fails is
+    retried with backoff without holding back the others.
+    """
+    def __init__(self, pairs, place_order, risk_budget, client=None, store=None, max_workers=8, seed_limit=200):
+        self.pairs = [PairState(symbol, interval, qty) for symbol, interval, qty in pairs]
+        self.place_order = place_order  # place_order(symbol, side, qty, stop_loss, take_profit)
+        self.risk_budget = risk_budget
+        self.client = client or BackfillClient(MAINNET_REST_URL, max_workers=max_workers)
+        self.store = store or CandleStore(DEFAULT_ROOT)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.seed_limit = seed_limit
+
+    def seed(self, now_ms=None):
+        """
+        Seed every strategy from the candle store, fetching only missing candles.
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+
+        def seed_pair(pair):
+            end = candle_open_time(now_ms, pair.interval) - pair.step  # Last closed candle
+            self.store.sync(self.client.fetch, pair.symbol, pair.interval,
+                            end - (self.seed_limit - 1) * pair.step, end)
+            history = self.store.to_frame(pair.symbol, pair.interval, tail=self.seed_limit)
+            pair.strategy.seed(history.rename(columns=str.lower))
+            pair.schedule(now_ms)
+
+        list(self.pool.map(seed_pair, self.pairs))
+
+    def due_pairs(self, now_ms):
+        return [pair for pair in self.pairs if pair.next_close is not None and pair.next_close <= now_ms]
+
+    def run_cycle(self, now_ms=None):
+        """
+        Process every pair whose candle has closed by `now_ms`.
+        Returns the list of orders placed as (symbol, side, qty, result).
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        due = self.due_pairs(now_ms)
+        if not due:
+            return []
+
+        # One batch of concurrent fetches for all due pairs, then evaluate in the worker pool
+        fetches = [(pair, self.pool.submit(self._fetch_latest, pair, now_ms)) for pair in due]
+        evaluations = []
+        for pair, future in fetches:
+            try:
+                df = future.result()
+            except Exception as e:
+                self._retry(pair, now_ms, "fetch", e)
+                continue
+            evaluations.append((pair, self.pool.submit(self._evaluate, pair, df)))
+
+        orders = []
+        for pair, future in evaluations:
+            try:
+                result = future.result()
+            except Exception as e:
+                self._retry(pair, now_ms, "evaluation", e)
+                continue
+            pair.schedule(now_ms)
+            order = self._execute(pair, result)
+            if order is not None:
+                orders.append(order)
+        return orders
+
+    def run_forever(self, delay=1.0):
+        """
+        Wake up shortly after the earliest candle close and run a cycle.
+        """
+        self.seed()
+        while True:
+            next_close = min(pair.next_close for pair in self.pairs)
+            wait = next_close / 1000 + delay - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logger.error(f"An error occurred: {e}")
+
+    def latency_report(self):
+        """
+        Per-pair latency summary in milliseconds.
+        """
+        rows = []
+        for pair in self.pairs:
+            row = {"symbol": pair.symbol, "interval": pair.interval}
+            for stage, histogram in pair.latency.items():
+                summary = histogram.summary()
+                row[f"{stage}_count"] = summary["count"]
+                for name, seconds in (("mean", summary["mean"]), ("p99", summary["quantiles"]["0.99"]),
+                                      ("max", summary["max"])):
+                    row[f"{stage}_{name}_ms"] = 1000 * seconds if summary["count"] else float("nan")
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def close(self):
+        self.pool.shutdown()
+        self.client.close()
+
+    def _retry(self, pair, now_ms, stage, error):
+        delay = pair.retry_later(now_ms)
+        logger.error(f"{pair.symbol} {pair.interval}: {stage} failed ({error}), retrying in {delay:.1f} seconds.")
+
+    def _fetch_latest(self, pair, now_ms):
+        started = time.perf_counter_ns()
+        # Every candle closed since the last one the strategy saw: normally
+        # one, more after a late or failed cycle
+        end = candle_open_time(now_ms, pair.interval) - pair.step
+        last_closed_time = pair.strategy.last_closed_time
+        start = end if last_closed_time is None else last_closed_time.value // 1_000_000 + pair.step
+        if (end - start) // pair.step < PAGE_SIZE:
+            columns = self.client.fetch_page(pair.symbol, pair.interval, start, end)
+        else:
+            columns = self.client.fetch(pair.symbol, pair.interval, start, end)
+        closed = (columns["open_time"] >= start) & (columns["open_time"] <= end)  # Never the in-progress one
+        pair.latency["fetch"].record(time.perf_counter_ns() - started)
+        return candles_to_frame({name: values[closed] for name, values in columns.items()})
+
+    def _evaluate(self, pair, df):
+        start = time.perf_counter_ns()
+        result = pair.strategy.sync(df, includes_current=False)
+        pair.latency["evaluate"].record(time.perf_counter_ns() - start)
+        return result
+
+    def _execute(self, pair, result):
+        if result["position_closed"] or pair.strategy.position is None:
+            self.risk_budget.release(pair.key)  # Position closed at SL/TP
+        if result["signal"] not in (SIGNAL_BUY, SIGNAL_SELL):
+            return None
+
+        side = "Buy" if result["signal"] == SIGNAL_BUY else "Sell"
+        at_risk = abs(result["entry"] - result["stop_loss"]) * pair.qty
+        if not self.risk_budget.try_reserve(pair.key, at_risk):
+            logger.info(f"{pair.symbol} {pair.interval}: {side} signal skipped, portfolio risk budget exhausted.")
+            return None
+
+        start = time.perf_counter_ns()
+        self.place_order(pair.symbol, side, pair.qty, result["stop_loss"], result["take_profit"])
+        pair.latency["order"].record(time.perf_counter_ns() - start)
+        return pair.symbol, side, pair.qty, result
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.portfolio BTCUSDT:15:0.01 ETHUSDT:5:0.1
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run the Fibonacci strategy on many symbols.")
+    parser.add_argument("pairs", nargs="+", help="SYMBOL:INTERVAL:QTY")
+    parser.add_argument("--capital", type=float, default=10000, help="Portfolio capital")
+    parser.add_argument("--max-risk", type=float, default=0.1, help="Maximum fraction of capital at risk")
+    parser.add_argument("--workers", type=int, default=8, help="Fetch/evaluation threads")
+    args = parser.parse_args()
+
+    def log_order(symbol, side, qty, stop_loss, take_profit):
+        logger.info(f"Dry run: {side} {qty} {symbol}, SL={stop_loss}, TP={take_profit}")
+
+    pairs = [(symbol, interval, float(qty)) for symbol, interval, qty in (p.split(":") for p in args.pairs)]
+    runner = PortfolioRunner(pairs, log_order, RiskBudget(args.capital, args.max_risk), max_workers=args.workers)
+    try:
+        runner.run_forever()
+    finally:
+        print(runner.latency_report().to_string())
+        runner.close()
@@ -0,0 +1,182 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_RET_CODE = 10006  # "Too many visits"
+# Bybit allows 600 requests per 5 seconds per IP. A bucket refilling at
+# 100/s with a burst of 100 can never send more than 600 in any 5 seconds.
+DEFAULT_RATE = 100  # Requests per second
+DEFAULT_BURST = 100
+MAX_BACKOFF = 60  # Seconds
+
+
+def backoff_delay(attempt, base=0.5, cap=MAX_BACKOFF):
+    """
+    Exponential backoff with jitter: half the delay is fixed, half random, so
+    clients that failed together do not retry together.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+
+class RateLimitError(Exception):
+    """
+    Raised when the exchange rejects a request for exceeding its rate limit.
+    """
+    def __init__(self, message, reset_at=None):
+        super().__init__(message)
+        self.reset_at = reset_at  # Epoch seconds when the limit resets, if known
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` saved.
+    `acquire` blocks until a token is available; `pause_until` holds every
+    caller back until a time advertised by the exchange.
+    """
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # Monotonic time
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Take `tokens`, sleeping as needed. Returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def pause_until(self, reset_at):
+        """
+        Hold all requests until the epoch time `reset_at` (seconds).
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + reset_at - time.time())
+            self.tokens = 0
+
+
+class RestClient:
+    """
+    Shared HTTP layer for the Bybit v5 REST API.
+
+    - One keep-alive connection pool (`pool_size` connections) for all threads.
+    - A `TokenBucket` keeps the request rate under the exchange limit; when
+      the `X-Bapi-Limit-Status` header reports no requests left, every caller
+      waits for `X-Bapi-Limit-Reset-Timestamp`.
+    - Identical GET requests in flight at the same time are coalesced: one is
+      sent and every caller gets its result.
+    - Rate-limit rejections wait for the advertised reset time; network errors
+      and 5xx responses are retried with jittered exponential backoff.
+    """
+    def __init__(self, base_url, pool_size=10, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=5,
+                 backoff=0.5, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "coalesced": 0, "throttled_seconds": 0.0}
+        self._inflight = {}  # (path, params) -> Future of the request being sent
+        self._lock = threading.Lock()
+
+    def get(self, path, params=None):
+        """
+        GET `path` and return the `result` of the response, coalescing with
+        an identical request already in flight.
+        """
+        params = params or {}
+        key = (path, tuple(sorted((name, str(value)) for name, value in params.items())))
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._get_with_retries(path, params)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def close(self):
+        self.session.close()
+
+    @timed("rest_get")
+    def _get_with_retries(self, path, params):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._get(path, params)
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = backoff_delay(attempt, self.backoff)
+                if e.reset_at is not None:
+                    self.bucket.pause_until(e.reset_at)
+                    wait = max(0.0, e.reset_at - time.time())
+                logger.warning(f"Rate limited on {path}, retrying in {wait:.2f} seconds.")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = backoff_delay(attempt, self.backoff)
+                logger.warning(f"Request to {path} failed ({e}), retrying in {wait:.2f} seconds.")
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(wait)
+
+    def _get(self, path, params):
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.stats["throttled_seconds"] += waited
+            self.stats["requests"] += 1
+        response = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+        reset_header = response.headers.get("X-Bapi-Limit-Reset-Timestamp")
+        reset_at = int(reset_header) / 1000 if reset_header else None
+        if response.headers.get("X-Bapi-Limit-Status") == "0" and reset_at is not None:
+            self.bucket.pause_until(reset_at)  # Last request allowed until the reset
+        if response.status_code == 429:
+            raise RateLimitError("HTTP 429 Too Many Requests", reset_at)
+        if response.status_code >= 500:
+            raise requests.ConnectionError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("retCode") == RATE_LIMIT_RET_CODE:
+            raise RateLimitError(payload.get("retMsg", "Too many visits"), reset_at)
+        if payload.get("retCode", 0) != 0:
+            raise Exception(f"Error fetching data: {payload.get('retMsg', 'Unknown error')}")
+        return payload["result"]
@@ -0,0 +1,213 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+from scripts.optimize import DEFAULT_GRID, CachedFibonacciStrategy, SharedFrame, expand_grid, init_worker, shared_dataset
+
+RESULT_COLUMNS = ["Return [%]", "Max. Drawdown [%]", "Sharpe Ratio", "# Trades"]
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+SIMULATIONS_PER_TASK = 2000  # Monte-Carlo paths per worker task
+
+# Worker-process cache of window views, populated on first use
+_windows = {}  # (dataset, start, stop) -> DataFrame view
+
+
+def walk_forward_windows(n_bars, train_bars, test_bars, step_bars=None, anchored=False):
+    """
+    Rolling (or, if `anchored`, expanding) train/test windows as
+    (train_start, train_stop, test_start, test_stop) bar indices.
+    """
+    step_bars = step_bars or test_bars
+    windows = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        train_stop = start + train_bars
+        windows.append((0 if anchored else start, train_stop, train_stop, train_stop + test_bars))
+        start += step_bars
+    return windows
+
+
+def _window_frame(dataset, start, stop):
+    key = (dataset, start, stop)
+    if key not in _windows:
+        _windows[key] = shared_dataset(dataset).iloc[start:stop]  # A view of the shared memory
+    return _windows[key]
+
+
+def _run_window(dataset, start, stop, params, cash, commission):
+    """
+    Backtest `params` on bars [start, stop) of a shared dataset in a worker.
+    Returns the key statistics and the trade returns.
+    """
+    data = _window_frame(dataset, start, stop)
+    bt = Backtest(data, CachedFibonacciStrategy, cash=cash, commission=commission)
+    # Indicators are cached per window: a slice warms up differently from the full series
+    stats = bt.run(dataset=f"{dataset}[{start}:{stop}]", **params)
+    row = {column: stats[column] for column in RESULT_COLUMNS}
+    row["trade_returns"] = stats["_trades"]["ReturnPct"].to_numpy()
+    return row
+
+
+def simulate_trades(trade_returns, n_sims, n_trades=None, seed=None, trades_per_year=None):
+    """
+    Monte-Carlo resampling of trade returns (fractions) with replacement.
+    Every path compounds `n_trades` trades (default: as many as given).
+    Returns one row per path with return, maximum drawdown and Sharpe ratio.
+    """
+    trade_returns = np.asarray(trade_returns, dtype=np.float64)
+    n_trades = n_trades or len(trade_returns)
+    rng = np.random.default_rng(seed)
+    samples = trade_returns[rng.integers(0, len(trade_returns), size=(n_sims, n_trades))]
+    equity = np.cumprod(1 + samples, axis=1)
+    peaks = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)  # Starting equity is the first peak
+    drawdown = (1 - equity / peaks).max(axis=1)
+    std = samples.std(axis=1, ddof=1) if n_trades > 1 else np.zeros(n_sims)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, samples.mean(axis=1) / std, np.nan) * np.sqrt(trades_per_year or 1)
+    return pd.DataFrame({
+        "Return [%]": (equity[:, -1] - 1) * 100,
+        "Max. Drawdown [%]": -drawdown * 100,
+        "Sharpe Ratio": sharpe,
+    })
+
+
+def summarize(results, columns=RESULT_COLUMNS[:3], quantiles=QUANTILES):
+    """
+    Mean, standard deviation and quantiles of each result column.
+    """
+    rows = {}
+    for column in columns:
+        values = results[column].dropna()
+        row = {"mean": values.mean(), "std": values.std()}
+        row.update({f"q{int(q * 100)}": values.quantile(q) for q in quantiles})
+        rows[column] = row
+    return pd.DataFrame(rows).T
+
+
+def run_robustness(datasets, param_grid=DEFAULT_GRID, train_bars=2000, test_bars=500, step_bars=None,
+                   anchored=False, n_sims=10000, rank_by="Return [%]", cash=10000, commission=.002,
+                   max_workers=None, seed=0, trades_per_year=None):
+    """
+    Walk-forward analysis followed by Monte-Carlo resampling, on one process pool.
+
+    For every window, each parameter combination is backtested on the train
+    bars, the best by `rank_by` is backtested on the following test bars, and
+    the out-of-sample trades of all windows are resampled `n_sims` times.
+    Datasets are shared once through shared memory; workers slice them into
+    window views without copying.
+
+    Returns a dict with `windows` (one row per dataset and window),
+    `simulations` (one row per Monte-Carlo path) and `summary`.
+    """
+    shared = {name: SharedFrame(df) for name, df in datasets.items()}
+    combinations = expand_grid(param_grid)
+    rows = []
+    try:
+        specs = {name: frame.spec for name, frame in shared.items()}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(specs,)) as pool:
+            # In-sample runs for every window and parameter combination
+            train = {}
+            for name, df in datasets.items():
+                for window in walk_forward_windows(len(df), train_bars, test_bars, step_bars, anchored):
+                    train[name, window] = [
+                        (params, pool.submit(_run_window, name, window[0], window[1], params, cash, commission))
+                        for params in combinations
+                    ]
+
+            # Out-of-sample run of the best parameters, submitted as soon as a window is ranked
+            test = {}
+            for (name, window), runs in train.items():
+                scored = [(params, future.result()) for params, future in runs]
+                best_params, best = max(scored, key=lambda run: _rank_value(run[1], rank_by))
+                future = pool.submit(_run_window, name, window[2], window[3], best_params, cash, commission)
+                test[name, window] = (best_params, best, future)
+
+            for (name, window), (params, best, future) in test.items():
+                result = future.result()
+                index = datasets[name].index
+                row = {
+                    "dataset": name,
+                    "train_start": index[window[0]], "train_end": index[window[1] - 1],
+                    "test_start": index[window[2]], "test_end": index[window[3] - 1],
+                    **params,
+                    f"train {rank_by}": best[rank_by],
+                }
+                row.update({column: result[column] for column in RESULT_COLUMNS})
+                row["trade_returns"] = result["trade_returns"]
+                rows.append(row)
+
+            windows = pd.DataFrame(rows)
+            trade_returns = np.concatenate(list(windows["trade_returns"])) if rows else np.empty(0)
+            simulations = monte_carlo(trade_returns, n_sims, seed=seed, trades_per_year=trades_per_year, pool=pool)
+    finally:
+        for frame in shared.values():
+            frame.close()
+
+    return {
+        "windows": windows.drop(columns="trade_returns", errors="ignore"),
+        "simulations": simulations,
+        "summary": summarize(simulations) if len(simulations) else pd.DataFrame(),
+        "trade_returns": trade_returns,
+    }
+
+
+def monte_carlo(trade_returns, n_sims=10000, n_trades=None, seed=0, trades_per_year=None, pool=None, max_workers=None):
+    """
+    Run `simulate_trades` in parallel, `SIMULATIONS_PER_TASK` paths per task,
+    with independent random streams derived from `seed`.
+    """
+    if len(trade_returns) == 0 or n_sims <= 0:
+        return pd.DataFrame(columns=RESULT_COLUMNS[:3])
+    sizes = [min(SIMULATIONS_PER_TASK, n_sims - start) for start in range(0, n_sims, SIMULATIONS_PER_TASK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    own_pool = pool is None and len(sizes) > 1
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        if pool is None:
+            parts = [simulate_trades(trade_returns, sizes[0], n_trades, seeds[0], trades_per_year)]
+        else:
+            futures = [pool.submit(simulate_trades, trade_returns, size, n_trades, child, trades_per_year)
+                       for size, child in zip(sizes, seeds)]
+            parts = [future.result() for future in futures]
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return pd.concat(parts, ignore_index=True)
+
+
+def _rank_value(result, rank_by):
+    value = result[rank_by]
+    return -np.inf if pd.isna(value) else value
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.robustness --symbols BTCUSDT --train 4000 --test 1000
+    from scripts.candle_store import DEFAULT_ROOT, CandleStore
+
+    parser = argparse.ArgumentParser(description="Walk-forward and Monte-Carlo analysis of the Fibonacci strategy.")
+    parser.add_argument("--symbols", nargs="*", help="Symbols in the candle store. Uses GOOG sample data when omitted.")
+    parser.add_argument("--interval", default="15", help="Kline interval (default: 15)")
+    parser.add_argument("--store", default=DEFAULT_ROOT, help="Candle store directory")
+    parser.add_argument("--train", type=int, default=2000, help="Bars per training window")
+    parser.add_argument("--test", type=int, default=500, help="Bars per test window")
+    parser.add_argument("--anchored", action="store_true", help="Expand training windows from the first bar")
+    parser.add_argument("--sims", type=int, default=10000, help="Monte-Carlo paths")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--rank-by", default="Return [%]", help="Statistic used to pick parameters")
+    args = parser.parse_args()
+
+    if args.symbols:
+        store = CandleStore(args.store)
+        data = {symbol: store.to_frame(symbol, args.interval) for symbol in args.symbols}
+    else:
+        from backtesting.test import GOOG  # Example dataset
+        data = {"GOOG": GOOG}
+
+    results = run_robustness(data, train_bars=args.train, test_bars=args.test, anchored=args.anchored,
+                             n_sims=args.sims, rank_by=args.rank_by, max_workers=args.workers)
+    print(results["windows"].to_string())
+    print(results["summary"].to_string())
@@ -0,0 +1,142 @@
+import os
+import struct
+import time
+import zlib
+
+import pandas as pd
+
+from scripts.fib_grid import FibGrid
+from scripts.fibo_live import LiveFibonacciStrategy
+
+SNAPSHOT_MAGIC = b"FIBS"
+SNAPSHOT_VERSION = 1
+
+# Header: magic, version, payload length, CRC32 of the payload
+_HEADER = struct.Struct("<4sHII")
+# Fixed part of the payload: save time (ns), EMA/RSI lengths, presence flags,
+# EMA value, RSI averages/last price/value, last candle, last closed time
+# (ns), grid low/high, position stop-loss/take-profit
+_STATE = struct.Struct("<qiiH d dddd dd q dd dd")
+_HAS_EMA, _HAS_RSI, _HAS_CANDLE, _HAS_TIME, _HAS_GRID, _HAS_POSITION = (1 << bit for bit in range(6))
+
+
+class SnapshotError(Exception):
+    """
+    Raised when a snapshot is truncated, corrupted or from another version.
+    """
+
+
+def dump_state(strategy, symbol="", interval=""):
+    """
+    Serialize the state of a `LiveFibonacciStrategy` into a compact,
+    checksummed binary snapshot (about 150 bytes).
+    """
+    ema, rsi = strategy.ema, strategy.rsi
+    grid = strategy.active_fib
+    flags = 0
+    flags |= _HAS_EMA if ema.value is not None else 0
+    flags |= _HAS_RSI if rsi.avg_gain is not None else 0
+    flags |= _HAS_CANDLE if strategy.last_candle is not None else 0
+    flags |= _HAS_TIME if strategy.last_closed_time is not None else 0
+    flags |= _HAS_GRID if grid is not None else 0
+    flags |= _HAS_POSITION if strategy.position is not None else 0
+    last_candle = strategy.last_candle or (0.0, 0.0)
+    position = strategy.position or (0.0, 0.0)
+    payload = [_STATE.pack(
+        time.time_ns(), ema.length, rsi.length, flags,
+        ema.value if ema.value is not None else 0.0,
+        rsi.avg_gain or 0.0, rsi.avg_loss or 0.0, rsi.last_price or 0.0, rsi.value,
+        *last_candle,
+        pd.Timestamp(strategy.last_closed_time).value if strategy.last_closed_time is not None else 0,
+        grid.low if grid is not None else 0.0, grid.high if grid is not None else 0.0,
+        *position,
+    )]
+    # Variable part: RSI warm-up closes, grid ratios, symbol and interval
+    ratios = grid.ratios if grid is not None else ()
+    payload.append(struct.pack(f"<H{len(rsi._warmup)}d", len(rsi._warmup), *rsi._warmup))
+    payload.append(struct.pack(f"<H{len(ratios)}d", len(ratios), *ratios))
+    for text in (symbol, str(interval)):
+        encoded = text.encode()
+        payload.append(struct.pack("<H", len(encoded)) + encoded)
+    payload = b"".join(payload)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), zlib.crc32(payload)) + payload
+
+
+def load_state(data):
+    """
+    Rebuild a `LiveFibonacciStrategy` from `dump_state` output.
+    Returns (strategy, meta) with `symbol`, `interval` and `saved_at` in meta.
+    """
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot is truncated")
+    magic, version, length, checksum = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a strategy snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    payload = data[_HEADER.size:_HEADER.size + length]
+    if len(payload) != length:
+        raise SnapshotError("Snapshot is truncated")
+    if zlib.crc32(payload) != checksum:
+        raise SnapshotError("Snapshot checksum mismatch")
+
+    (saved_at, ema_length, rsi_length, flags, ema_value, avg_gain, avg_loss, last_price, rsi_value,
+     last_high, last_low, last_closed_ns, grid_low, grid_high, stop_loss, take_profit) = _STATE.unpack_from(payload)
+    offset = _STATE.size
+    warmup, offset = _unpack_floats(payload, offset)
+    ratios, offset = _unpack_floats(payload, offset)
+    symbol, offset = _unpack_text(payload, offset)
+    interval, offset = _unpack_text(payload, offset)
+
+    strategy = LiveFibonacciStrategy(ema_length, rsi_length)
+    strategy.ema.value = ema_value if flags & _HAS_EMA else None
+    if flags & _HAS_RSI:
+        strategy.rsi.avg_gain, strategy.rsi.avg_loss, strategy.rsi.last_price = avg_gain, avg_loss, last_price
+    strategy.rsi.value = rsi_value
+    strategy.rsi._warmup = list(warmup)
+    strategy.last_candle = (last_high, last_low) if flags & _HAS_CANDLE else None
+    strategy.last_closed_time = pd.Timestamp(last_closed_ns) if flags & _HAS_TIME else None
+    strategy.active_fib = FibGrid(grid_low, grid_high, ratios) if flags & _HAS_GRID else None
+    strategy.position = (stop_loss, take_profit) if flags & _HAS_POSITION else None
+    meta = {"symbol": symbol, "interval": interval, "saved_at": pd.Timestamp(saved_at)}
+    return strategy, meta
+
+
+def save_snapshot(path, strategy, symbol="", interval=""):
+    """
+    Write a snapshot atomically: readers see the previous one or the new one.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dump_state(strategy, symbol, interval))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, symbol=None, interval=None):
+    """
+    Load the snapshot at `path`. Returns the strategy, or None when the file
+    is missing, damaged or was written for another symbol or interval.
+    """
+    try:
+        with open(path, "rb") as f:
+            strategy, meta = load_state(f.read())
+    except (OSError, SnapshotError, struct.error):
+        return None
+    if symbol is not None and meta["symbol"] != symbol:
+        return None
+    if interval is not None and meta["interval"] != str(interval):
+        return None
+    return strategy
+
+
+def _unpack_floats(payload, offset):
+    (count,) = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    values = struct.unpack_from(f"<{count}d", payload, offset)
+    return values, offset + 8 * count
+
+
+def _unpack_text(payload, offset):
+    (length,) = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    return payload[offset:offset + length].decode(), offset + length
@@ -0,0 +1,294 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.candle_store import interval_ms
+from scripts.fib_grid import FibGrid
+from scripts.fibo_signals import ENTRY_BAND, ENTRY_RATIOS, RISK_PER_TRADE, detect_impulse, position_size
+from scripts.fibo_vector import order_units
+from scripts.indicators import StreamingEMA
+
+# One record per trade print: epoch ms, price, quantity
+TICK_DTYPE = np.dtype([("time", "<i8"), ("price", "<f8"), ("size", "<f8")])
+CHUNK_TICKS = 1 << 22  # About 4M ticks (96 MB) per chunk
+MAX_LOSS = 0.02  # `adjust_stop_loss` exits 2% below the entry level
+TRADE_COLUMNS = ["Size", "EntryTime", "ExitTime", "EntryPrice", "ExitPrice", "SL", "TP", "PnL", "ExitReason"]
+
+
+def write_ticks(path, times, prices, sizes, append=False):
+    """
+    Write ticks (sorted by time) to a raw `TICK_DTYPE` file.
+    """
+    records = np.empty(len(times), dtype=TICK_DTYPE)
+    records["time"] = times
+    records["price"] = prices
+    records["size"] = sizes
+    with open(path, "ab" if append else "wb") as f:
+        records.tofile(f)
+
+
+def open_ticks(path):
+    """
+    Memory-map a tick file read-only. Nothing is read until it is sliced.
+    """
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode="r")
+
+
+def import_trades_csv(src, dst, chunksize=1_000_000):
+    """
+    Convert a Bybit public trade dump (`timestamp` in seconds, `price`,
+    `size`; plain or gzipped CSV) into a tick file. Returns the tick count.
+    """
+    count = 0
+    last_time = None
+    open(dst, "wb").close()
+    for chunk in pd.read_csv(src, usecols=["timestamp", "price", "size"], chunksize=chunksize):
+        chunk = chunk.sort_values("timestamp", kind="stable")
+        times = np.round(chunk["timestamp"].to_numpy(dtype=np.float64) * 1000).astype(np.int64)
+        if len(times) and last_time is not None and times[0] < last_time:
+            raise ValueError(f"Trades in {src} are not in time order")
+        write_ticks(dst, times, chunk["price"].to_numpy(), chunk["size"].to_numpy(), append=True)
+        count += len(times)
+        if len(times):
+            last_time = times[-1]
+    return count
+
+
+def iter_bar_chunks(times, step, chunk_ticks=CHUNK_TICKS):
+    """
+    Yield (start, stop) tick ranges of about `chunk_ticks` that always end on
+    a bar boundary, so no bar is split across chunks.
+    """
+    n = len(times)
+    start = 0
+    while start < n:
+        stop = min(start + chunk_ticks, n)
+        if stop < n:
+            boundary = (int(times[stop - 1]) // step + 1) * step  # End of the bar holding the last tick
+            stop = int(np.searchsorted(times, boundary, side="left"))
+        yield start, stop
+        start = stop
+
+
+def _aggregate(t, p, v, step):
+    """
+    OHLCV bars of one chunk: (open_times, starts, ends, open, high, low, close, volume).
+    """
+    bar_ids = t // step
+    starts = np.flatnonzero(np.r_[True, bar_ids[1:] != bar_ids[:-1]])
+    ends = np.r_[starts[1:], len(t)]
+    return (bar_ids[starts] * step, starts, ends, p[starts], np.maximum.reduceat(p, starts),
+            np.minimum.reduceat(p, starts), p[ends - 1], np.add.reduceat(v, starts))
+
+
+def ticks_to_bars(ticks, interval, chunk_ticks=CHUNK_TICKS):
+    """
+    Aggregate a tick array into an OHLCV DataFrame indexed by bar open time.
+    """
+    step = interval_ms(interval)
+    parts = []
+    for start, stop in iter_bar_chunks(ticks["time"], step, chunk_ticks):
+        chunk = np.asarray(ticks[start:stop])
+        open_times, _, _, o, h, l, c, v = _aggregate(chunk["time"], chunk["price"], chunk["size"], step)
+        parts.append(pd.DataFrame({"Open": o, "High": h, "Low": l, "Close": c, "Volume": v},
+                                  index=pd.to_datetime(open_times, unit="ms")))
+    if not parts:
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+    df = pd.concat(parts)
+    df.index.name = "datetime"
+    return df
+
+
+class _Trade:
+    __slots__ = ("size", "entry_price", "entry_level", "sl", "tp", "stop", "stop_reason", "trigger", "entry_time")
+
+    def __init__(self, size, entry_price, entry_level, sl, tp, trigger, max_loss, entry_time):
+        self.size = size
+        self.entry_price = entry_price
+        self.entry_level = entry_level
+        self.sl = sl
+        self.tp = tp
+        self.stop = sl
+        self.stop_reason = "sl"
+        if max_loss is not None and entry_level * (1 - max_loss) > sl:
+            self.stop = entry_level * (1 - max_loss)
+            self.stop_reason = "max_loss"
+        self.trigger = trigger  # Price that moves the stop to breakeven
+        self.entry_time = entry_time
+
+
+class TickReplay:
+    """
+    Replays a tick file through the `FibonacciStrategy` rules.
+
+    Ticks are read from the memory-mapped file in chunks that end on bar
+    boundaries and aggregated into bars with `reduceat`; the strategy decides
+    once per closed bar, exactly like `next()`. Fills use real trade prices:
+    entries at the first tick of the next bar, and stops, take-profits and the
+    breakeven move from `adjust_stop_loss` at the first tick that crosses
+    them, found with a vectorized scan of the bar's ticks. Bars without an
+    open trade never look at their ticks individually.
+    """
+    def __init__(self, ticks, interval="15", cash=10000, commission=.002, ema_length=150,
+                 entry_band=ENTRY_BAND, risk=RISK_PER_TRADE, fib_ratios=ENTRY_RATIOS,
+                 breakeven=True, max_loss=MAX_LOSS, chunk_ticks=CHUNK_TICKS):
+        self.ticks = open_ticks(ticks) if isinstance(ticks, (str, os.PathLike)) else ticks
+        self.step = interval_ms(interval)
+        self.cash = cash
+        self.commission = commission
+        self.ema_length = ema_length
+        self.entry_band = entry_band
+        self.risk = risk
+        self.fib_ratios = fib_ratios
+        self.breakeven = breakeven
+        self.max_loss = max_loss
+        self.chunk_ticks = chunk_ticks
+
+    def run(self):
+        """
+        Replay all ticks. Returns a dict with the closed `trades` (DataFrame),
+        `equity_final`, `open_trades`, `cancelled`, `ticks`, `bars` and
+        `ticks_per_second`.
+        """
+        started = time.perf_counter()
+        self._cash = self.cash
+        self._trades = []
+        self._closed = []
+        ema = StreamingEMA(self.ema_length)
+        grid = None
+        pending = None  # (size, sl, tp, entry_level, trigger) filled at the next bar's first tick
+        last_bar = None  # (high, low) of the previous bar
+        cancelled = 0
+        bars = 0
+        last_price = None
+        fee = self.commission
+
+        for start, stop in iter_bar_chunks(self.ticks["time"], self.step, self.chunk_ticks):
+            chunk = np.asarray(self.ticks[start:stop])
+            t = np.ascontiguousarray(chunk["time"])
+            p = np.ascontiguousarray(chunk["price"])
+            _, starts, ends, _, highs, lows, closes, _ = _aggregate(t, p, chunk["size"], self.step)
+
+            for k in range(len(starts)):
+                s, e = starts[k], ends[k]
+                if pending is not None:
+                    size, sl, tp, entry_level, trigger = pending
+                    pending = None
+                    price = p[s]
+                    equity = self._equity(price)
+                    margin_available = max(0, equity - sum(trade.size * price for trade in self._trades))
+                    size = order_units(size, price, margin_available, fee)
+                    if size:
+                        self._trades.append(_Trade(size, price, entry_level, sl, tp, trigger, self.max_loss, t[s]))
+                        self._cash -= size * price * fee
+                    else:
+                        cancelled += 1
+                if self._trades:
+                    self._scan(t, p, s, e)
+
+                # Bar close: the strategy's `next()`
+                high, low, close = highs[k], lows[k], closes[k]
+                ema_value = ema.update(close)
+                if grid is None:
+                    if last_bar is not None:
+                        impulse_detected, fib_levels = detect_impulse(last_bar[0], last_bar[1], high, low)
+                        if impulse_detected:
+                            grid = FibGrid.from_levels(fib_levels, self.fib_ratios)
+                else:
+                    found = grid.find_entry(close, ema_value, self.entry_band)
+                    keep = False
+                    if found is not None:
+                        entry, sl, tp, is_midpoint = found
+                        size = position_size(self._equity(close), close, sl, self.risk)
+                        if size > 0:
+                            pending = (size, sl, tp, entry, self._trigger(grid, entry))
+                            keep = not is_midpoint
+                    if not keep and not self._trades:
+                        grid = None
+                last_bar = (high, low)
+            bars += len(starts)
+            if len(p):
+                last_price = p[-1]
+
+        elapsed = time.perf_counter() - started
+        trades = pd.DataFrame(self._closed, columns=TRADE_COLUMNS)
+        for column in ("EntryTime", "ExitTime"):
+            trades[column] = pd.to_datetime(trades[column].to_numpy(dtype=np.int64), unit="ms")
+        return {
+            "trades": trades,
+            "equity_final": self._equity(last_price) if last_price is not None else self._cash,
+            "open_trades": len(self._trades),
+            "cancelled": cancelled,
+            "ticks": len(self.ticks),
+            "bars": bars,
+            "ticks_per_second": len(self.ticks) / elapsed if elapsed else float("inf"),
+        }
+
+    def _equity(self, price):
+        return self._cash + sum(trade.size * (price - trade.entry_price) for trade in self._trades)
+
+    def _trigger(self, grid, entry):
+        """
+        Breakeven trigger: the nearest grid level above the entry level.
+        """
+        if not self.breakeven:
+            return np.inf
+        return min((level for level in grid.levels if level > entry), default=grid.high)
+
+    def _scan(self, t, p, start, stop):
+        """
+        Walk the ticks [start, stop) of one bar from one stop/target crossing
+        to the next, handling each at the tick where it happens.
+        """
+        cursor = start
+        while self._trades and cursor < stop:
+            lower = max(trade.stop for trade in self._trades)
+            upper = min(min(trade.tp, trade.trigger) for trade in self._trades)
+            segment = p[cursor:stop]
+            hits = np.flatnonzero((segment <= lower) | (segment >= upper))
+            if not len(hits):
+                return
+            i = cursor + hits[0]
+            price = p[i]
+            for trade in list(self._trades):
+                if price <= trade.stop:
+                    self._close(trade, price, t[i], trade.stop_reason)
+                elif price >= trade.tp:
+                    self._close(trade, price, t[i], "tp")
+                elif price >= trade.trigger:
+                    if trade.entry_level > trade.stop:
+                        trade.stop = trade.entry_level  # Move stop-loss to breakeven
+                        trade.stop_reason = "breakeven"
+                    trade.trigger = np.inf
+            cursor = i + 1
+
+    def _close(self, trade, price, exit_time, reason):
+        self._trades.remove(trade)
+        commission = trade.size * price * self.commission
+        self._cash += trade.size * (price - trade.entry_price) - commission
+        pnl = trade.size * (price - trade.entry_price) - (commission + trade.size * trade.entry_price * self.commission)
+        self._closed.append((trade.size, trade.entry_time, exit_time, trade.entry_price, price,
+                             trade.sl, trade.tp, pnl, reason))
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m scripts.tick_replay ticks.bin --interval 15
+    parser = argparse.ArgumentParser(description="Replay a tick file through the Fibonacci strategy.")
+    parser.add_argument("ticks", help="Tick file (written by write_ticks or --import-csv)")
+    parser.add_argument("--import-csv", help="Convert this Bybit trade dump into the tick file first")
+    parser.add_argument("--interval", default="15", help="Bar interval (default: 15)")
+    parser.add_argument("--cash", type=float, default=10000, help="Starting cash")
+    parser.add_argument("--no-breakeven", action="store_true", help="Keep the stop-loss at the grid low")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        print(f"Imported {import_trades_csv(args.import_csv, args.ticks)} ticks into {args.ticks}")
+    result = TickReplay(args.ticks, args.interval, cash=args.cash, breakeven=not args.no_breakeven).run()
+    print(result["trades"].to_string())
+    print(f"Equity: {result['equity_final']:.2f}, {result['ticks']} ticks, {result['bars']} bars, "
+          f"{result['ticks_per_second'] / 1e6:.1f}M ticks/s")
@@ -1,135 +1,172 @@
 import os
+import argparse
+import asyncio
 import logging
-from time import sleep
-from datetime import datetime
-from dotenv import load_dotenv
-from pybit.unified_trading import WebSocketTrading
-from scripts.fibo_algo import run_fibonacci_strategy_with_testnet
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
-logger = logging.getLogger(__name__)
+from time import sleep, time
+from scripts.backfill import TESTNET_REST_URL, BackfillClient
+from scripts.candle_store import DEFAULT_ROOT, CandleStore, candle_open_time, interval_ms
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.kline_stream import TESTNET_PUBLIC_URL, KlineStreamEngine
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_SELL
+from scripts.order_manager import AsyncOrderManager, OrderIntent
+from scripts.metrics import METRICS, span
+from scripts.rest_client import backoff_delay
+from scripts.snapshot import load_snapshot
+
+# Live trading only needs the indicators, the stream and the order pipeline.
+# Nothing here may import backtesting (which loads bokeh) or other plotting
+# packages: a restarted bot should be trading again well under a second.
+# `tests/test_startup.py` enforces this.
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Fetch API key from environment variables
-API_KEY = os.getenv("BYBIT_TESTNET_API_KEY")
+# Testnet prices differ from mainnet, so testnet candles get their own store
+CANDLE_ROOT = os.path.join(DEFAULT_ROOT, "testnet")
+SNAPSHOT_ROOT = os.path.join("data", "snapshots", "testnet")
 
-# Initialize Bybit WebSocket Testnet client
-ws_trading = WebSocketTrading(
-    testnet=True,
-    api_key=API_KEY,
-)
+def snapshot_path(symbol, interval):
+    return os.path.join(SNAPSHOT_ROOT, f"{symbol}_{interval}.snap")
 
-def handle_place_order_message(message):
+def connect_ws_trading():
     """
-    Handle the response after placing an order.
+    Create the Bybit WebSocket Testnet trading client. pybit is imported
+    here, so importing this module never opens a connection.
     """
-    order_data = message.get("data", {})
-    logger.info(
-        f"Order placed: ID={order_data.get('orderId')}, "
-        f"Symbol={order_data.get('symbol')}, "
-        f"Side={order_data.get('side')}, "
-        f"Qty={order_data.get('qty')}, "
-        f"Price={order_data.get('price')}, "
-        f"Time={datetime.now()}"
-    )
-    sleep(1)
-    # Example: Amend the order
-    ws_trading.amend_order(
-        handle_amend_order_message,
-        category="linear",
-        symbol="BTCUSDT",
-        order_id=order_data.get("orderId"),
-        qty="0.002"
-    )
-    sleep(1)
-    # Example: Cancel the order
-    ws_trading.cancel_order(
-        handle_cancel_order_message,
-        category="linear",
-        symbol="BTCUSDT",
-        order_id=order_data.get("orderId")
+    from pybit.unified_trading import WebSocketTrading
+
+    return WebSocketTrading(
+        testnet=True,
+        api_key=os.getenv("BYBIT_TESTNET_API_KEY"),
     )
 
-def handle_amend_order_message(message):
+def load_seed_candles(candle_store, backfill_client, symbol, interval, limit):
     """
-    Handle the response after amending an order.
+    Sync the local candle store with Bybit Testnet and return the last
+    `limit` closed candles with lowercase columns.
     """
-    logger.info(f"Order amended: {message}")
+    step = interval_ms(interval)
+    end = candle_open_time(int(time() * 1000), interval) - step  # Last closed candle
+    candle_store.sync(backfill_client.fetch, symbol, interval, end - (limit - 1) * step, end)
+    return candle_store.to_frame(symbol, interval, tail=limit).rename(columns=str.lower)
 
-def handle_cancel_order_message(message):
+def resume_strategy(candle_store, backfill_client, symbol, interval, path):
     """
-    Handle the response after canceling an order.
+    Restore the strategy from its snapshot and feed it only the candles that
+    closed since it was written. Returns None when there is no usable snapshot.
     """
-    logger.info(f"Order canceled: {message}")
+    strategy = load_snapshot(path, symbol, interval)
+    if strategy is None or strategy.last_closed_time is None:
+        return None
+    step = interval_ms(interval)
+    start = strategy.last_closed_time.value // 1_000_000 + step  # First missed candle
+    end = candle_open_time(int(time() * 1000), interval) - step  # Last closed candle
+    if start <= end:
+        candle_store.sync(backfill_client.fetch, symbol, interval, start, end)
+        missed = candle_store.to_frame(symbol, interval, start=start, end=end).rename(columns=str.lower)
+        strategy.sync(missed, includes_current=False)
+        logger.info(f"Strategy restored from {path}, {len(missed)} missed candles replayed.")
+    else:
+        logger.info(f"Strategy restored from {path}, no missed candles.")
+    return strategy
 
-def handle_batch_place_order_message(message):
+def place_signal_order(order_manager, symbol, qty, result):
     """
-    Handle the response after placing batch orders.
+    Queue a market order with the strategy's stop loss and take profit.
+    Does not wait for the acknowledgement, which the order manager logs.
     """
-    logger.info(f"Batch orders placed: {message}")
+    signal = result["signal"]
+    stop_loss = result["stop_loss"]
+    take_profit = result["take_profit"]
+
+    logger.info(f"Strategy result: Signal={signal}, Stop Loss={stop_loss}, Take Profit={take_profit}")
+
+    if signal == SIGNAL_BUY:
+        logger.info("Buy signal detected. Placing a buy order...")
+        side = "Buy"
+    elif signal == SIGNAL_SELL:
+        logger.info("Sell signal detected. Placing a sell order...")
+        side = "Sell"
+    else:
+        logger.info("No valid signal detected. No action taken.")
+        return
+    with span("place_order"):
+        order_manager.submit(OrderIntent(symbol, side, qty, stop_loss=stop_loss, take_profit=take_profit))
 
 def trade_on_testnet(symbol, interval, limit, qty):
     """
-    Continuously fetch data from Bybit Testnet, run the Fibonacci strategy, and trade based on signals.
+    Seed the Fibonacci strategy from Bybit Testnet history (or resume it
+    from its snapshot), then trade on every kline update pushed by the
+    WebSocket stream.
     """
     logger.info("Starting trading on Bybit Testnet...")
+    backfill_client = BackfillClient(TESTNET_REST_URL)  # REST client for market data
+    candle_store = CandleStore(CANDLE_ROOT)
+    path = snapshot_path(symbol, interval)
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+    attempt = 0
     while True:
         try:
-            logger.info("Analyzing market data...")
-            # Run the Fibonacci strategy
-            result = run_fibonacci_strategy_with_testnet(symbol, interval, limit)
-
-            # Extract signal, stop loss, and take profit
-            signal = result["signal"]
-            stop_loss = result["stop_loss"]
-            take_profit = result["take_profit"]
-
-            logger.info(f"Strategy result: Signal={signal}, Stop Loss={stop_loss}, Take Profit={take_profit}")
-
-            if signal == 1:  # Buy signal
-                logger.info("Buy signal detected. Placing a buy order...")
-                ws_trading.place_order(
-                    handle_place_order_message,
-                    category="linear",
-                    symbol=symbol,
-                    side="Buy",
-                    orderType="Market",
-                    qty=str(qty),
-                    timeInForce="GTC"
-                )
-            elif signal == 2:  # Sell signal
-                logger.info("Sell signal detected. Placing a sell order...")
-                ws_trading.place_order(
-                    handle_place_order_message,
-                    category="linear",
-                    symbol=symbol,
-                    side="Sell",
-                    orderType="Market",
-                    qty=str(qty),
-                    timeInForce="GTC"
-                )
-            else:
-                logger.info("No valid signal detected. No action taken.")
-
-            # Wait before the next iteration
-            sleep(60)  # Wait for 1 minute before fetching new data
+            # Resume from the last snapshot plus the missed candles when possible
+            strategy = resume_strategy(candle_store, backfill_client, symbol, interval, path)
+            if strategy is None:
+                # Seed indicators once from the local store; only missing candles are fetched
+                history = load_seed_candles(candle_store, backfill_client, symbol, interval, limit)
+                strategy = LiveFibonacciStrategy().seed(history)
+                logger.info(f"Strategy seeded with {len(history)} candles.")
+            break
         except Exception as e:
-            logger.error(f"An error occurred: {e}")
-            sleep(60)  # Wait for 1 minute before retrying
+            # Retry quickly after a blip, backing off up to a minute if the outage lasts
+            delay = backoff_delay(attempt, base=1)
+            attempt += 1
+            logger.error(f"An error occurred: {e}. Retrying in {delay:.1f} seconds.")
+            sleep(delay)
+
+    ws_trading = connect_ws_trading()
+
+    async def run():
+        order_manager = AsyncOrderManager(ws_trading, category="linear")
+        order_manager.start()
+        engine = KlineStreamEngine(
+            symbol, interval, strategy,
+            on_signal=lambda result, candle: place_signal_order(order_manager, symbol, qty, result),
+            snapshot_path=path,
+            fetch=backfill_client.fetch,  # Candles missed while the stream was down
+        )
+        try:
+            await engine.run(TESTNET_PUBLIC_URL)
+        finally:
+            await order_manager.close(timeout=10)
+            logger.info(f"Order acknowledgement latency: {order_manager.latency_summary()}")
+
+    try:
+        asyncio.run(run())
+    finally:
+        backfill_client.close()
 
 if __name__ == "__main__":
-    # Define trading parameters
-    SYMBOL = "BTCUSDT"  # Trading pair
-    INTERVAL = "15"     # Timeframe in minutes
-    LIMIT = 200         # Number of candlesticks to fetch
-    QTY = 0.01          # Order quantity
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Trade the Fibonacci strategy on Bybit Testnet.")
+    parser.add_argument("--symbol", default="BTCUSDT", help="Trading pair (default: BTCUSDT)")
+    parser.add_argument("--interval", default="15", help="Timeframe in minutes (default: 15)")
+    parser.add_argument("--limit", type=int, default=200, help="Candles used to seed the strategy (default: 200)")
+    parser.add_argument("--qty", type=float, default=0.01, help="Order quantity (default: 0.01)")
+    args = parser.parse_args()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+
+    # Load the API keys from the .env file
+    load_dotenv()
+
+    # Export latency histograms for the Prometheus textfile collector when requested
+    METRICS_FILE = os.getenv("FIBO_METRICS_FILE")
+    if METRICS_FILE:
+        METRICS.start_exporter(METRICS_FILE, interval=60)
 
     # Start trading on Bybit Testnet
-    trade_on_testnet(SYMBOL, INTERVAL, LIMIT, QTY)
+    trade_on_testnet(args.symbol, args.interval, args.limit, args.qty)
@@ -0,0 +1,111 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pytest
+from scripts.backfill import BackfillClient, page_windows
+from scripts.bybit_trading import backfill_bybit_data
+from scripts.candle_store import CandleStore, interval_ms
+
+STEP = interval_ms("1")
+
+
+class FakeBybitHandler(BaseHTTPRequestHandler):
+    """
+    Serves synthetic v5 klines. Every third request is rate limited, each page
+    repeats the candle before its window, and one candle is missing. Weekly
+    candles open on Monday, as on Bybit.
+    """
+    requests_seen = 0
+    lock = threading.Lock()
+    missing = 1500 * STEP
+
+    def do_GET(self):
+        with self.lock:
+            FakeBybitHandler.requests_seen += 1
+            rate_limited = FakeBybitHandler.requests_seen % 3 == 0
+        if rate_limited:
+            return self._reply(200, {"retCode": 10006, "retMsg": "Too many visits", "result": {}})
+
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        start, end = int(query["start"]), int(query["end"])
+        step = interval_ms(query["interval"])
+        origin = 4 * interval_ms("D") if query["interval"] == "W" else 0  # 1970-01-05 was a Monday
+        first = origin - (origin - start + step) // step * step  # Overlaps the previous page
+        rows = []
+        for open_time in range(max(first, origin), end + 1, step):
+            if open_time == self.missing:
+                continue
+            price = open_time / STEP
+            rows.append([str(open_time), str(price), str(price + 1), str(price - 1), str(price), "1", "1"])
+        self._reply(200, {"retCode": 0, "retMsg": "OK", "result": {"list": rows[::-1]}})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_bybit():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBybitHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_page_windows_cover_range_without_overlap():
+    windows = page_windows(0, 2500 * STEP, "1")
+    assert windows == [(0, 999 * STEP), (1000 * STEP, 1999 * STEP), (2000 * STEP, 2500 * STEP)]
+
+
+def test_backfill_is_contiguous_and_deduplicated(fake_bybit):
+    """
+    Concurrent pages with retries, overlaps and a gap produce one sorted array.
+    """
+    client = BackfillClient(fake_bybit, max_workers=3, backoff=0.01)
+    try:
+        columns = client.fetch("BTCUSDT", "1", 0, 3499 * STEP)
+    finally:
+        client.close()
+
+    expected = np.delete(np.arange(3500), 1500) * STEP
+    np.testing.assert_array_equal(columns["open_time"], expected)
+    np.testing.assert_array_equal(columns["close"], expected / STEP)
+    assert columns["close"].flags["C_CONTIGUOUS"]
+
+
+def test_backfill_feeds_candle_store(fake_bybit, tmp_path):
+    client = BackfillClient(fake_bybit, backoff=0.01)
+    store = CandleStore(tmp_path)
+    try:
+        assert store.sync(client.fetch, "BTCUSDT", "1", 0, 1199 * STEP) == 1200
+        assert store.sync(client.fetch, "BTCUSDT", "1", 0, 1299 * STEP) == 100
+    finally:
+        client.close()
+    assert store.time_range("BTCUSDT", "1") == (0, 1299 * STEP)
+
+
+def test_backfill_bybit_data_keeps_weekly_candles(fake_bybit):
+    """
+    Weekly windows are aligned to Monday, so no weekly candle is dropped.
+    """
+    assert page_windows(0, 20 * interval_ms("W"), "W")[0][0] == 4 * interval_ms("D")
+    df = backfill_bybit_data("BTCUSDT", "W", "2024-01-01", "2024-06-30", base_url=fake_bybit)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert len(df) == 26 and df.index[0] == pd.Timestamp("2024-01-01")
+    assert (df.index.dayofweek == 0).all()
+
+    df = backfill_bybit_data("BTCUSDT", "15", "2024-01-01", "2024-01-01 02:00", base_url=fake_bybit)
+    assert len(df) == 9 and df.index.is_monotonic_increasing
@@ -0,0 +1,47 @@
+import json
+import numpy as np
+import pytest
+from benchmarks import suite
+from benchmarks.data import synthetic_kline_messages, synthetic_kline_rows, synthetic_ohlcv
+from benchmarks.suite import compare, format_results, load_baselines, run_suite, save_baselines
+
+
+def test_synthetic_data_is_consistent():
+    df = synthetic_ohlcv(1000)
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    np.testing.assert_array_equal(df["Open"].to_numpy()[1:], df["Close"].to_numpy()[:-1])
+    assert synthetic_ohlcv(1000).equals(df)  # Reproducible
+
+    rows = synthetic_kline_rows(3)
+    assert float(rows[0]["close"]) == df["Close"].iloc[0]
+    assert rows[1]["open_time"] - rows[0]["open_time"] == 15 * 60
+
+    messages = [json.loads(message)["data"][0] for message in synthetic_kline_messages(2, updates_per_candle=3)]
+    assert [kline["confirm"] for kline in messages] == [False, False, True, False, False, True]
+
+
+def test_suite_flags_regressions(tmp_path):
+    sizes = {"ema": 1000, "live_update": 200, "stream_message": 40, "vector_backtest": 500, "fetch_bybit_data": 20}
+    results = run_suite(list(sizes), sizes=sizes, repeat=1, min_time=0)
+    assert all(result["rate"] > 0 for result in results.values())
+
+    path = tmp_path / "baselines.json"
+    save_baselines(results, path)
+    baselines = load_baselines(path)
+    assert set(baselines) == set(sizes)
+
+    baselines["ema"]["rate"] = results["ema"]["rate"] * 2  # The baseline was twice as fast
+    baselines["live_update"]["size"] = 100  # Different size: not comparable
+    assert compare(results, baselines, tolerance=0.25) == ["ema"]
+    assert results["live_update"]["status"] == "new"
+    assert "regression" in format_results(results)
+
+
+def test_failing_benchmark_setup_fails_the_suite(monkeypatch):
+    def broken(size):
+        raise ImportError("No module named 'missing'")
+
+    monkeypatch.setitem(suite.BENCHMARKS, "broken", (broken, 10, "rows"))
+    with pytest.raises(ImportError):
+        run_suite(["ema", "broken"], sizes={"ema": 100}, repeat=1, min_time=0)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from scripts import bybit_trading
+from scripts.bybit_trading import fetch_bybit_data, run_bybit_trading
+from scripts.candle_store import interval_ms
+from scripts.kline_buffer import KlineBuffer
+
+STEP = interval_ms("15")
+
+
+class FakeClient:
+    """
+    Serves v5 kline pages (`{"result": {"list": ...}}`, newest first) up to
+    the in-progress candle `current`: flat 90/80 candles with an impulse at
+    candle 300 and a pullback to the 38.2% level at candle 301.
+    """
+    scripted = {300: (110.0, 100.0, 108.0), 301: (86.0, 83.0, 83.82)}
+
+    def __init__(self, current):
+        self.current = current
+        self.limits = []
+        self.orders = []
+
+    def candle(self, i):
+        high, low, close = self.scripted.get(i, (90.0, 80.0, 81.0))
+        return [str(i * STEP), str(close), str(high), str(low), str(close), "1", "1"]
+
+    def query_kline(self, symbol, interval, limit):
+        self.limits.append(limit)
+        rows = [self.candle(i) for i in range(max(0, self.current - limit + 1), self.current + 1)]
+        return {"retCode": 0, "retMsg": "OK", "result": {"list": rows[::-1]}}
+
+    def place_active_order(self, **params):
+        self.orders.append(params)
+        return {"ret_code": 0, "result": {"order_id": str(len(self.orders))}}
+
+
+def test_fetch_parses_v5_pages_into_the_buffer():
+    client = FakeClient(current=50)
+    buffer = KlineBuffer(200)
+    df = fetch_bybit_data(client, "BTCUSDT", "15", limit=20, buffer=buffer)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert len(df) == 20 and df.index[-1] == pd.Timestamp(50 * STEP, unit="ms")
+    assert df.index.is_monotonic_increasing
+
+    client.current = 52
+    df = fetch_bybit_data(client, "BTCUSDT", "15", limit=3, buffer=buffer)
+    assert list(df.index.asi8 // 10**6) == [50 * STEP, 51 * STEP, 52 * STEP]
+    assert len(buffer) == 22, "New candles are appended to the candles already buffered."
+    assert np.shares_memory(df["close"].to_numpy(), buffer.values)
+
+
+def test_polling_reuses_the_ring_buffer_and_places_orders():
+    client = FakeClient(current=299)
+    strategy = run_bybit_trading(client, "BTCUSDT", "15", 0.01, limit=200, now_ms=299 * STEP + 1)
+    buffer = bybit_trading._kline_buffers["BTCUSDT", "15"]
+    assert strategy.last_closed_time == pd.Timestamp(298 * STEP, unit="ms")
+
+    for current in (300, 301, 302):  # Impulse, pullback, and the candle that confirms it
+        client.current = current
+        now_ms = current * STEP + 1
+        assert run_bybit_trading(client, "BTCUSDT", "15", 0.01, strategy=strategy, now_ms=now_ms) is strategy
+    assert bybit_trading._kline_buffers["BTCUSDT", "15"] is buffer
+    assert strategy.last_closed_time == pd.Timestamp(301 * STEP, unit="ms")
+    assert len(client.orders) == 1
+    order = client.orders[0]
+    assert order["side"] == "Buy" and order["stop_loss"] == 80.0 and order["take_profit"] == 90.0
+    assert client.limits[1:] == [2, 2, 2]
+
+
+def test_polling_replays_candles_missed_between_calls():
+    strategies = []
+    for currents in ([310], range(300, 311)):  # One late call, or a call on every candle
+        client = FakeClient(current=299)
+        strategy = run_bybit_trading(client, "BTCUSDT", "15", 0.01, limit=200, now_ms=299 * STEP + 1)
+        for current in currents:
+            client.current = current
+            run_bybit_trading(client, "BTCUSDT", "15", 0.01, strategy=strategy, now_ms=current * STEP + 1)
+        strategies.append(strategy)
+
+    late, punctual = strategies
+    assert late.last_closed_time == punctual.last_closed_time == pd.Timestamp(309 * STEP, unit="ms")
+    assert (late.ema.value, late.rsi.value, late.last_candle) == \
+        (punctual.ema.value, punctual.rsi.value, punctual.last_candle)
@@ -0,0 +1,131 @@
+import os
+import numpy as np
+import pytest
+from scripts.candle_store import COLUMNS, CandleStore, interval_ms, parse_kline_rows
+
+STEP = interval_ms("15")
+
+
+def make_candles(start, n):
+    open_time = start + STEP * np.arange(n, dtype=np.int64)
+    close = 100.0 + np.arange(n, dtype=np.float64)
+    return {"open_time": open_time, "open": close, "high": close + 1, "low": close - 1,
+            "close": close, "volume": np.ones(n)}
+
+
+def test_write_appends_and_merges(tmp_path):
+    """
+    Appends extend the store; earlier and overlapping candles are merged in order.
+    """
+    store = CandleStore(tmp_path)
+    assert store.write("BTCUSDT", "15", make_candles(10 * STEP, 5)) == 5
+    assert store.write("BTCUSDT", "15", make_candles(15 * STEP, 5)) == 5
+    assert store.write("BTCUSDT", "15", make_candles(5 * STEP, 7)) == 5  # Overlaps two stored rows
+
+    columns = store.load("BTCUSDT", "15")
+    assert isinstance(columns["close"], np.memmap)
+    np.testing.assert_array_equal(columns["open_time"], STEP * np.arange(5, 20))
+    assert columns["close"][5] == 100.0, "Stored rows must win over overlapping new rows."
+
+
+def test_sync_fetches_only_missing_ranges(tmp_path):
+    """
+    `sync` requests only the ranges outside what is already stored.
+    """
+    store = CandleStore(tmp_path)
+    store.write("BTCUSDT", "15", make_candles(10 * STEP, 10))
+    requested = []
+
+    def fetch(symbol, interval, start, end):
+        requested.append((start, end))
+        return make_candles(start, (end - start) // STEP + 2)  # Includes one in-progress candle
+
+    added = store.sync(fetch, "BTCUSDT", "15", 0, 29 * STEP)
+    assert requested == [(0, 9 * STEP), (20 * STEP, 29 * STEP)]
+    assert added == 20
+    assert store.time_range("BTCUSDT", "15") == (0, 29 * STEP)
+    assert store.sync(fetch, "BTCUSDT", "15", 0, 29 * STEP) == 0
+    assert len(requested) == 2, "A fully cached range must not hit the exchange."
+
+
+def test_sync_fills_holes_inside_the_stored_range(tmp_path):
+    """
+    Syncing a later window leaves a hole that the next wider sync must fetch.
+    """
+    store = CandleStore(tmp_path)
+    requested = []
+
+    def fetch(symbol, interval, start, end):
+        requested.append((start, end))
+        return make_candles(start, (end - start) // STEP + 1)
+
+    store.sync(fetch, "BTCUSDT", "15", 0, 99 * STEP)
+    store.sync(fetch, "BTCUSDT", "15", 500 * STEP, 599 * STEP)
+    assert store.missing_ranges("BTCUSDT", "15", 50 * STEP, 549 * STEP) == [(100 * STEP, 499 * STEP)]
+    assert store.missing_ranges("BTCUSDT", "15", 200 * STEP, 300 * STEP) == [(200 * STEP, 300 * STEP)]
+    assert store.sync(fetch, "BTCUSDT", "15", 0, 599 * STEP) == 400
+    assert requested[-1] == (100 * STEP, 499 * STEP)
+    assert len(store.to_frame("BTCUSDT", "15")) == 600
+    assert store.missing_ranges("BTCUSDT", "15", 0, 599 * STEP) == []
+
+
+def test_to_frame_slices_and_ignores_uncommitted_rows(tmp_path):
+    """
+    Frames use backtesting column names; rows written without a commit stay hidden.
+    """
+    store = CandleStore(tmp_path)
+    store.write("BTCUSDT", "15", make_candles(0, 10))
+    with open(tmp_path / "BTCUSDT" / "15" / "close.bin", "ab") as f:
+        np.zeros(3).tofile(f)  # Simulates an interrupted append
+
+    df = store.to_frame("BTCUSDT", "15", start=2 * STEP, end=6 * STEP)
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert len(df) == 5 and df["Close"].iloc[0] == 102.0
+    assert len(store.to_frame("BTCUSDT", "15", tail=3)) == 3
+
+    store.write("BTCUSDT", "15", make_candles(10 * STEP, 1))
+    assert store.load("BTCUSDT", "15")["close"][10] == 100.0
+
+
+def test_interrupted_merge_leaves_the_committed_columns(tmp_path, monkeypatch):
+    """
+    A merge that stops before its commit must not expose a mix of old and new columns.
+    """
+    store = CandleStore(tmp_path)
+    store.write("BTCUSDT", "15", make_candles(10 * STEP, 5))
+
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(CandleStore, "_commit", staticmethod(crash))
+        with pytest.raises(KeyboardInterrupt):
+            store.write("BTCUSDT", "15", make_candles(5 * STEP, 5))  # Earlier candles force a merge
+
+    columns = store.load("BTCUSDT", "15")
+    np.testing.assert_array_equal(columns["open_time"], STEP * np.arange(10, 15))
+    np.testing.assert_array_equal(columns["close"], 100.0 + np.arange(5))
+
+    assert store.write("BTCUSDT", "15", make_candles(5 * STEP, 5)) == 5
+    np.testing.assert_array_equal(store.load("BTCUSDT", "15")["open_time"], STEP * np.arange(5, 15))
+    assert sorted(os.listdir(tmp_path / "BTCUSDT" / "15")) == sorted(
+        ["meta.json"] + [f"{name}.1.bin" for name in COLUMNS]), "The previous generation is removed."
+
+
+def test_iter_chunks_maps_bounded_windows(tmp_path):
+    store = CandleStore(tmp_path)
+    store.write("BTCUSDT", "15", make_candles(0, 10))
+    chunks = list(store.iter_chunks("BTCUSDT", "15", 4))
+    assert [len(chunk["close"]) for chunk in chunks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate([chunk["open_time"] for chunk in chunks]), STEP * np.arange(10))
+
+    chunks = list(store.iter_chunks("BTCUSDT", "15", 3, start=2 * STEP, end=6 * STEP))
+    np.testing.assert_array_equal(np.concatenate([chunk["close"] for chunk in chunks]), 100.0 + np.arange(2, 7))
+    assert list(store.iter_chunks("ETHUSDT", "15", 3)) == []
+
+
+def test_parse_kline_rows_orders_oldest_first():
+    rows = [["2000", "2", "3", "1", "2.5", "10", "0"], ["1000", "1", "2", "0.5", "1.5", "5", "0"]]
+    columns = parse_kline_rows(rows)
+    np.testing.assert_array_equal(columns["open_time"], [1000, 2000])
+    np.testing.assert_array_equal(columns["close"], [1.5, 2.5])
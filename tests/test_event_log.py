@@ -0,0 +1,41 @@
+import contextlib
+import io
+from backtesting import Backtest
+from backtesting.test import GOOG
+from scripts.event_log import DEBUG, INFO, WARNING, EventRecorder, read_events
+from scripts.fibo_algo import FibonacciStrategy
+
+
+def test_recorder_filters_by_level_and_writes_in_batches(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    recorder = EventRecorder(str(path), level=INFO, batch_size=3)
+    recorder.record(DEBUG, "candidate", 1, entry=1.0)  # Below the level, dropped
+    for bar in range(4):
+        recorder.record(INFO, "impulse", bar, low=1.0, high=2.0)
+    assert len(read_events(path)) == 3, "The first full batch should be on disk."
+    recorder.record(WARNING, "rejected", 5, reason="levels")
+    recorder.close()
+
+    events = read_events(path)
+    assert [event["bar"] for event in events] == [0, 1, 2, 3, 5]
+    assert read_events(path, kind="rejected")[0]["reason"] == "levels"
+
+
+def test_backtest_is_silent_and_traces_on_request(tmp_path):
+    """
+    The strategy prints nothing by default; a recorder captures its orders.
+    """
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        plain = Backtest(GOOG, FibonacciStrategy, cash=10000, commission=.002).run()
+    assert stdout.getvalue() == ""
+
+    path = tmp_path / "trace.jsonl"
+    recorder = EventRecorder(str(path), level="info")
+    traced = Backtest(GOOG, FibonacciStrategy, cash=10000, commission=.002).run(event_recorder=recorder)
+    recorder.close()
+
+    assert traced["# Trades"] == plain["# Trades"]
+    orders = read_events(path, kind="order")
+    assert len(orders) >= traced["# Trades"], "Every trade starts with a recorded order."
+    assert read_events(path, kind="impulse"), "Impulses should be traced."
@@ -0,0 +1,74 @@
+import numpy as np
+from scripts.fib_grid import FibGrid, FibGridIndex
+from scripts.fibo_signals import ENTRY_BAND, ENTRY_RATIOS, detect_impulse, find_entry
+
+
+def random_grids(rng, count):
+    lows = rng.uniform(50, 150, count)
+    highs = lows * rng.uniform(1.01, 1.3, count)
+    return lows, highs
+
+
+def brute_force_lookup(lows, highs, alive, close):
+    hits = {}
+    for slot in np.flatnonzero(alive):
+        for ratio in ENTRY_RATIOS:
+            entry = lows[slot] + ratio * (highs[slot] - lows[slot])
+            if abs(close - entry) < ENTRY_BAND * entry:
+                hits[int(slot)] = entry
+                break
+    return hits
+
+
+def test_grid_behaves_like_level_dict():
+    _, fib_levels = detect_impulse(110.0, 100.0, 115.0, 106.0)
+    grid = FibGrid.from_levels(fib_levels)
+    assert dict(**grid) == fib_levels
+    assert grid["61.8%"] == fib_levels["61.8%"]
+
+
+def test_grid_find_entry_matches_signal_rules():
+    rng = np.random.default_rng(1)
+    lows, highs = random_grids(rng, 200)
+    for low, high in zip(lows, highs):
+        _, fib_levels = detect_impulse(high, low, high + 1, high)
+        grid = FibGrid.from_levels(fib_levels)
+        for close in rng.uniform(low * 0.95, high * 1.05, 20):
+            ema_value = rng.choice([0.0, 1e9])
+            assert grid.find_entry(close, ema_value) == find_entry(fib_levels, close, ema_value)
+
+
+def test_index_lookup_matches_brute_force():
+    rng = np.random.default_rng(2)
+    index = FibGridIndex(capacity=4)  # Forces several resizes
+    lows, highs = random_grids(rng, 3000)
+    slots = index.add_many(lows[:2000], highs[:2000])
+    slots = np.concatenate([slots, [index.add(low, high) for low, high in zip(lows[2000:], highs[2000:])]])
+    index.remove_many(slots[::3])
+    assert len(index) == 2000
+
+    for close in rng.uniform(50, 190, 200):
+        found_slots, entries = index.lookup(close)
+        expected = brute_force_lookup(index.lows, index.highs, index.alive, close)
+        assert dict(zip(found_slots.tolist(), entries.tolist())) == expected
+
+    # Removed slots are reused
+    reused = index.add(100.0, 110.0)
+    assert reused in set(slots[::3].tolist())
+    assert index.grid(reused).levels == FibGrid(100.0, 110.0).levels
+
+
+def test_index_range_lookup():
+    rng = np.random.default_rng(3)
+    index = FibGridIndex()
+    lows, highs = random_grids(rng, 500)
+    index.add_many(lows, highs)
+    for low in rng.uniform(50, 190, 50):
+        high = low * 1.01
+        expected = set()
+        for slot in np.flatnonzero(index.alive):
+            for ratio in ENTRY_RATIOS:
+                entry = index.lows[slot] + ratio * (index.highs[slot] - index.lows[slot])
+                if entry + ENTRY_BAND * entry > low and entry - ENTRY_BAND * entry < high:
+                    expected.add(int(slot))
+        assert set(index.lookup_range(low, high).tolist()) == expected
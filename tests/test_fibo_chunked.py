@@ -0,0 +1,62 @@
+import tracemalloc
+
+import pandas as pd
+import pytest
+from backtesting import Backtest
+from backtesting.test import GOOG
+from benchmarks.data import synthetic_ohlcv
+from scripts.candle_store import CandleStore
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.fibo_chunked import ChunkedBacktest, replay_chunks
+from scripts.fibo_vector import TRADE_COLUMNS, VectorBacktest
+from tests.test_fibo_vector import random_walk
+
+
+def store_frame(store, symbol, df):
+    store.write(symbol, "15", {"open_time": df.index.asi8 // 10**6,
+                               **{name.lower(): df[name].to_numpy() for name in df.columns}})
+
+
+def assert_same_result(result, expected):
+    pd.testing.assert_frame_equal(result["trades"], expected["trades"])
+    for key in ("equity_final", "open_trades", "cancelled"):
+        assert result[key] == expected[key]
+
+
+@pytest.mark.parametrize("chunk_bars", [1, 3, 150, 1000, 100_000])
+def test_goog_trades_match_in_memory_run(tmp_path, chunk_bars):
+    store = CandleStore(tmp_path)
+    store_frame(store, "GOOG", GOOG)
+    result = ChunkedBacktest(store, "GOOG", "15", chunk_bars=chunk_bars).run()
+    assert_same_result(result, VectorBacktest(GOOG).run())
+
+    stats = Backtest(GOOG, FibonacciStrategy, cash=10000, commission=.002).run()
+    expected = stats["_trades"][TRADE_COLUMNS].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result["trades"][TRADE_COLUMNS], expected, check_dtype=False)
+    assert result["equity_final"] == stats["Equity Final [$]"]
+
+
+def test_random_walk_trades_match_in_memory_run(tmp_path):
+    store = CandleStore(tmp_path)
+    for seed, cash, params in [(0, 10000, {}), (1, 1_000_000, {"ema_length": 30}), (2, 500, {"risk": 0.05})]:
+        df = random_walk(seed)
+        store_frame(store, f"RW{seed}", df)
+        expected = VectorBacktest(df, cash=cash).run(**params)
+        for chunk_bars in (7, 500):
+            assert_same_result(ChunkedBacktest(store, f"RW{seed}", "15", cash=cash, chunk_bars=chunk_bars).run(**params),
+                               expected)
+
+    with pytest.raises(ValueError):
+        replay_chunks(iter([]))
+
+
+def test_peak_memory_does_not_grow_with_history(tmp_path):
+    store = CandleStore(tmp_path)
+    peaks = []
+    for n in (20_000, 80_000):
+        store_frame(store, f"S{n}", synthetic_ohlcv(n))
+        tracemalloc.start()
+        ChunkedBacktest(store, f"S{n}", "15", cash=1_000_000, chunk_bars=5000).run(risk=0.002)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < 1.3 * peaks[0]  # Four times the history, about the same peak
@@ -0,0 +1,47 @@
+import pandas as pd
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_NONE
+
+
+def make_candles(rows, start="2024-01-01"):
+    """
+    Build a candle DataFrame from (high, low, close) tuples.
+    """
+    index = pd.date_range(start, periods=len(rows), freq="15min")
+    df = pd.DataFrame(rows, columns=["high", "low", "close"], index=index)
+    df["open"] = df["close"]
+    df["volume"] = 1.0
+    return df
+
+
+def test_impulse_then_retracement_emits_buy():
+    """
+    An impulse candle followed by a pullback to the 38.2% level is a buy.
+    """
+    history = make_candles([(90.0, 80.0, 81.0)] * 20)
+    strategy = LiveFibonacciStrategy(ema_length=150, rsi_length=3).seed(history)
+
+    impulse = strategy.update(high=110.0, low=100.0, close=108.0)
+    assert impulse["signal"] == SIGNAL_NONE, "An impulse candle alone should not trigger a buy."
+    assert strategy.active_fib is not None, "The impulse should activate a Fibonacci grid."
+
+    # The grid spans the 80-90 candle; 83.82 is its 38.2% retracement
+    result = strategy.update(high=86.0, low=83.0, close=83.82)
+    assert result["signal"] == SIGNAL_BUY, "A pullback to an entry level should trigger a buy."
+    assert result["stop_loss"] == 80.0 and result["take_profit"] == 90.0
+
+
+def test_sync_only_feeds_new_closed_candles():
+    """
+    `sync` skips candles it has seen and leaves the in-progress candle out.
+    """
+    df = make_candles([(90.0 + i, 80.0 + i, 85.0 + i) for i in range(30)])
+    strategy = LiveFibonacciStrategy(ema_length=5, rsi_length=3).seed(df.iloc[:25])
+    seeded_ema = strategy.ema.value
+
+    strategy.sync(df.iloc[20:28])
+    assert strategy.last_closed_time == df.index[26], "The last row must be treated as in progress."
+
+    reference = LiveFibonacciStrategy(ema_length=5, rsi_length=3).seed(df.iloc[:27])
+    assert abs(strategy.ema.value - reference.ema.value) < 1e-9
+    assert strategy.ema.value != seeded_ema
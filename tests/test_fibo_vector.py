@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+from backtesting.test import GOOG
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.fibo_signals import ENTRY_RATIOS, detect_impulse, entry_signals, find_entry, impulse_flags
+from scripts.fibo_vector import TRADE_COLUMNS, VectorBacktest, screen
+
+
+def random_walk(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.002, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, n)))
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": 1.0},
+                        index=pd.date_range("2020-01-01", periods=n, freq="h"))
+
+
+def assert_same_trades(df, cash=10000, **params):
+    stats = Backtest(df, FibonacciStrategy, cash=cash, commission=.002).run(**params)
+    result = VectorBacktest(df, cash=cash, commission=.002).run(**params)
+    expected = stats["_trades"][TRADE_COLUMNS].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result["trades"][TRADE_COLUMNS], expected, check_dtype=False)
+    assert result["equity_final"] == stats["Equity Final [$]"]
+
+
+def test_array_rules_match_scalar_rules():
+    df = random_walk(0, n=500)
+    high, low, close = df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy()
+    flags = impulse_flags(high, low)
+    expected = [False] + [detect_impulse(high[i - 1], low[i - 1], high[i], low[i])[0] for i in range(1, len(df))]
+    np.testing.assert_array_equal(flags, expected)
+
+    ema_values = np.full(len(df), 50.0)
+    entry, regular, midpoint = entry_signals(low[:-1], high[:-1], close[1:], ema_values[1:])
+    for i in range(len(df) - 1):
+        fib_levels = detect_impulse(high[i], low[i], np.inf, np.inf)[1]
+        found = find_entry(fib_levels, close[i + 1], ema_values[i + 1], ENTRY_RATIOS)
+        if found is None:
+            assert not regular[i] and not midpoint[i] and np.isnan(entry[i])
+        else:
+            assert (entry[i], bool(midpoint[i]), bool(regular[i])) == (found[0], found[3], not found[3])
+
+
+def test_goog_trades_match_backtest():
+    assert_same_trades(GOOG)
+    assert_same_trades(GOOG, ema_length=50, entry_band=0.03)
+
+
+def test_random_walk_trades_match_backtest():
+    # Frequent margin cancellations with small cash, none with large cash
+    for seed in range(3):
+        df = random_walk(seed)
+        assert_same_trades(df)
+        assert_same_trades(df, cash=1_000_000, ema_length=30)
+
+
+def test_screen_ranks_datasets():
+    results = screen({"a": random_walk(1), "b": random_walk(2), "goog": GOOG})
+    assert sorted(results["dataset"]) == ["a", "b", "goog"]
+    assert results["Return [%]"].is_monotonic_decreasing
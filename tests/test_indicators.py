@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from scripts.indicators import ChunkedEMA, ChunkedRSI, StreamingEMA, StreamingRSI, ema, ema_loop, rsi, rsi_loop
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 30000 + np.cumsum(rng.normal(0, 50, n))
+
+
+@pytest.mark.parametrize("length", [1, 2, 12, 150])
+@pytest.mark.parametrize("n", [1, 5, 151, 5000])
+def test_ema_matches_loop(n, length):
+    """
+    Vectorized EMA must match the element-by-element reference.
+    """
+    data = random_walk(n)
+    np.testing.assert_allclose(ema(data, length), ema_loop(data, length), rtol=1e-12)
+
+
+@pytest.mark.parametrize("length", [2, 12, 150])
+@pytest.mark.parametrize("n", [20, 151, 5000])
+def test_rsi_matches_loop(n, length):
+    """
+    Vectorized RSI must match the element-by-element reference.
+    """
+    data = random_walk(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.testing.assert_allclose(rsi(data, length), rsi_loop(data, length), rtol=1e-10, atol=1e-10)
+
+
+def test_ema_long_series_spans_several_blocks():
+    """
+    A short EMA on a long series forces many recurrence blocks.
+    """
+    data = random_walk(100_000, seed=1)
+    np.testing.assert_allclose(ema(data, 3), ema_loop(data, 3), rtol=1e-12)
+
+
+def test_streaming_ema_matches_batch():
+    """
+    Seeding from history and updating bar by bar must reproduce `ema`.
+    """
+    data = random_walk(1000, seed=2)
+    stream = StreamingEMA(150)
+    stream.seed(data[:200])
+    values = [stream.update(price) for price in data[200:]]
+    np.testing.assert_allclose(values, ema(data, 150)[200:], rtol=1e-12)
+
+
+def test_streaming_rsi_matches_batch_through_warmup():
+    """
+    RSI updates must match `rsi`, including bars fed before the warm-up ends.
+    """
+    data = random_walk(500, seed=3)
+    stream = StreamingRSI(12)
+    stream.seed(data[:5])
+    values = []
+    for price in data[5:]:
+        stream.update(price * 1.01, closed=False)  # In-progress ticks must not change state
+        values.append(stream.update(price))
+    np.testing.assert_allclose(values, rsi(data, 12)[5:], rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize("length", [2, 12, 150])
+@pytest.mark.parametrize("chunk", [5, 1000, 100_000])
+def test_chunked_indicators_are_bit_identical(chunk, length):
+    """
+    Chunk boundaries must not change a single bit, including inside the
+    recurrence blocks and the RSI seeding window.
+    """
+    data = random_walk(30_000, seed=4)
+    ema_stream, rsi_stream = ChunkedEMA(length), ChunkedRSI(length)
+    parts = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+    np.testing.assert_array_equal(np.concatenate([ema_stream.update(part) for part in parts]), ema(data, length))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.testing.assert_array_equal(np.concatenate([rsi_stream.update(part) for part in parts]), rsi(data, length))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from scripts.kline_buffer import KlineBuffer
+
+MINUTE_MS = 60_000
+
+
+def test_ring_keeps_latest_candles_in_order():
+    buffer = KlineBuffer(capacity=3)
+    for t in range(5):
+        assert buffer.push(t * MINUTE_MS, t, t + 1, t - 1, t + 0.5, 10)
+    assert not buffer.push(4 * MINUTE_MS, 4, 6, 3, 5.5, 20)  # In-progress update replaces the newest
+    assert not buffer.push(1 * MINUTE_MS, 0, 0, 0, 0, 0)  # Older candles are ignored
+
+    assert [candle[0] for candle in buffer] == [2 * MINUTE_MS, 3 * MINUTE_MS, 4 * MINUTE_MS]
+    np.testing.assert_array_equal(buffer.column("close"), [2.5, 3.5, 5.5])
+    np.testing.assert_array_equal(buffer.open_time(tail=2), [3 * MINUTE_MS, 4 * MINUTE_MS])
+
+
+def test_frame_is_a_view():
+    buffer = KlineBuffer(capacity=4)
+    buffer.ingest([[str(t * MINUTE_MS), "1", "2", "0.5", str(t), "3", "0"] for t in (9, 8, 7, 6, 5)])  # Newest first
+    df = buffer.frame()
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index.name == "datetime"
+    assert df.index[0] == pd.Timestamp(6 * MINUTE_MS, unit="ms")
+    assert df["close"].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert np.shares_memory(df["close"].to_numpy(), buffer.values)
+    assert np.shares_memory(df.index.asi8, buffer.times)
+    assert list(buffer.frame(tail=2, backtesting=True).columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+
+def test_ingest_formats_match():
+    legacy = [{"open_time": 60 * t, "open": 1, "high": 2, "low": 0.5, "close": t, "volume": 3} for t in (1, 2)]
+    stream = [{"start": MINUTE_MS * t, "open": "1", "high": "2", "low": "0.5", "close": str(t), "volume": "3"}
+              for t in (1, 2)]
+    rest = [[MINUTE_MS * t, "1", "2", "0.5", str(t), "3", "0"] for t in (2, 1)]
+    frames = []
+    for rows in (legacy, stream, rest):
+        buffer = KlineBuffer()
+        assert buffer.ingest(rows) == 2
+        assert buffer.ingest(rows[-1:]) == 0  # Already seen
+        frames.append(buffer.frame())
+    pd.testing.assert_frame_equal(frames[0], frames[1])
+    pd.testing.assert_frame_equal(frames[0], frames[2])
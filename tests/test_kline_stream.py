@@ -0,0 +1,114 @@
+import asyncio
+import json
+import pandas as pd
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.fibo_signals import SIGNAL_BUY
+from scripts.kline_stream import KlineStreamEngine
+
+INTERVAL_MS = 15 * 60 * 1000
+
+
+def kline_message(start, high, low, close, confirm, symbol="BTCUSDT"):
+    """
+    Build a Bybit v5 kline push message.
+    """
+    return {
+        "topic": f"kline.15.{symbol}",
+        "type": "snapshot",
+        "data": [{
+            "start": start, "end": start + INTERVAL_MS - 1, "interval": "15",
+            "open": str(close), "high": str(high), "low": str(low), "close": str(close),
+            "volume": "1", "turnover": "1", "confirm": confirm, "timestamp": start,
+        }],
+    }
+
+
+def seeded_strategy():
+    index = pd.date_range("2024-01-01", periods=20, freq="15min")
+    history = pd.DataFrame({"high": 90.0, "low": 80.0, "close": 81.0}, index=index)
+    return LiveFibonacciStrategy(ema_length=150, rsi_length=3).seed(history)
+
+
+def test_replay_recorded_stream(tmp_path):
+    """
+    Replaying a recorded stream drives the strategy and fires the signal callback
+    once per confirmed candle, ignoring in-progress and duplicate updates.
+    """
+    start = 1_710_000_000_000
+    messages = [
+        {"op": "subscribe", "success": True},
+        kline_message(start, 105.0, 100.0, 104.0, confirm=False),
+        kline_message(start, 110.0, 100.0, 108.0, confirm=True),  # Impulse
+        kline_message(start + INTERVAL_MS, 86.0, 83.0, 83.82, confirm=False),
+        kline_message(start + INTERVAL_MS, 86.0, 83.0, 83.82, confirm=True),  # Pullback to 38.2%
+        kline_message(start + INTERVAL_MS, 86.0, 83.0, 83.82, confirm=True),  # Duplicate push
+        kline_message(start, 110.0, 100.0, 108.0, confirm=True, symbol="ETHUSDT"),
+    ]
+    path = tmp_path / "klines.jsonl"
+    path.write_text("\n".join(json.dumps(m) for m in messages))
+
+    signals = []
+    engine = KlineStreamEngine("BTCUSDT", "15", seeded_strategy(), on_signal=lambda result, candle: signals.append(candle))
+    count = asyncio.run(engine.replay(path))
+
+    assert count == len(messages)
+    assert [candle[0] for candle in engine.candles] == [start, start + INTERVAL_MS]
+    assert len(signals) == 1, "Exactly one buy signal should fire."
+    assert engine.last_result["signal"] == SIGNAL_BUY
+
+
+def test_async_signal_callback_is_awaited():
+    """
+    Coroutine callbacks are awaited inside the event loop.
+    """
+    start = 1_710_000_000_000
+    calls = []
+
+    async def on_signal(result, candle):
+        calls.append(result["signal"])
+
+    engine = KlineStreamEngine("BTCUSDT", 15, seeded_strategy(), on_signal=on_signal)
+
+    async def feed():
+        await engine.handle_message(kline_message(start, 110.0, 100.0, 108.0, confirm=True))
+        await engine.handle_message(json.dumps(kline_message(start + INTERVAL_MS, 86.0, 83.0, 83.82, confirm=True)))
+
+    asyncio.run(feed())
+    assert calls == [SIGNAL_BUY]
+
+
+def test_candles_missed_during_an_outage_are_backfilled():
+    """
+    A confirmed candle more than one interval after the last one triggers a
+    REST backfill, so the strategy ends in the same state as without the gap.
+    """
+    strategy = seeded_strategy()
+    first = strategy.last_closed_time.value // 10**6 + INTERVAL_MS
+    candles = {first + i * INTERVAL_MS: (90.0, 80.0, 81.0) for i in range(6)}
+    candles[first + INTERVAL_MS] = (110.0, 100.0, 108.0)  # Impulse
+    candles[first + 2 * INTERVAL_MS] = (86.0, 83.0, 83.82)  # Pullback to 38.2%
+    requested = []
+
+    def fetch(symbol, interval, start, end):
+        requested.append((start, end))
+        times = [t for t in sorted(candles) if start - INTERVAL_MS <= t <= end]  # Pages may overlap
+        return {"open_time": times, "open": [candles[t][2] for t in times], "high": [candles[t][0] for t in times],
+                "low": [candles[t][1] for t in times], "close": [candles[t][2] for t in times],
+                "volume": [1.0] * len(times)}
+
+    punctual = KlineStreamEngine("BTCUSDT", "15", seeded_strategy())
+    resumed = KlineStreamEngine("BTCUSDT", "15", strategy, fetch=fetch)
+
+    async def feed():
+        for t, (high, low, close) in sorted(candles.items()):
+            await punctual.handle_message(kline_message(t, high, low, close, confirm=True))
+        last = max(candles)
+        await resumed.handle_message(kline_message(last, *candles[last], confirm=True))
+
+    asyncio.run(feed())
+    assert requested == [(first, max(candles) - INTERVAL_MS)]
+    assert [candle[0] for candle in resumed.candles] == sorted(candles)
+    for engine in (punctual, resumed):
+        assert engine.strategy.last_closed_time == pd.to_datetime(max(candles), unit="ms")
+    assert (resumed.strategy.ema.value, resumed.strategy.rsi.value, resumed.strategy.position) == \
+        (punctual.strategy.ema.value, punctual.strategy.rsi.value, punctual.strategy.position)
@@ -0,0 +1,54 @@
+import json
+from scripts.metrics import LatencyHistogram, Metrics
+
+
+def test_histogram_percentiles_within_two_percent():
+    histogram = LatencyHistogram()
+    for value in range(1, 100_001):
+        histogram.record(value * 1000)  # 1 µs .. 100 ms
+    assert histogram.count == 100_000
+    for q, expected in ((0.5, 50_000_000), (0.99, 99_000_000)):
+        assert abs(histogram.percentile(q) - expected) / expected < 0.02
+    assert histogram.percentile(1.0) == histogram.max == 100_000_000
+
+
+def test_bucket_bounds_contain_values():
+    for value in list(range(300)) + [10 ** k + 7 for k in range(3, 13)]:
+        index = LatencyHistogram.bucket_index(value)
+        assert LatencyHistogram.bucket_value(index) >= value
+        assert index == 0 or LatencyHistogram.bucket_value(index - 1) < value
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+
+    @metrics.timed("work")
+    def work(x):
+        return x * 2
+
+    with metrics.span("block"):
+        assert work(2) == 4
+    assert metrics.to_dict() == {}
+
+
+def test_spans_export_prometheus_and_json(tmp_path):
+    metrics = Metrics(enabled=True)
+
+    @metrics.timed("place_bybit_order")
+    def work():
+        return "ok"
+
+    for _ in range(10):
+        work()
+    with metrics.span("fetch_bybit_data"):
+        pass
+
+    text = metrics.to_prometheus()
+    assert '# TYPE fibo_span_latency_seconds summary' in text
+    assert 'fibo_span_latency_seconds_count{span="place_bybit_order"} 10' in text
+    assert 'fibo_span_latency_seconds{span="fetch_bybit_data",quantile="0.99"}' in text
+
+    path = tmp_path / "metrics.json"
+    metrics.write(str(path))
+    data = json.loads(path.read_text())
+    assert data["place_bybit_order"]["count"] == 10
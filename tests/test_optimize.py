@@ -0,0 +1,66 @@
+import io
+import os
+import contextlib
+import subprocess
+import sys
+import numpy as np
+from backtesting import Backtest
+from backtesting.test import GOOG
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.optimize import SharedFrame, attach_frame, expand_grid, run_sweep
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_shared_frame_round_trip():
+    """
+    Workers must see exactly the data that was shared.
+    """
+    shared = SharedFrame(GOOG)
+    try:
+        df, segment = attach_frame(shared.spec)
+        assert df.index.equals(GOOG.index)
+        np.testing.assert_array_equal(df["Close"].to_numpy(), GOOG["Close"].to_numpy())
+        del df
+        segment.close()
+    finally:
+        shared.close()
+
+
+def test_sweep_matches_direct_backtest(tmp_path):
+    """
+    A sweep result must equal a plain Backtest run with the same parameters.
+    """
+    grid = {"ema_length": [50, 150], "entry_band": [0.02]}
+    output = tmp_path / "results.csv"
+    results = run_sweep({"GOOG": GOOG}, grid, max_workers=2, output=output)
+
+    assert len(results) == len(expand_grid(grid)) == 2
+    assert output.exists()
+    assert results["Return [%]"].is_monotonic_decreasing
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = Backtest(GOOG, FibonacciStrategy, cash=10000, commission=.002).run(ema_length=50)
+    row = results[results["ema_length"] == 50].iloc[0]
+    assert row["# Trades"] == stats["# Trades"]
+    assert np.isclose(row["Equity Final [$]"], stats["Equity Final [$]"])
+
+
+POOL_SCRIPT = """
+from backtesting.test import GOOG
+from scripts.optimize import run_sweep
+from scripts.robustness import run_robustness
+run_sweep({"GOOG": GOOG}, {"ema_length": [50, 150]}, max_workers=2)
+run_robustness({"GOOG": GOOG}, {"ema_length": [50, 150]}, train_bars=800, test_bars=400, n_sims=100, max_workers=2)
+"""
+
+
+def test_worker_pools_release_shared_memory_cleanly():
+    """
+    The resource tracker reports errors (and leaked segments) on stderr, from
+    its own process, so the sweep and robustness pools run in a fresh interpreter.
+    """
+    run = subprocess.run([sys.executable, "-W", "ignore", "-c", POOL_SCRIPT],
+                         cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert run.returncode == 0, run.stderr
+    assert "resource_tracker" not in run.stderr and "Traceback" not in run.stderr, run.stderr
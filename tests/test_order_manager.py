@@ -0,0 +1,95 @@
+import asyncio
+import time
+from scripts.mock_exchange import MockExchange
+from scripts.order_manager import AsyncOrderManager, OrderIntent
+
+
+def run_orders(exchange, intents, **kwargs):
+    """
+    Submit all intents at once and return (acks, manager).
+    """
+    async def main():
+        manager = AsyncOrderManager(exchange, **kwargs)
+        manager.start()
+        futures = manager.submit_many(intents)
+        acks = await asyncio.gather(*futures)
+        await manager.close()
+        return acks, manager
+
+    return asyncio.run(main())
+
+
+def test_single_order_is_acknowledged():
+    exchange = MockExchange()
+    acks, manager = run_orders(exchange, [OrderIntent("BTCUSDT", "Buy", 0.01)])
+
+    assert exchange.calls[0][0] == "order.create"
+    assert exchange.calls[0][2][0]["qty"] == "0.01"
+    assert acks[0].ok and acks[0].order_id == "mock-1"
+    assert acks[0].latency > 0
+    assert manager.latency_summary()["count"] == 1
+    assert not manager.pending
+
+
+def test_simultaneous_entries_go_out_as_one_batch():
+    """
+    Five entry levels firing on the same candle need one request, not five.
+    """
+    exchange = MockExchange()
+    intents = [OrderIntent("BTCUSDT", "Buy", 0.01, order_type="Limit", price=price)
+               for price in (100, 101, 102, 103, 104)]
+    acks, _ = run_orders(exchange, intents)
+
+    assert [call[0] for call in exchange.calls] == ["order.create-batch"]
+    assert [request["price"] for request in exchange.calls[0][2]] == ["100", "101", "102", "103", "104"]
+    assert all(ack.ok for ack in acks)
+    assert len({ack.order_id for ack in acks}) == 5
+    assert [ack.intent for ack in acks] == intents
+
+
+def test_batches_respect_size_limit():
+    exchange = MockExchange()
+    intents = [OrderIntent("BTCUSDT", "Buy", 0.01) for _ in range(7)]
+    acks, _ = run_orders(exchange, intents, max_batch=3)
+
+    assert [len(requests) for _, _, requests in exchange.calls] == [3, 3, 1]
+    assert all(ack.ok for ack in acks)
+
+
+def test_rejections_are_reported_per_order():
+    exchange = MockExchange(reject=lambda order: "Insufficient balance" if order["qty"] == "5" else None)
+    intents = [OrderIntent("BTCUSDT", "Buy", qty) for qty in (1, 5, 2)]
+    acks, _ = run_orders(exchange, intents)
+
+    assert [ack.ok for ack in acks] == [True, False, True]
+    assert acks[1].ret_msg == "Insufficient balance" and acks[1].order_id is None
+
+    acks, _ = run_orders(exchange, [OrderIntent("BTCUSDT", "Buy", 5)])
+    assert not acks[0].ok and acks[0].ret_code == 10001
+
+
+def test_missing_acknowledgement_times_out():
+    acks, manager = run_orders(MockExchange(respond=False), [OrderIntent("BTCUSDT", "Buy", 1)], ack_timeout=0.05)
+
+    assert acks[0].ret_code is None and not acks[0].ok
+    assert manager.latency_summary()["count"] == 0
+
+
+def test_submit_does_not_wait_for_the_exchange():
+    acked = []
+
+    async def main():
+        manager = AsyncOrderManager(MockExchange(latency=0.2), on_ack=acked.append)
+        manager.start()
+        start = time.perf_counter()
+        future = manager.submit(OrderIntent("BTCUSDT", "Sell", 1))
+        elapsed = time.perf_counter() - start
+        assert not future.done()
+        ack = await future
+        await manager.close()
+        return elapsed, ack
+
+    elapsed, ack = asyncio.run(main())
+    assert elapsed < 0.05
+    assert ack.ok and ack.latency >= 0.2
+    assert acked == [ack]
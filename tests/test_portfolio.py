@@ -0,0 +1,124 @@
+import numpy as np
+from scripts.candle_store import CandleStore, interval_ms
+from scripts.portfolio import PortfolioRunner, RiskBudget
+
+STEP = interval_ms("15")
+NOW = 1000 * STEP  # Candle 1000 is in progress at the start
+
+
+class FakeClient:
+    """
+    Serves flat 90/80 candles, with an impulse at candle 1000 and a pullback
+    to the 38.2% level at candle 1001 for every symbol.
+    """
+    scripted = {1000: (110.0, 100.0, 108.0), 1001: (86.0, 83.0, 83.82)}
+
+    def __init__(self):
+        self.pages = []
+        self.failing = set()  # Symbols whose fetches raise
+
+    def candles(self, start, end):
+        open_time = np.arange(start, end + 1, STEP, dtype=np.int64)
+        rows = [self.scripted.get(t // STEP, (90.0, 80.0, 81.0)) for t in open_time]
+        high, low, close = (np.array(column) for column in zip(*rows))
+        return {"open_time": open_time, "open": close, "high": high, "low": low,
+                "close": close, "volume": np.ones(len(open_time))}
+
+    def fetch(self, symbol, interval, start, end):
+        return self.candles(start, end)
+
+    def fetch_page(self, symbol, interval, start, end):
+        if symbol in self.failing:
+            raise ConnectionError(f"{symbol} unavailable")
+        self.pages.append((symbol, start, end))
+        return self.candles(start, end)
+
+    def close(self):
+        pass
+
+
+def make_runner(tmp_path, budget):
+    orders = []
+    runner = PortfolioRunner(
+        [("BTCUSDT", "15", 1.0), ("ETHUSDT", "15", 1.0)],
+        lambda *order: orders.append(order), budget,
+        client=FakeClient(), store=CandleStore(tmp_path), max_workers=4,
+    )
+    runner.seed(NOW)
+    return runner, orders
+
+
+def test_risk_budget_caps_total_risk():
+    budget = RiskBudget(capital=1000, max_portfolio_risk=0.1)
+    assert budget.try_reserve("a", 60)
+    assert not budget.try_reserve("b", 60), "The second reservation exceeds the 100 budget."
+    budget.release("a")
+    assert budget.try_reserve("b", 60)
+
+
+def test_cycles_run_only_due_pairs_and_share_the_risk_budget(tmp_path):
+    """
+    Both pairs signal on the same candle but the budget only covers one order.
+    """
+    runner, orders = make_runner(tmp_path, RiskBudget(capital=100, max_portfolio_risk=0.03))
+    try:
+        assert runner.run_cycle(NOW + 1) == [], "No candle has closed since seeding."
+
+        runner.run_cycle(NOW + STEP + 1)  # Impulse candle closes
+        assert len(runner.client.pages) == 2
+        assert all(pair.strategy.active_fib is not None for pair in runner.pairs)
+
+        placed = runner.run_cycle(NOW + 2 * STEP + 1)  # Pullback candle closes
+        assert len(placed) == 1 and len(orders) == 1
+        symbol, side, qty, stop_loss, take_profit = orders[0]
+        assert side == "Buy" and stop_loss == 80.0 and take_profit == 90.0
+
+        report = runner.latency_report()
+        assert list(report["fetch_count"]) == [2, 2]
+        assert report["order_count"].sum() == 1
+        assert (report["fetch_p99_ms"] <= report["fetch_max_ms"]).all()
+    finally:
+        runner.close()
+
+
+def test_a_failing_fetch_backs_off_that_pair_only(tmp_path):
+    runner, orders = make_runner(tmp_path, RiskBudget(capital=1000))
+    btc, eth = runner.pairs
+    try:
+        runner.client.failing.add("ETHUSDT")
+        now = NOW + STEP + 1
+        runner.run_cycle(now)
+        assert btc.strategy.active_fib is not None and btc.next_close == NOW + 2 * STEP
+        assert eth.strategy.active_fib is None and eth.failures == 1
+        assert now < eth.next_close <= now + 500, "The first retry waits at most the 0.5s base delay."
+
+        runner.run_cycle(eth.next_close)
+        assert eth.failures == 2, "Only the failing pair was due again."
+        assert len(runner.client.pages) == 1
+
+        # ETHUSDT recovers and catches up on the candles it missed
+        runner.client.failing.clear()
+        placed = runner.run_cycle(NOW + 2 * STEP + 1)
+        assert eth.failures == 0 and eth.next_close == NOW + 3 * STEP
+        assert runner.client.pages[-1] == ("ETHUSDT", NOW, NOW + STEP)
+        assert sorted(symbol for symbol, _, _, _ in placed) == ["BTCUSDT", "ETHUSDT"]
+    finally:
+        runner.close()
+
+
+def test_a_late_cycle_replays_every_missed_candle(tmp_path):
+    late, _ = make_runner(tmp_path / "late", RiskBudget(capital=1000))
+    punctual, _ = make_runner(tmp_path / "punctual", RiskBudget(capital=1000))
+    try:
+        late.run_cycle(NOW + 3 * STEP + 1)  # Woke up two candles late
+        for k in range(1, 4):
+            punctual.run_cycle(NOW + k * STEP + 1)
+        assert all(page[1:] == (NOW, NOW + 2 * STEP) for page in late.client.pages)
+        for a, b in zip(late.pairs, punctual.pairs):
+            assert a.strategy.last_closed_time == b.strategy.last_closed_time
+            assert a.strategy.last_candle == b.strategy.last_candle
+            assert a.strategy.ema.value == b.strategy.ema.value
+            assert a.strategy.position == b.strategy.position
+    finally:
+        late.close()
+        punctual.close()
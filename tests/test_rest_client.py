@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from scripts.rest_client import RateLimitError, RestClient, TokenBucket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive stub of the Bybit REST API. The `mode` query parameter picks
+    the behaviour: `slow` answers after 0.2 s, `flaky` fails with HTTP 503
+    twice, `limited` rejects with HTTP 429 once and `exhausted` reports no
+    requests left until the reset time.
+    """
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    lock = threading.Lock()
+    seen = []  # (client port, query) per request
+    failures = {}
+    reset_in = 0.3
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        with self.lock:
+            StubHandler.seen.append((self.client_address[1], query))
+            failures = StubHandler.failures.get(query.get("mode"), 0)
+            StubHandler.failures[query.get("mode")] = failures + 1
+        mode = query.get("mode")
+        reset = str(int((time.time() + self.reset_in) * 1000))
+        if mode == "slow":
+            time.sleep(0.2)
+        if mode == "flaky" and failures < 2:
+            return self._reply(503, {})
+        if mode == "limited" and failures < 1:
+            return self._reply(429, {}, {"X-Bapi-Limit-Reset-Timestamp": reset})
+        headers = {"X-Bapi-Limit-Status": "0", "X-Bapi-Limit-Reset-Timestamp": reset} if mode == "exhausted" else {}
+        self._reply(200, {"retCode": 0, "retMsg": "OK", "result": {"query": query}}, headers)
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.seen = []
+    StubHandler.failures = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, burst=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    assert time.monotonic() - start >= (15 - 5) / 50 * 0.9  # The burst is free, the rest is paced
+
+
+def test_connections_are_reused(stub_url):
+    client = RestClient(stub_url, pool_size=2)
+    try:
+        for i in range(20):
+            assert client.get("/v5/market/time", {"i": i})["query"]["i"] == str(i)
+    finally:
+        client.close()
+    assert len({port for port, _ in StubHandler.seen}) == 1
+
+
+def test_identical_concurrent_requests_are_coalesced(stub_url):
+    client = RestClient(stub_url, pool_size=8)
+    params = {"symbol": "BTCUSDT", "interval": "15", "mode": "slow"}
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: client.get("/v5/market/kline", params), range(8)))
+            other = pool.submit(client.get, "/v5/market/kline", dict(params, symbol="ETHUSDT"))
+            assert other.result()["query"]["symbol"] == "ETHUSDT"
+    finally:
+        client.close()
+    assert all(result == results[0] for result in results)
+    assert len(StubHandler.seen) < 8
+    assert client.stats["coalesced"] == 8 - sum(query["symbol"] == "BTCUSDT" for _, query in StubHandler.seen)
+
+
+def test_retries_and_rate_limit_reset(stub_url):
+    client = RestClient(stub_url, backoff=0.01)
+    try:
+        assert client.get("/v5/market/kline", {"mode": "flaky"})["query"]["mode"] == "flaky"
+        assert client.stats["retries"] == 2
+
+        start = time.monotonic()
+        client.get("/v5/market/kline", {"mode": "limited"})
+        assert time.monotonic() - start >= 0.2  # Waited for the advertised reset
+
+        client.get("/v5/market/kline", {"mode": "exhausted"})
+        start = time.monotonic()
+        client.get("/v5/market/kline", {"mode": "next"})
+        assert time.monotonic() - start >= 0.2  # No requests left until the reset
+    finally:
+        client.close()
+
+    StubHandler.failures["limited"] = 0
+    client = RestClient(stub_url, max_retries=0)
+    with pytest.raises(RateLimitError):
+        client.get("/v5/market/kline", {"mode": "limited"})
+    client.close()
@@ -0,0 +1,56 @@
+import io
+import contextlib
+import numpy as np
+from backtesting import Backtest
+from backtesting.test import GOOG
+from scripts.fibo_algo import FibonacciStrategy
+from scripts.robustness import monte_carlo, run_robustness, simulate_trades, summarize, walk_forward_windows
+
+
+def test_walk_forward_windows():
+    assert walk_forward_windows(1000, 500, 200) == [(0, 500, 500, 700), (200, 700, 700, 900)]
+    assert walk_forward_windows(1000, 500, 200, step_bars=100, anchored=True)[-1] == (0, 800, 800, 1000)
+    assert walk_forward_windows(600, 500, 200) == []
+
+
+def test_simulations_are_reproducible():
+    """
+    Paths only depend on the seed, however they are split across tasks.
+    """
+    returns = np.array([0.05, -0.02, 0.01, -0.04, 0.03])
+    a = simulate_trades(returns, 100, seed=1)
+    b = simulate_trades(returns, 100, seed=1)
+    assert a.equals(b)
+    assert (a["Max. Drawdown [%]"] <= 0).all()
+
+    # A constant winner never draws down and compounds deterministically
+    flat = simulate_trades([0.01], 10, n_trades=5, seed=0)
+    np.testing.assert_allclose(flat["Return [%]"], (1.01 ** 5 - 1) * 100)
+    assert (flat["Max. Drawdown [%]"] == 0).all()
+
+    parallel = monte_carlo(returns, 5000, seed=3, max_workers=2)
+    assert len(parallel) == 5000
+    assert parallel.equals(monte_carlo(returns, 5000, seed=3, max_workers=2))
+    summary = summarize(parallel)
+    assert summary.loc["Return [%]", "q5"] <= summary.loc["Return [%]", "q95"]
+
+
+def test_out_of_sample_matches_direct_backtest():
+    """
+    Every test window must equal a plain Backtest of the chosen parameters on that slice.
+    """
+    grid = {"ema_length": [50, 150]}
+    results = run_robustness({"GOOG": GOOG}, grid, train_bars=800, test_bars=400, n_sims=500, max_workers=2)
+    windows = results["windows"]
+    assert len(windows) == len(walk_forward_windows(len(GOOG), 800, 400))
+
+    row = windows.iloc[-1]
+    test = GOOG.loc[row["test_start"]:row["test_end"]]
+    assert len(test) == 400
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = Backtest(test, FibonacciStrategy, cash=10000, commission=.002).run(ema_length=row["ema_length"])
+    assert row["# Trades"] == stats["# Trades"]
+    assert np.isclose(row["Return [%]"], stats["Return [%]"])
+
+    assert len(results["trade_returns"]) == windows["# Trades"].sum()
+    assert len(results["simulations"]) == 500
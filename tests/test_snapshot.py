@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.data import synthetic_ohlcv
+from scripts.candle_store import CandleStore, interval_ms
+from scripts.fibo_live import LiveFibonacciStrategy
+from scripts.kline_stream import KlineStreamEngine
+from scripts.snapshot import SnapshotError, dump_state, load_snapshot, load_state, save_snapshot
+from testnet_trading import resume_strategy
+
+STEP = interval_ms("15")
+
+
+def state(strategy):
+    grid = strategy.active_fib
+    return (
+        strategy.ema.length, strategy.ema.value, strategy.rsi.length, strategy.rsi.avg_gain, strategy.rsi.avg_loss,
+        strategy.rsi.last_price, strategy.rsi.value, strategy.rsi._warmup, strategy.last_candle,
+        strategy.last_closed_time, None if grid is None else (grid.low, grid.high, grid.ratios), strategy.position,
+    )
+
+
+def candles(n, end_ms):
+    """
+    `n` synthetic candles with lowercase columns, the last one opening at `end_ms`.
+    """
+    df = synthetic_ohlcv(n, interval_ms=STEP).rename(columns=str.lower)
+    df.index = pd.DatetimeIndex(pd.to_datetime(end_ms - STEP * np.arange(n - 1, -1, -1), unit="ms"), name="datetime")
+    return df
+
+
+def strategy_with_open_grid():
+    df = candles(3000, 3000 * STEP)
+    for stop in range(200, len(df)):
+        strategy = LiveFibonacciStrategy().seed(df.iloc[:stop])
+        if strategy.active_fib is not None and strategy.position is not None:
+            return strategy, df.iloc[stop:]
+    raise AssertionError("No bar with an active grid and a position")
+
+
+def test_round_trip_resumes_identically():
+    strategy, rest = strategy_with_open_grid()
+    data = dump_state(strategy, "BTCUSDT", "15")
+    assert len(data) < 256
+    restored, meta = load_state(data)
+    assert meta["symbol"] == "BTCUSDT" and meta["interval"] == "15"
+    assert state(restored) == state(strategy)
+
+    for row in rest.iloc[:200].itertuples():
+        assert restored.update(row.high, row.low, row.close) == strategy.update(row.high, row.low, row.close)
+
+    # Indicators still warming up are kept as well
+    fresh = LiveFibonacciStrategy(rsi_length=12).seed(rest.iloc[:5])
+    assert state(load_state(dump_state(fresh))[0]) == state(fresh)
+
+
+def test_damaged_snapshots_are_rejected(tmp_path):
+    strategy, _ = strategy_with_open_grid()
+    data = bytearray(dump_state(strategy, "BTCUSDT", "15"))
+    data[-5] ^= 0xFF
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_state(bytes(data))
+    with pytest.raises(SnapshotError, match="truncated"):
+        load_state(dump_state(strategy)[:-1])
+    with pytest.raises(SnapshotError):
+        load_state(b"NOPE" + dump_state(strategy)[4:])
+
+    path = str(tmp_path / "BTCUSDT_15.snap")
+    save_snapshot(path, strategy, "BTCUSDT", "15")
+    assert state(load_snapshot(path, "BTCUSDT", "15")) == state(strategy)
+    assert load_snapshot(path, "ETHUSDT", "15") is None
+    (tmp_path / "BTCUSDT_15.snap").write_bytes(bytes(data))
+    assert load_snapshot(path) is None
+
+
+def test_engine_snapshots_confirmed_candles(tmp_path):
+    df = candles(400, 400 * STEP)
+    path = str(tmp_path / "engine.snap")
+    engine = KlineStreamEngine("BTCUSDT", "15", LiveFibonacciStrategy().seed(df.iloc[:300]), snapshot_path=path)
+
+    async def feed():
+        for open_time, row in zip(df.index[300:].asi8 // 10**6, df.iloc[300:].itertuples()):
+            kline = {"start": int(open_time), "open": row.open, "high": row.high, "low": row.low,
+                     "close": row.close, "volume": row.volume, "confirm": True}
+            await engine.handle_message({"topic": engine.topic, "data": [kline]})
+
+    asyncio.run(feed())
+    assert state(load_snapshot(path, "BTCUSDT", "15")) == state(engine.strategy)
+
+
+class FakeClient:
+    def __init__(self, df):
+        self.df = df
+        self.ranges = []
+
+    def fetch(self, symbol, interval, start, end):
+        self.ranges.append((start, end))
+        open_time = self.df.index.asi8 // 10**6
+        mask = (open_time >= start) & (open_time <= end)
+        return {"open_time": open_time[mask], **{name: self.df[name].to_numpy()[mask]
+                                                 for name in ("open", "high", "low", "close", "volume")}}
+
+
+def test_restart_replays_only_missed_candles(tmp_path):
+    now = int(time.time() * 1000) // STEP * STEP  # Open time of the in-progress candle
+    df = candles(500, now - STEP)
+    continuous = LiveFibonacciStrategy().seed(df.iloc[:-30])  # A bot that never stopped
+    continuous.sync(df.iloc[-30:], includes_current=False)
+
+    path = str(tmp_path / "BTCUSDT_15.snap")
+    save_snapshot(path, LiveFibonacciStrategy().seed(df.iloc[:-30]), "BTCUSDT", "15")
+    client = FakeClient(df)
+    resumed = resume_strategy(CandleStore(str(tmp_path / "candles")), client, "BTCUSDT", "15", path)
+
+    assert client.ranges == [(df.index[-30].value // 10**6, now - STEP)]  # Only the 30 missed candles
+    assert state(resumed) == state(continuous)
+    assert resume_strategy(CandleStore(str(tmp_path / "candles")), client, "BTCUSDT", "15",
+                           str(tmp_path / "missing.snap")) is None
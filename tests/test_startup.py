@@ -0,0 +1,45 @@
+import os
+import json
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A restarted bot must be trading again well under a second; importing the
+# live entry point gets at most this much of it.
+LIVE_IMPORT_BUDGET = 1.0  # Seconds
+HEAVY_MODULES = ("backtesting", "bokeh", "pandas_ta", "matplotlib", "plotly", "pybit")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def import_probe(module):
+    """
+    Import `module` in a fresh interpreter and return its import time and
+    the heavy modules it pulled in.
+    """
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_live_entry_point_imports_fast():
+    """
+    The live entry point must not load backtesting, plotting or the exchange
+    client at import time, and must stay within the import budget.
+    """
+    probes = [import_probe("testnet_trading") for _ in range(2)]  # Best of two, the first may hit a cold disk cache
+    assert probes[0]["loaded"] == []
+    assert min(probe["seconds"] for probe in probes) < LIVE_IMPORT_BUDGET
+
+
+def test_strategy_module_needs_no_pandas_ta():
+    code = "import sys, scripts.fibo_algo; print('pandas_ta' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
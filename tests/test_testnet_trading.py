@@ -0,0 +1,25 @@
+from scripts.fibo_signals import SIGNAL_BUY, SIGNAL_NONE
+from testnet_trading import place_signal_order
+
+
+class FakeOrderManager:
+    def __init__(self):
+        self.intents = []
+
+    def submit(self, intent):
+        self.intents.append(intent)
+
+
+def test_signal_orders_carry_the_stop_loss_and_take_profit():
+    manager = FakeOrderManager()
+    place_signal_order(manager, "BTCUSDT", 0.01, {"signal": SIGNAL_BUY, "stop_loss": 80.0, "take_profit": 90.0})
+
+    request = manager.intents[0].to_request()
+    assert request["side"] == "Buy" and request["qty"] == "0.01"
+    assert request["stopLoss"] == "80.0" and request["takeProfit"] == "90.0"
+
+
+def test_no_order_without_a_signal():
+    manager = FakeOrderManager()
+    place_signal_order(manager, "BTCUSDT", 0.01, {"signal": SIGNAL_NONE, "stop_loss": None, "take_profit": None})
+    assert manager.intents == []
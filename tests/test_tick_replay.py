@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from scripts.fibo_vector import VectorBacktest
+from scripts.tick_replay import TickReplay, import_trades_csv, open_ticks, ticks_to_bars, write_ticks
+
+START = 1_710_000_000_000
+MINUTE = 60_000
+
+
+def scenario_ticks(path, bar3):
+    """
+    Impulse on bar 1, a pullback close near the 23.6% level on bar 2 and the
+    entry bar 3 with the given prices. The grid spans 100-110.
+    """
+    bars = [[105.0, 110.0, 100.0], [106.0, 112.0, 107.0], [104.0, 103.82], bar3, [105.0]]
+    times, prices = [], []
+    for i, bar in enumerate(bars):
+        for j, price in enumerate(bar):
+            times.append(START + i * MINUTE + j * 1000)
+            prices.append(price)
+    write_ticks(path, times, prices, np.ones(len(times)))
+    return open_ticks(path)
+
+
+def random_ticks(path, n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = START + np.cumsum(rng.integers(0, 400, n))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    write_ticks(path, times, prices, rng.uniform(0.1, 2, n))
+    return open_ticks(path)
+
+
+def test_bars_match_resample(tmp_path):
+    ticks = random_ticks(tmp_path / "ticks.bin")
+    frame = pd.DataFrame({"price": ticks["price"], "size": ticks["size"]},
+                         index=pd.to_datetime(ticks["time"], unit="ms"))
+    expected = frame["price"].resample("1min").ohlc().dropna()
+    bars = ticks_to_bars(ticks, "1", chunk_ticks=1000)
+    np.testing.assert_array_equal(bars[["Open", "High", "Low", "Close"]].to_numpy(), expected.to_numpy())
+    np.testing.assert_allclose(bars["Volume"].to_numpy(), frame["size"].resample("1min").sum()[expected.index])
+    assert bars.index.equals(expected.index.rename("datetime"))
+
+
+def test_take_profit_before_stop_inside_one_bar(tmp_path):
+    """
+    Bar data cannot tell which extreme came first and assumes the stop;
+    the ticks show the take-profit was hit first.
+    """
+    ticks = scenario_ticks(tmp_path / "ticks.bin", [104.0, 111.0, 99.0, 105.0])
+    result = TickReplay(ticks, "1", ema_length=10, breakeven=False, max_loss=None).run()
+    trade = result["trades"].iloc[0]
+    assert (trade["Size"], trade["EntryPrice"], trade["ExitPrice"], trade["ExitReason"]) == (52, 104.0, 111.0, "tp")
+
+    bar_trade = VectorBacktest(ticks_to_bars(ticks, "1")).run(ema_length=10)["trades"].iloc[0]
+    assert (bar_trade["EntryPrice"], bar_trade["ExitPrice"]) == (104.0, 100.0)
+
+
+def test_breakeven_stop(tmp_path):
+    """
+    Reaching the next level (38.2%) moves the stop to the 23.6% entry level;
+    the fall back below it exits at the first tick through the stop.
+    """
+    ticks = scenario_ticks(tmp_path / "ticks.bin", [103.0, 104.0, 102.0, 111.0])
+    trade = TickReplay(ticks, "1", ema_length=10).run()["trades"].iloc[0]
+    assert (trade["EntryPrice"], trade["ExitPrice"], trade["ExitReason"]) == (103.0, 102.0, "breakeven")
+
+    trade = TickReplay(ticks, "1", ema_length=10, breakeven=False).run()["trades"].iloc[0]
+    assert (trade["ExitPrice"], trade["ExitReason"]) == (111.0, "tp")
+
+
+def test_results_do_not_depend_on_chunking(tmp_path):
+    ticks = random_ticks(tmp_path / "ticks.bin", n=50000, seed=3)
+    small = TickReplay(ticks, "1", cash=1_000_000, ema_length=20, chunk_ticks=100).run()
+    large = TickReplay(ticks, "1", cash=1_000_000, ema_length=20).run()
+    assert len(large["trades"]) > 0
+    pd.testing.assert_frame_equal(small["trades"], large["trades"])
+    assert small["equity_final"] == large["equity_final"]
+    assert small["bars"] == large["bars"]
+
+
+def test_import_trades_csv(tmp_path):
+    src = tmp_path / "BTCUSDT2024-03-09.csv.gz"
+    pd.DataFrame({
+        "timestamp": [1710000000.5, 1710000000.1, 1710000001.25],
+        "symbol": "BTCUSDT", "side": ["Buy", "Sell", "Buy"],
+        "size": [0.1, 0.2, 0.3], "price": [100.0, 99.5, 101.0],
+    }).to_csv(src, index=False)
+    dst = tmp_path / "ticks.bin"
+    assert import_trades_csv(src, dst, chunksize=2) == 3
+    ticks = open_ticks(dst)
+    assert ticks["time"].tolist() == [1710000000100, 1710000000500, 1710000001250]
+    assert ticks["price"].tolist() == [99.5, 100.0, 101.0]